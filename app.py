@@ -2,18 +2,41 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime, date
-import io
+import os
+import tempfile
 from services.app_controller import AppController
+from services.shared_store import SharedUserStore
+import config
+
+@st.cache_resource
+def stockage_partage():
+    """
+    Stockage commun à toutes les sessions du serveur : les données de chaque utilisateur
+    ne sont chargées qu'une fois, quel que soit le nombre de sessions ouvertes.
+    """
+    return SharedUserStore()
 
 # Initialisation de l'AppController
 if 'app_controller' not in st.session_state:
-    st.session_state.app_controller = AppController()
+    st.session_state.app_controller = AppController(shared_store=stockage_partage())
 
 # Vérification de la session utilisateur
 if 'user' not in st.session_state:
     st.session_state.user = None
 
-def ajouter_transaction(montant, categorie, transaction_date, est_depense, est_planifiee=False):
+FORMATS_RAPPORT = {'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet',
+                   'feather': 'application/vnd.apache.arrow.file'}
+
+TRIS = {"Date": 'date', "Montant": 'amount', "Catégorie": 'category'}
+
+FREQUENCES = {"Ponctuelle": None, "Quotidienne": 'daily', "Hebdomadaire": 'weekly',
+              "Mensuelle": 'monthly', "Annuelle": 'yearly'}
+
+PERIODES = {"Mois en cours": 'month', "Trimestre en cours": 'quarter', "Année en cours": 'year'}
+
+COMPARAISONS = {"Période précédente": 'previous', "Même période l'an dernier": 'last_year'}
+
+def ajouter_transaction(montant, categorie, transaction_date, est_depense, est_planifiee=False, frequence=None):
     """
     Ajoute une nouvelle transaction en utilisant l'AppController.
     
@@ -22,6 +45,7 @@ def ajouter_transaction(montant, categorie, transaction_date, est_depense, est_p
     :param transaction_date: La date de la transaction
     :param est_depense: Indique si la transaction est une dépense
     :param est_planifiee: Indique si la transaction est planifiée ou non
+    :param frequence: Fréquence de répétition d'une transaction planifiée (None : ponctuelle)
     :return: True si la transaction a été ajoutée avec succès, False sinon
     """
     # Vérification de la date pour les transactions planifiées
@@ -37,12 +61,22 @@ def ajouter_transaction(montant, categorie, transaction_date, est_depense, est_p
     if est_depense:
         montant = -abs(montant)
 
-    transaction = st.session_state.app_controller.add_transaction(
-        amount=montant,
-        category=categorie,
-        date=transaction_date,
-        description="Transaction ajoutée via l'interface utilisateur"
-    )
+    if est_planifiee:
+        # Les occurrences ne sont enregistrées qu'à leur échéance
+        transaction = st.session_state.app_controller.schedule_transaction(
+            amount=montant,
+            category=categorie,
+            description="Transaction planifiée via l'interface utilisateur",
+            start_date=transaction_date,
+            frequency=frequence
+        )
+    else:
+        transaction = st.session_state.app_controller.add_transaction(
+            amount=montant,
+            category=categorie,
+            date=transaction_date,
+            description="Transaction ajoutée via l'interface utilisateur"
+        )
 
     if transaction:
         if not est_planifiee and st.session_state.app_controller.check_low_balance():
@@ -119,83 +153,231 @@ else:
 # Le reste du code ne s'exécute que si l'utilisateur est connecté
 if st.session_state.user:
 
-    # Affichage du solde
-    solde = st.session_state.app_controller.get_balance()
+    # Règlement des transactions planifiées arrivées à échéance depuis le dernier affichage
+    st.session_state.app_controller.settle_planned_transactions()
+
+    # Affichage du solde réglé et du solde prévisionnel (transactions planifiées incluses)
+    solde = st.session_state.app_controller.get_settled_balance()
     st.header(f"Votre solde actuel est de : {solde:.2f}€")
+    fin_du_mois = (pd.Timestamp(date.today()) + pd.offsets.MonthEnd(0)).to_pydatetime().replace(hour=23, minute=59)
+    solde_prevu = st.session_state.app_controller.get_projected_balance(fin_du_mois)
+    st.write(f"Solde prévu à la fin du mois : {solde_prevu:.2f}€")
     # Formulaire pour ajouter une nouvelle transaction
     st.header("Ajouter une nouvelle transaction")
     montant = st.number_input("Montant de la transaction (€)", min_value=0.01, step=0.01)
-    categorie = st.selectbox("Catégorie", ["Courses", "Divertissement", "Voyage", "Restaurants", 
-                                           "Virements", "Transport", "Santé", "Achat", "Services", "Autre"])
+    categorie = st.selectbox("Catégorie", config.CATEGORIES)
     transaction_date = st.date_input("Date de la transaction", value=date.today())
     est_depense = st.checkbox("Est-ce une dépense ?")
     transaction_planifiee = st.checkbox("Transaction planifiée ?")
+    frequence = None
+    if transaction_planifiee:
+        frequence = FREQUENCES[st.selectbox("Répétition", list(FREQUENCES))]
 
     if st.button("Ajouter transaction"):
-        if ajouter_transaction(montant, categorie, transaction_date, est_depense, transaction_planifiee):
+        if ajouter_transaction(montant, categorie, transaction_date, est_depense, transaction_planifiee, frequence):
             st.success("Transaction ajoutée avec succès!")
             # Mise à jour du solde après l'ajout de la transaction
-            nouveau_solde = st.session_state.app_controller.get_balance()
+            nouveau_solde = st.session_state.app_controller.get_settled_balance()
             st.write(f"Nouveau solde : {nouveau_solde:.2f}€")
             # Recharger la page pour mettre à jour l'affichage du solde
             st.rerun()
 
+    # Affichage des transactions planifiées
+    planifiees = st.session_state.app_controller.get_planned_transactions()
+    if planifiees:
+        st.header("Transactions planifiées")
+        st.write(pd.DataFrame({
+            'prochaine échéance': [p.next_date for p in planifiees],
+            'Montant (€)': [f"{p.amount:.2f}€" for p in planifiees],
+            'category': [p.category for p in planifiees],
+            'répétition': [p.frequency or "ponctuelle" for p in planifiees]
+        }))
+
+    # Règles de catégorisation automatique des transactions importées
+    with st.expander("Règles de catégorisation"):
+        col_mot, col_categorie_regle = st.columns(2)
+        mot_cle = col_mot.text_input("Mot-clé de la description (ex. : carrefour)")
+        categorie_regle = col_categorie_regle.selectbox("Catégorie attribuée", config.CATEGORIES, key="categorie_regle")
+        if st.button("Ajouter la règle") and mot_cle.strip():
+            st.session_state.app_controller.add_category_rule(categorie_regle, keyword=mot_cle)
+        regles = st.session_state.app_controller.get_category_rules()
+        if regles:
+            st.write(pd.DataFrame({
+                'règle': [r.rule_id for r in regles],
+                'critère': [r.keyword or r.pattern or "montant" for r in regles],
+                'category': [r.category for r in regles]
+            }))
+            regle_a_supprimer = st.selectbox("Règle à supprimer", [r.rule_id for r in regles])
+            if st.button("Supprimer la règle"):
+                st.session_state.app_controller.remove_category_rule(regle_a_supprimer)
+                st.rerun()
+
+    # Import d'un relevé bancaire : les lignes déjà importées sont ignorées
+    st.header("Importer un relevé bancaire")
+    releve = st.file_uploader("Relevé (CSV, OFX ou QIF)", type=["csv", "ofx", "qfx", "qif"])
+    if releve is not None and st.button("Importer le relevé"):
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = os.path.join(dossier, os.path.basename(releve.name))
+            with open(chemin, 'wb') as fichier:
+                fichier.write(releve.getbuffer())
+            try:
+                resultat = st.session_state.app_controller.import_statement(chemin)
+            except ValueError as e:
+                st.error(f"Import impossible : {e}")
+            else:
+                st.success(f"{resultat['imported']} transactions importées, "
+                           f"{resultat['duplicates']} déjà présentes ignorées.")
+
     # Affichage du tableau des transactions récentes
     st.header("Transactions récentes")
     transactions = st.session_state.app_controller.get_transactions()
     if transactions:
-        # Création d'un DataFrame à partir des transactions
-        df = pd.DataFrame([t.to_dict() for t in transactions])
-        df['Montant (€)'] = df['amount'].apply(lambda x: f"{x:.2f}€")
-        st.write(df[['date', 'Montant (€)', 'category']])
+        # Filtrage, tri et pagination effectués par l'AppController : seule la page affichée est transmise
+        col_categorie, col_periode, col_montant = st.columns(3)
+        filtre_categorie = col_categorie.selectbox("Filtrer par catégorie",
+                                                   ["Toutes"] + sorted(st.session_state.app_controller.get_total_by_category()))
+        periode = col_periode.date_input("Période", value=())
+        montant_min = col_montant.number_input("Montant minimal (€)", value=None, step=1.0)
+        montant_max = col_montant.number_input("Montant maximal (€)", value=None, step=1.0)
+        col_tri, col_ordre, col_taille = st.columns(3)
+        tri = TRIS[col_tri.selectbox("Trier par", list(TRIS))]
+        decroissant = col_ordre.radio("Ordre", ["Décroissant", "Croissant"], horizontal=True) == "Décroissant"
+        taille_page = col_taille.selectbox("Transactions par page", [25, 50, 100], index=1)
+
+        filtres = dict(
+            category=None if filtre_categorie == "Toutes" else filtre_categorie,
+            start_date=periode[0] if len(periode) > 0 else None,
+            end_date=datetime.combine(periode[-1], datetime.max.time()) if len(periode) > 1 else None,
+            min_amount=montant_min,
+            max_amount=montant_max,
+            sort_by=tri,
+            descending=decroissant
+        )
+        page = st.number_input("Page", min_value=1, value=1)
+        resultat = st.session_state.app_controller.query_transactions(
+            **filtres, offset=(page - 1) * taille_page, limit=taille_page)
+        nombre_pages = max((resultat['total'] + taille_page - 1) // taille_page, 1)
+        st.write(f"{resultat['total']} transactions correspondantes (page {page} sur {nombre_pages})")
+        st.dataframe(pd.DataFrame({
+            'date': [t.date for t in resultat['transactions']],
+            'Montant (€)': [f"{t.amount:.2f}€" for t in resultat['transactions']],
+            'category': [t.category for t in resultat['transactions']],
+            'description': [t.description for t in resultat['transactions']]
+        }), hide_index=True)
     else:
         st.write("Aucune transaction pour l'instant.")
 
+    # Recherche plein texte dans les descriptions (index inversé, le dernier mot peut être incomplet)
+    if transactions:
+        st.header("Rechercher une transaction")
+        col_requete, col_periode_recherche = st.columns(2)
+        requete = col_requete.text_input("Mots recherchés (ex. : amazon)")
+        periode_recherche = col_periode_recherche.date_input("Période", value=(), key="periode_recherche")
+        if requete.strip():
+            suggestions = st.session_state.app_controller.suggest_search_terms(requete, limit=5)
+            if suggestions:
+                st.caption("Suggestions : " + ", ".join(suggestions))
+            resultat_recherche = st.session_state.app_controller.search(
+                requete, date_range=tuple(periode_recherche) if len(periode_recherche) == 2 else None, limit=100)
+            st.write(f"{resultat_recherche['total']} transactions trouvées")
+            st.dataframe(pd.DataFrame({
+                'date': [t.date for t in resultat_recherche['transactions']],
+                'Montant (€)': [f"{t.amount:.2f}€" for t in resultat_recherche['transactions']],
+                'category': [t.category for t in resultat_recherche['transactions']],
+                'description': [t.description for t in resultat_recherche['transactions']]
+            }), hide_index=True)
+
+    # Bilan d'une période comparé à la période précédente (agrégats mensuels, sans parcours des transactions)
+    if transactions:
+        st.header("Bilan de la période")
+        col_type_periode, col_comparaison = st.columns(2)
+        type_periode = PERIODES[col_type_periode.selectbox("Période", list(PERIODES))]
+        comparaison = COMPARAISONS[col_comparaison.selectbox("Comparer à", list(COMPARAISONS))]
+        bilan = st.session_state.app_controller.compare_periods(type_periode, against=comparaison)
+        col_entrees, col_sorties, col_net = st.columns(3)
+        col_entrees.metric("Entrées", f"{bilan['current']['income']:.2f}€",
+                           f"{bilan['current']['income'] - bilan['previous']['income']:+.2f}€")
+        col_sorties.metric("Sorties", f"{bilan['current']['expense']:.2f}€",
+                           f"{bilan['current']['expense'] - bilan['previous']['expense']:+.2f}€")
+        col_net.metric("Solde net", f"{bilan['current']['net']:.2f}€", f"{bilan['changes']['net']:+.2f}€")
+        if bilan['changes']['categories']:
+            st.dataframe(pd.DataFrame({
+                'category': list(bilan['changes']['categories']),
+                'période (€)': [bilan['current']['categories'].get(c, {}).get('net', 0.0)
+                                for c in bilan['changes']['categories']],
+                'précédente (€)': [bilan['previous']['categories'].get(c, {}).get('net', 0.0)
+                                   for c in bilan['changes']['categories']],
+                'écart (€)': list(bilan['changes']['categories'].values())
+            }), hide_index=True)
+
     # Visualisation des données avec Matplotlib
     st.header("Visualisation des Dépenses et Revenus")
     if transactions:
-        df = pd.DataFrame([t.to_dict() for t in transactions])
-        
-        # Séparation des dépenses et des revenus
-        expenses = df[df['amount'] < 0].copy()
-        incomes = df[df['amount'] > 0].copy()
-        
-        # Conversion des dépenses en valeurs positives pour la visualisation
-        expenses['amount'] = expenses['amount'].abs()
-        
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 7))
-        
-        # Graphique des dépenses
-        if not expenses.empty:
-            expenses.groupby('category')['amount'].sum().plot(kind='pie', autopct='%1.1f%%', ax=ax1, title='Répartition des Dépenses')
-        else:
-            ax1.text(0.5, 0.5, 'Pas de dépenses', ha='center', va='center')
-        ax1.set_ylabel('')
-        
-        # Graphique des revenus
-        if not incomes.empty:
-            incomes.groupby('category')['amount'].sum().plot(kind='pie', autopct='%1.1f%%', ax=ax2, title='Répartition des Revenus')
-        else:
-            ax2.text(0.5, 0.5, 'Pas de revenus', ha='center', va='center')
-        ax2.set_ylabel('')
-        
-        st.pyplot(fig)
+        # Les graphiques ne sont redessinés que si les données ont changé depuis le dernier affichage
+        version = st.session_state.app_controller.data_version
+        if st.session_state.get('graphiques', (None, None))[0] != version:
+            repartition = st.session_state.app_controller.get_category_breakdown()
+            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 7))
+
+            # Graphique des dépenses
+            if not repartition['expenses'].empty:
+                repartition['expenses'].plot(kind='pie', autopct='%1.1f%%', ax=ax1, title='Répartition des Dépenses')
+            else:
+                ax1.text(0.5, 0.5, 'Pas de dépenses', ha='center', va='center')
+            ax1.set_ylabel('')
+
+            # Graphique des revenus
+            if not repartition['incomes'].empty:
+                repartition['incomes'].plot(kind='pie', autopct='%1.1f%%', ax=ax2, title='Répartition des Revenus')
+            else:
+                ax2.text(0.5, 0.5, 'Pas de revenus', ha='center', va='center')
+            ax2.set_ylabel('')
+
+            plt.close(fig)
+            st.session_state.graphiques = (version, fig)
+        st.pyplot(st.session_state.graphiques[1])
     else:
         st.write("Aucune transaction pour générer un graphique.")
 
-    # Génération et téléchargement du rapport CSV
+    # Projection du solde par simulation de Monte-Carlo
+    st.header("Projection du solde")
+    if transactions:
+        jours = st.slider("Horizon de la projection (jours)", min_value=7, max_value=180, value=30)
+        # La simulation n'est relancée que si les données, l'horizon, le seuil ou le jour ont changé
+        cle = (st.session_state.app_controller.data_version, jours,
+               st.session_state.app_controller.get_low_threshold(), date.today())
+        if st.session_state.get('projection', (None, None))[0] != cle:
+            st.session_state.projection = (cle, st.session_state.app_controller.get_low_balance_risk(
+                jours, time_budget=config.MONTE_CARLO_TIME_BUDGET))
+        projection = st.session_state.projection[1]
+        bandes = pd.DataFrame({f"{p:g}e centile": bande for p, bande in projection['bands'].items()},
+                              index=pd.date_range(date.today(), periods=jours, freq='D') + pd.Timedelta(days=1))
+        st.line_chart(bandes)
+        st.write(f"Probabilité de passer sous le seuil bas de {st.session_state.app_controller.get_low_threshold()}€ "
+                 f"dans les {jours} prochains jours : {projection['probability_below']:.0%} "
+                 f"({projection['paths']} trajectoires simulées)")
+    else:
+        st.write("Aucune transaction pour établir une projection.")
+
+    # Génération et téléchargement du rapport
     st.header("Génération de rapport")
     if transactions:
-        df_report = df[['date', 'amount', 'category']]
-        csv_buffer = io.StringIO()
-        df_report['amount'] = df_report['amount'].apply(lambda x: f"{x:.2f}€")
-        df_report.to_csv(csv_buffer, index=False, sep=',')
-
-        st.download_button(
-            label="Télécharger rapport CSV",
-            data=csv_buffer.getvalue(),
-            file_name=f"rapport_financier_{datetime.now().strftime('%Y_%m')}.csv",
-            mime='text/csv',
-        )
+        periode_rapport = st.date_input("Période du rapport", value=(date.today().replace(day=1), date.today()),
+                                        key="periode_rapport")
+        format_rapport = st.selectbox("Format du rapport", list(FORMATS_RAPPORT))
+        if len(periode_rapport) == 2 and st.button("Préparer le rapport"):
+            # Le rapport est écrit par paquets dans un fichier temporaire, sans DataFrame intermédiaire
+            with tempfile.TemporaryDirectory() as dossier:
+                chemin = os.path.join(dossier, f"rapport.{format_rapport}")
+                nombre = st.session_state.app_controller.export_report(
+                    chemin, periode_rapport[0], datetime.combine(periode_rapport[1], datetime.max.time()),
+                    fmt=format_rapport)
+                with open(chemin, 'rb') as fichier:
+                    st.download_button(
+                        label=f"Télécharger le rapport ({nombre} transactions)",
+                        data=fichier,
+                        file_name=f"rapport_financier_{periode_rapport[0]:%Y_%m_%d}_{periode_rapport[1]:%Y_%m_%d}.{format_rapport}",
+                        mime=FORMATS_RAPPORT[format_rapport],
+                    )
     else:
-        st.write("Aucune transaction pour générer un rapport.")
\ No newline at end of file
+        st.write("Aucune transaction pour générer un rapport.")
@@ -0,0 +1,47 @@
+# Configuration globale de l'application
+
+# Catégories proposées dans les formulaires de saisie
+CATEGORIES = ["Courses", "Divertissement", "Voyage", "Restaurants", "Virements",
+              "Transport", "Santé", "Achat", "Services", "Autre"]
+
+# Stockage des données utilisateur
+STORAGE_BACKEND = 'json'  # 'json', 'sqlite' ou 'sharded'
+DATA_FILE = 'data/user_data.json'
+SQLITE_FILE = 'data/user_data.db'
+SHARD_DIR = 'data/users'  # Un fichier par utilisateur et un index (stockage 'sharded')
+
+# Persistance : 'sync' (sauvegarde après chaque modification) ou 'write_behind' (sauvegarde différée)
+PERSISTENCE_MODE = 'sync'
+AUTOSAVE_INTERVAL = 2.0  # Délai maximal (secondes) avant la sauvegarde différée
+AUTOSAVE_MAX_DIRTY = 20  # Modifications en attente déclenchant une sauvegarde immédiate
+
+# Import en masse : nombre de transactions ajoutées et sauvegardées à la fois
+IMPORT_CHUNK_SIZE = 5000
+IMPORT_INDEX_DIR = 'data/import_index'  # Index de déduplication des relevés importés, un fichier par utilisateur
+IMPORT_DEFAULT_CATEGORY = "Autre"  # Catégorie des lignes de relevé qui n'en ont pas
+
+# Index plein texte des descriptions (recherche), un fichier par utilisateur
+SEARCH_INDEX_DIR = 'data/search_index'
+
+# Agrégats mensuels par catégorie (rapports mensuels, trimestriels et annuels), un fichier par utilisateur
+ROLLUP_DIR = 'data/rollups'
+
+# Export des rapports : nombre de transactions lues et écrites à la fois
+REPORT_CHUNK_SIZE = 10000
+
+# Recalcul des montants dépensés des budgets à partir des transactions à la connexion
+BUDGET_RECOMPUTE_ON_LOAD = True
+
+# Projections de Monte-Carlo du solde
+MONTE_CARLO_PATHS = 10000  # Nombre de trajectoires simulées
+MONTE_CARLO_CHUNK_SIZE = 2500  # Trajectoires par paquet (un paquet par tâche de processus)
+MONTE_CARLO_WORKERS = None  # Nombre de processus (None : dans le processus courant)
+MONTE_CARLO_HISTORY_DAYS = 90  # Jours d'historique servant au tirage des flux
+MONTE_CARLO_TIME_BUDGET = 0.5  # Durée maximale (secondes) d'une projection dans l'interface web
+
+# Journal des modifications (mode de stockage journalisé)
+JOURNAL_ENABLED = True
+JOURNAL_DIR = 'data/journal'
+JOURNAL_FSYNC_BATCH = 32  # Nombre d'enregistrements entre deux fsync
+JOURNAL_FSYNC_INTERVAL = 1.0  # Délai maximal (secondes) entre deux fsync
+JOURNAL_COMPACT_THRESHOLD = 1000  # Enregistrements avant réécriture de l'instantané
@@ -1,8 +1,8 @@
-import csv
-from datetime import datetime
+from datetime import datetime, timedelta
 from PyQt5.QtWidgets import QLabel, QLineEdit, QPushButton, QComboBox, QVBoxLayout, QWidget, QMessageBox, QCheckBox, QDateEdit
 import matplotlib.pyplot as plt
 from services.app_controller import AppController
+import config
 
 class FinanceView(QWidget):
     def __init__(self, app_controller):
@@ -25,10 +25,7 @@ class FinanceView(QWidget):
 
         # Menu déroulant pour sélectionner la catégorie de la transaction
         self.categorie_input = QComboBox(self)
-        self.categorie_input.addItems([
-            "Courses", "Divertissement", "Voyage", "Restaurants", 
-            "Virements", "Transport", "Santé", "Achat", "Services", "Autre"
-        ])
+        self.categorie_input.addItems(config.CATEGORIES)
         layout.addWidget(self.categorie_input)
 
         # Case à cocher pour une transaction planifiée
@@ -45,7 +42,7 @@ class FinanceView(QWidget):
         layout.addWidget(self.btn_ajouter)
 
         # Label pour afficher le solde actuel
-        self.solde_label = QLabel(f"Solde actuel: {self.app_controller.get_balance()}", self)
+        self.solde_label = QLabel(f"Solde actuel: {self.app_controller.get_settled_balance()}", self)
         layout.addWidget(self.solde_label)
 
         # Bouton pour supprimer la dernière transaction
@@ -110,16 +107,14 @@ class FinanceView(QWidget):
             QMessageBox.warning(self, "Aucune transaction", "Il n'y a aucune transaction à inclure dans le rapport.")
             return
 
-        nom_fichier = f"rapport_finances_{datetime.now().strftime('%Y_%m')}.csv"
-        
-        with open(nom_fichier, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerow(["Date", "Montant", "Catégorie"])
-            
-            for transaction in transactions:
-                writer.writerow([transaction.date.strftime('%Y-%m-%d'), transaction.amount, transaction.category])
-        
-        QMessageBox.information(self, "Rapport généré", f"Le rapport a été sauvegardé sous le nom {nom_fichier}")
+        # Rapport du mois en cours uniquement, écrit par paquets
+        debut_mois = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        fin_mois = (debut_mois + timedelta(days=32)).replace(day=1) - timedelta(microseconds=1)
+        nom_fichier = f"rapport_finances_{debut_mois.strftime('%Y_%m')}.csv"
+        nombre = self.app_controller.export_report(nom_fichier, debut_mois, fin_mois)
+
+        QMessageBox.information(self, "Rapport généré",
+                                f"Le rapport ({nombre} transactions) a été sauvegardé sous le nom {nom_fichier}")
 
     def visualiser_repartition_depenses(self):
         """
@@ -143,5 +138,5 @@ class FinanceView(QWidget):
         Fonction pour mettre à jour l'affichage du solde.
         Elle récupère le solde actuel via AppController et met à jour le label correspondant.
         """
-        solde = self.app_controller.get_balance()
+        solde = self.app_controller.get_settled_balance()
         self.solde_label.setText(f"Solde actuel: {solde}")
\ No newline at end of file
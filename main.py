@@ -12,6 +12,8 @@ def main():
 
     # Initialiser le contrôleur de l'application
     app_controller = AppController()
+    # Rendre durables les modifications en attente à la fermeture
+    app.aboutToQuit.connect(app_controller.close)
 
     # Créer la fenêtre principale en lui passant le contrôleur
     main_window = MainWindow(app_controller)
@@ -77,8 +77,11 @@ class Budget:
         :param data: Dictionnaire contenant les données du budget
         :return: Une nouvelle instance de Budget
         """
-        data['period_start'] = datetime.fromisoformat(data['period_start'])
-        data['period_end'] = datetime.fromisoformat(data['period_end'])
+        data = dict(data)  # Ne pas modifier le dictionnaire source
+        if isinstance(data['period_start'], str):
+            data['period_start'] = datetime.fromisoformat(data['period_start'])
+        if isinstance(data['period_end'], str):
+            data['period_end'] = datetime.fromisoformat(data['period_end'])
         return cls(**data)
 
     def __str__(self):
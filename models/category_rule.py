@@ -0,0 +1,90 @@
+import re
+
+from utils.data_processing import normalize_description
+
+
+class CategoryRule:
+    """
+    Classe représentant une règle de catégorisation automatique des transactions.
+    Une règle reconnaît un mot-clé ou une expression régulière dans la description,
+    éventuellement limitée à une plage de montants ; une règle sans motif porte sur le montant seul.
+    """
+
+    def __init__(self, rule_id, category, keyword=None, pattern=None, min_amount=None, max_amount=None):
+        """
+        Initialise une nouvelle règle de catégorisation.
+
+        :param rule_id: Identifiant unique de la règle
+        :param category: Catégorie attribuée aux transactions reconnues
+        :param keyword: Mot ou groupe de mots à trouver dans la description (sans tenir compte
+                        de la casse, des accents ni de la ponctuation)
+        :param pattern: Expression régulière à trouver dans la description (sans tenir compte de la casse)
+        :param min_amount: Montant minimal, inclus (optionnel)
+        :param max_amount: Montant maximal, inclus (optionnel)
+        :raises ValueError: Si la règle n'a aucun critère, à la fois un mot-clé et une expression,
+                            ou une expression invalide
+        """
+        keyword = normalize_description(keyword) if keyword else None
+        if keyword is not None and pattern:
+            raise ValueError("Une règle porte sur un mot-clé ou sur une expression régulière, pas les deux")
+        if not keyword and not pattern and min_amount is None and max_amount is None:
+            raise ValueError("Une règle doit avoir un mot-clé, une expression régulière ou une plage de montants")
+        if pattern:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Expression régulière invalide : {pattern!r} ({e})") from e
+        self.rule_id = rule_id
+        self.category = category
+        self.keyword = keyword or None
+        self.pattern = pattern or None
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+
+    def matches_amount(self, amount):
+        """
+        Vérifie qu'un montant est dans la plage de la règle.
+
+        :param amount: Le montant (None : montant inconnu, seules les règles sans plage s'appliquent)
+        :return: True si le montant est accepté
+        """
+        if self.min_amount is None and self.max_amount is None:
+            return True
+        if amount is None:
+            return False
+        return ((self.min_amount is None or amount >= self.min_amount)
+                and (self.max_amount is None or amount <= self.max_amount))
+
+    def to_dict(self):
+        """
+        Convertit l'objet CategoryRule en dictionnaire pour la sérialisation.
+
+        :return: Un dictionnaire représentant la règle
+        """
+        return {
+            'rule_id': self.rule_id,
+            'category': self.category,
+            'keyword': self.keyword,
+            'pattern': self.pattern,
+            'min_amount': self.min_amount,
+            'max_amount': self.max_amount
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Crée une instance de CategoryRule à partir d'un dictionnaire.
+
+        :param data: Dictionnaire contenant les données de la règle
+        :return: Une nouvelle instance de CategoryRule
+        """
+        return cls(**data)
+
+    def __str__(self):
+        """
+        Retourne une représentation en chaîne de caractères de la règle.
+
+        :return: Chaîne de caractères représentant la règle
+        """
+        criterion = self.keyword or self.pattern or "montant"
+        return f"CategoryRule(id={self.rule_id}, {criterion!r} -> {self.category}, [{self.min_amount}, {self.max_amount}])"
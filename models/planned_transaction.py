@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta
+import calendar
+
+
+FREQUENCIES = (None, 'daily', 'weekly', 'monthly', 'yearly')
+
+
+def _add_months(date, months, day):
+    """
+    Ajoute un nombre de mois à une date, en conservant le jour d'ancrage si possible
+    (le 31 devient le dernier jour des mois plus courts).
+    """
+    month_index = date.month - 1 + months
+    year, month = date.year + month_index // 12, month_index % 12 + 1
+    return date.replace(year=year, month=month, day=min(day, calendar.monthrange(year, month)[1]))
+
+
+class PlannedTransaction:
+    """
+    Classe représentant une transaction planifiée, ponctuelle ou récurrente.
+    Seule la prochaine échéance est stockée : les occurrences suivantes sont calculées à la demande.
+    """
+
+    def __init__(self, plan_id, user_id, amount, category, description="", next_date=None,
+                 frequency=None, interval=1, end_date=None, anchor_day=None):
+        """
+        Initialise une nouvelle transaction planifiée.
+
+        :param plan_id: Identifiant unique de la planification
+        :param user_id: Identifiant de l'utilisateur associé
+        :param amount: Montant de chaque occurrence (positif pour les revenus, négatif pour les dépenses)
+        :param category: Catégorie des transactions générées
+        :param description: Description des transactions générées
+        :param next_date: Date de la prochaine échéance (par défaut maintenant)
+        :param frequency: None (ponctuelle), 'daily', 'weekly', 'monthly' ou 'yearly'
+        :param interval: Nombre de périodes entre deux échéances (par exemple 2 avec 'weekly' : toutes les deux semaines)
+        :param end_date: Date après laquelle la récurrence s'arrête (optionnel)
+        :param anchor_day: Jour du mois des échéances mensuelles et annuelles (par défaut celui de next_date)
+        """
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"Fréquence inconnue : {frequency}")
+        self.plan_id = plan_id
+        self.user_id = user_id
+        self.amount = amount
+        self.category = category
+        self.description = description
+        self.next_date = next_date if next_date else datetime.now()
+        self.frequency = frequency
+        self.interval = max(int(interval), 1)
+        self.end_date = end_date
+        self.anchor_day = anchor_day or self.next_date.day
+
+    def following_date(self, date):
+        """
+        Calcule l'échéance qui suit une date d'échéance donnée.
+
+        :param date: Une date d'échéance
+        :return: L'échéance suivante, ou None si la planification est terminée
+        """
+        if self.frequency is None:
+            return None
+        if self.frequency == 'daily':
+            following = date + timedelta(days=self.interval)
+        elif self.frequency == 'weekly':
+            following = date + timedelta(weeks=self.interval)
+        elif self.frequency == 'monthly':
+            following = _add_months(date, self.interval, self.anchor_day)
+        else:
+            following = _add_months(date, 12 * self.interval, self.anchor_day)
+        if self.end_date is not None and following > self.end_date:
+            return None
+        return following
+
+    def advance(self):
+        """
+        Passe à l'échéance suivante.
+
+        :return: True s'il reste une échéance, False si la planification est terminée
+        """
+        self.next_date = self.following_date(self.next_date)
+        return self.next_date is not None
+
+    def occurrences(self, until):
+        """
+        Génère les dates d'échéance à venir, de la prochaine jusqu'à une date donnée (incluse),
+        sans modifier la planification.
+
+        :param until: Date limite
+        :return: Un générateur de dates
+        """
+        date = self.next_date
+        while date is not None and date <= until:
+            yield date
+            date = self.following_date(date)
+
+    def to_transaction_dict(self, date):
+        """
+        Construit la transaction correspondant à une échéance (au format accepté par FinanceManager.add_transactions).
+
+        :param date: La date de l'échéance
+        :return: Un dictionnaire représentant la transaction
+        """
+        return {'amount': self.amount, 'category': self.category, 'description': self.description, 'date': date}
+
+    def to_dict(self):
+        """
+        Convertit l'objet PlannedTransaction en dictionnaire pour la sérialisation.
+
+        :return: Un dictionnaire représentant la transaction planifiée
+        """
+        return {
+            'plan_id': self.plan_id,
+            'user_id': self.user_id,
+            'amount': self.amount,
+            'category': self.category,
+            'description': self.description,
+            'next_date': self.next_date.isoformat() if self.next_date else None,
+            'frequency': self.frequency,
+            'interval': self.interval,
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'anchor_day': self.anchor_day
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Crée une instance de PlannedTransaction à partir d'un dictionnaire.
+
+        :param data: Dictionnaire contenant les données de la transaction planifiée
+        :return: Une nouvelle instance de PlannedTransaction
+        """
+        data = dict(data)  # Ne pas modifier le dictionnaire source
+        for key in ('next_date', 'end_date'):
+            if isinstance(data.get(key), str):
+                data[key] = datetime.fromisoformat(data[key])
+        return cls(**data)
+
+    def __str__(self):
+        """
+        Retourne une représentation en chaîne de caractères de la transaction planifiée.
+
+        :return: Chaîne de caractères représentant la transaction planifiée
+        """
+        recurrence = self.frequency or "ponctuelle"
+        return f"Planifiée ({recurrence}) : {self.amount}€ - {self.category} - prochaine le {self.next_date.strftime('%Y-%m-%d')}"
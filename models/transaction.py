@@ -1,10 +1,42 @@
 from datetime import datetime
 
+def _stored_field(name):
+    """
+    Crée une propriété dont la valeur est lue dans le TransactionStore auquel
+    la transaction est liée, ou dans l'objet lui-même si elle est indépendante.
+    """
+    attribute = '_' + name
+
+    def getter(self):
+        if self._store is not None:
+            return self._store.get_value(self._row, name)
+        return self.__dict__[attribute]
+
+    def setter(self, value):
+        if self._store is not None:
+            self._store.set_value(self._row, name, value)
+        else:
+            self.__dict__[attribute] = value
+
+    return property(getter, setter)
+
 class Transaction:
     """
     Classe représentant une transaction financière.
+    Une transaction peut être indépendante ou liée à une ligne d'un TransactionStore ;
+    dans ce cas ses champs sont lus et écrits directement dans les colonnes du stockage.
     """
 
+    _store = None
+    _row = None
+
+    transaction_id = _stored_field('transaction_id')
+    user_id = _stored_field('user_id')
+    amount = _stored_field('amount')
+    category = _stored_field('category')
+    description = _stored_field('description')
+    date = _stored_field('date')
+
     def __init__(self, transaction_id, user_id, amount, category, description="", date=None):
         """
         Initialise une nouvelle transaction.
@@ -29,6 +61,41 @@ class Transaction:
         else:
             self.date = datetime.now()
 
+    @classmethod
+    def bind(cls, store, row):
+        """
+        Crée une transaction liée à une ligne d'un TransactionStore, sans copier ses valeurs.
+
+        :param store: Le TransactionStore contenant la transaction
+        :param row: L'indice de la ligne
+        :return: Une transaction liée
+        """
+        transaction = cls.__new__(cls)
+        transaction.attach(store, row)
+        return transaction
+
+    def attach(self, store, row):
+        """
+        Lie la transaction à une ligne d'un TransactionStore (qui contient déjà ses valeurs).
+        """
+        for name in ('transaction_id', 'user_id', 'amount', 'category', 'description', 'date'):
+            self.__dict__.pop('_' + name, None)
+        self._store = store
+        self._row = row
+
+    def detach(self):
+        """
+        Copie les valeurs de la ligne dans l'objet et le rend indépendant du stockage.
+        """
+        if self._store is None:
+            return
+        values = {name: self._store.get_value(self._row, name)
+                  for name in ('transaction_id', 'user_id', 'amount', 'category', 'description', 'date')}
+        self._store = None
+        self._row = None
+        for name, value in values.items():
+            setattr(self, name, value)
+
     # Les méthodes suivantes restent inchangées
     def is_expense(self):
         """
@@ -69,6 +136,7 @@ class Transaction:
         :param data: Dictionnaire contenant les données de la transaction
         :return: Une nouvelle instance de Transaction
         """
+        data = dict(data)  # Ne pas modifier le dictionnaire source
         if isinstance(data['date'], str):
             data['date'] = datetime.fromisoformat(data['date'])
         return cls(**data)
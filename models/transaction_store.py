@@ -0,0 +1,833 @@
+import weakref
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from models.transaction import Transaction
+
+
+class _CodeTable:
+    """
+    Table de correspondance entre des valeurs (catégories, descriptions...) et des codes entiers.
+    """
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def encode_many(self, values):
+        return np.fromiter((self.encode(value) for value in values), dtype=np.int32)
+
+    def decode(self, code):
+        return self.values[code]
+
+
+class _DateIndex:
+    """
+    Index secondaire des lignes triées par date, maintenu trié au fil des modifications.
+    Les recherches par intervalle se font par dichotomie (np.searchsorted) : O(log n + k).
+    Une ligne retirée est marquée (-1) plutôt qu'effacée ; les marques sont éliminées en un
+    seul passage lorsqu'elles dépassent la moitié de l'index : O(1) amorti par retrait.
+    """
+
+    def __init__(self, dates: np.ndarray):
+        """
+        Construit l'index à partir de la colonne des dates.
+
+        :param dates: Dates de chaque ligne du stockage
+        """
+        n = len(dates)
+        order = np.argsort(dates, kind='stable')
+        capacity = max(16, n * 2)
+        self._size = n
+        self._rows = np.empty(capacity, dtype=np.int64)
+        self._rows[:n] = order
+        self._dates = np.empty(capacity, dtype='datetime64[us]')
+        self._dates[:n] = dates[order]
+        self._dead = 0  # Entrées marquées comme retirées
+
+    def _grow(self):
+        if self._size < len(self._rows):
+            return
+        for name in ('_rows', '_dates'):
+            column = getattr(self, name)
+            grown = np.empty(len(column) * 2, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def insert(self, row: int, date: np.datetime64):
+        """
+        Ajoute une ligne à sa place dans l'ordre des dates (après les dates égales).
+        Un ajout chronologique, cas le plus fréquent, se fait en fin d'index en O(log n).
+        """
+        self._grow()
+        position = int(np.searchsorted(self._dates[:self._size], date, side='right'))
+        self._rows[position + 1:self._size + 1] = self._rows[position:self._size]
+        self._dates[position + 1:self._size + 1] = self._dates[position:self._size]
+        self._rows[position] = row
+        self._dates[position] = date
+        self._size += 1
+
+    def _position(self, row: int, date: np.datetime64) -> int:
+        """
+        Position d'une ligne dans l'index (sa date est nécessaire pour la retrouver par dichotomie).
+        """
+        dates = self._dates[:self._size]
+        low = int(np.searchsorted(dates, date, side='left'))
+        high = int(np.searchsorted(dates, date, side='right'))
+        return low + int(np.flatnonzero(self._rows[low:high] == row)[0])
+
+    def remove(self, row: int, date: np.datetime64):
+        """
+        Retire une ligne de l'index.
+        """
+        self._rows[self._position(row, date)] = -1
+        self._dead += 1
+        if self._dead > self._size // 2:
+            live = self._rows[:self._size] >= 0
+            n = int(live.sum())
+            self._rows[:n] = self._rows[:self._size][live]
+            self._dates[:n] = self._dates[:self._size][live]
+            self._size, self._dead = n, 0
+
+    def move(self, row: int, new_row: int, date: np.datetime64):
+        """
+        Renumérote une ligne déplacée dans le stockage.
+        """
+        self._rows[self._position(row, date)] = new_row
+
+    def shift_rows(self, start: int, offset: int):
+        """
+        Décale les numéros de ligne à partir de `start` (après une insertion ou une suppression).
+        """
+        if start >= self._size + max(offset, 0):
+            return  # Ajout ou suppression en fin de stockage : aucune ligne à décaler
+        rows = self._rows[:self._size]
+        rows[rows >= start] += offset
+
+    def bounds(self, start=None, end=None):
+        """
+        Positions dans l'index des dates comprises entre start et end (incluses).
+        """
+        dates = self._dates[:self._size]
+        low = 0 if start is None else int(np.searchsorted(dates, np.datetime64(start, 'us'), side='left'))
+        high = self._size if end is None else int(np.searchsorted(dates, np.datetime64(end, 'us'), side='right'))
+        return low, max(low, high)
+
+    def rows(self, low: int, high: int) -> np.ndarray:
+        rows = self._rows[low:high]
+        return rows[rows >= 0] if self._dead else rows.copy()
+
+    @property
+    def size(self):
+        return self._size
+
+
+class _RollingWindow:
+    """
+    Sommes glissantes des entrées et des sorties sur les N derniers jours (aujourd'hui inclus),
+    dans un tampon circulaire d'un compartiment par jour. Les transactions datées dans le futur
+    sont comptées (comme dans une recherche « depuis N jours ») et rejoignent leur compartiment
+    quand la fenêtre avance jusqu'à leur date.
+    """
+
+    def __init__(self, days: int, today: int):
+        """
+        :param days: Taille de la fenêtre en jours
+        :param today: Jour courant (nombre de jours depuis l'epoch)
+        """
+        self.days = days
+        self.today = today
+        self.income = np.zeros(days)  # Compartiment du jour d, à l'indice d % days
+        self.expenses = np.zeros(days)
+        self.future = {}  # Jour futur -> [entrées, sorties]
+        self.income_sum = 0.0
+        self.expense_sum = 0.0
+
+    def add(self, day: int, amount: float, sign: int = 1):
+        """
+        Ajoute (sign=1) ou retire (sign=-1) un montant daté d'un jour donné.
+        """
+        if day <= self.today - self.days:
+            return  # Hors de la fenêtre
+        income, expense = (amount * sign, 0.0) if amount > 0 else (0.0, amount * sign)
+        self.income_sum += income
+        self.expense_sum += expense
+        if day > self.today:
+            bucket = self.future.setdefault(day, [0.0, 0.0])
+            bucket[0] += income
+            bucket[1] += expense
+        else:
+            self.income[day % self.days] += income
+            self.expenses[day % self.days] += expense
+
+    def advance(self, today: int) -> bool:
+        """
+        Fait avancer la fenêtre jusqu'au jour donné, en évinçant les jours sortis de la fenêtre.
+        Coût : O(nombre de jours écoulés).
+
+        :return: False si la fenêtre doit être reconstruite (retour en arrière ou saut plus long que la fenêtre)
+        """
+        if today < self.today or today - self.today >= self.days:
+            return today == self.today
+        for day in range(self.today + 1, today + 1):
+            slot = day % self.days
+            self.income_sum -= self.income[slot]
+            self.expense_sum -= self.expenses[slot]
+            # Les montants futurs sont déjà comptés dans les sommes : ils changent seulement de compartiment
+            self.income[slot], self.expenses[slot] = self.future.pop(day, (0.0, 0.0))
+        self.today = today
+        return True
+
+
+class TransactionStore:
+    """
+    Stockage en colonnes des transactions d'un utilisateur, avec l'interface d'une liste.
+
+    Les identifiants, montants, dates (datetime64) et codes de catégorie sont conservés
+    dans des tableaux NumPy ; les catégories, descriptions et identifiants utilisateur
+    sont stockés une seule fois dans des tables annexes. Les objets Transaction ne sont
+    construits qu'à la demande : ce sont des vues liées à une ligne du stockage, dont
+    les modifications sont répercutées dans les colonnes.
+    """
+
+    FIELDS = ('transaction_id', 'user_id', 'amount', 'category', 'description', 'date')
+
+    def __init__(self, transactions: Iterable[Transaction] = (), capacity: int = 16):
+        """
+        Initialise le stockage.
+
+        :param transactions: Transactions initiales (optionnel)
+        :param capacity: Nombre de lignes allouées au départ
+        """
+        self._size = 0
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._amounts = np.empty(capacity, dtype=np.float64)
+        self._dates = np.empty(capacity, dtype='datetime64[us]')
+        self._category_codes = np.empty(capacity, dtype=np.int32)
+        self._description_codes = np.empty(capacity, dtype=np.int32)
+        self._user_codes = np.empty(capacity, dtype=np.int32)
+        self._category_table = _CodeTable()
+        self._description_table = _CodeTable()
+        self._user_table = _CodeTable()
+        self._views = weakref.WeakValueDictionary()  # Objets Transaction vivants, par ligne
+        self._date_index = None  # Index par date, construit à la première recherche par période
+        self._id_rows = None  # Index identifiant -> ligne, construit à la première recherche
+        self._category_counts = {}  # Nombre de transactions par code de catégorie
+        self._windows = {}  # Fenêtres glissantes, par nombre de jours, construites à la première demande
+        self.id_high_water = 0  # Plus grand identifiant jamais stocké (ne diminue jamais)
+        self.version = 0  # Incrémenté à chaque modification
+        self.edit_version = 0  # Incrémenté à chaque modification autre qu'un ajout en fin de stockage
+        self.extend(transactions)
+
+    @classmethod
+    def from_dicts(cls, records: List[Dict]) -> 'TransactionStore':
+        """
+        Construit un stockage à partir de dictionnaires (voir Transaction.to_dict), colonne par colonne,
+        sans créer d'objet Transaction.
+
+        :param records: Liste de dictionnaires représentant des transactions
+        :return: Un nouveau TransactionStore
+        """
+        store = cls(capacity=max(len(records), 16))
+        store.extend_dicts(records)
+        store.version = 0
+        return store
+
+    @classmethod
+    def from_arrays(cls, ids: np.ndarray, amounts: np.ndarray, dates: np.ndarray,
+                    category_codes: np.ndarray, categories: List[str]) -> 'TransactionStore':
+        """
+        Construit un stockage directement à partir de colonnes (format compact, par exemple
+        pour transmettre les transactions d'un utilisateur à un autre processus).
+        Les descriptions sont vides et l'utilisateur n'est pas renseigné.
+
+        :param ids: Identifiants des transactions
+        :param amounts: Montants
+        :param dates: Dates (convertibles en datetime64[us])
+        :param category_codes: Indice de la catégorie de chaque transaction dans `categories`
+        :param categories: Noms des catégories
+        :return: Un nouveau TransactionStore
+        """
+        n = len(ids)
+        store = cls(capacity=max(n, 16))
+        store._ids[:n] = ids
+        store._amounts[:n] = amounts
+        store._dates[:n] = np.asarray(dates).astype('datetime64[us]')
+        store._category_table.encode_many(categories)
+        store._category_codes[:n] = category_codes
+        store._description_codes[:n] = store._description_table.encode("")
+        store._user_codes[:n] = store._user_table.encode(None)
+        store._size = n
+        for code, count in enumerate(np.bincount(store.category_codes, minlength=len(categories))):
+            if count:
+                store._count_category(code, int(count))
+        store.id_high_water = int(store.ids.max()) if n else 0
+        return store
+
+    def extend_dicts(self, records: List[Dict]):
+        """
+        Ajoute plusieurs transactions en fin de stockage à partir de dictionnaires,
+        colonne par colonne (une seule allocation, sans créer d'objet Transaction).
+
+        :param records: Liste de dictionnaires représentant des transactions
+        """
+        n = len(records)
+        if not n:
+            return
+        start, end = self._size, self._size + n
+        self._grow(end)
+        ids = np.fromiter((r['transaction_id'] for r in records), dtype=np.int64, count=n)
+        self._ids[start:end] = ids
+        self._amounts[start:end] = np.fromiter((r['amount'] for r in records), dtype=np.float64, count=n)
+        self._dates[start:end] = np.array([r['date'] for r in records], dtype='datetime64[us]')
+        self._category_codes[start:end] = self._category_table.encode_many(r['category'] for r in records)
+        self._description_codes[start:end] = self._description_table.encode_many(r.get('description', "") for r in records)
+        self._user_codes[start:end] = self._user_table.encode_many(r.get('user_id') for r in records)
+        self._size = end
+        for code, count in enumerate(np.bincount(self._category_codes[start:end])):
+            if count:
+                self._count_category(code, int(count))
+        self.id_high_water = max(self.id_high_water, int(ids.max()))
+        if self._id_rows is not None:
+            for row in range(start, end):
+                self._index_id(row)
+        # Reconstruire l'index par date en une fois coûte moins cher que n insertions
+        self._date_index = None
+        self._windows = {}
+        self.version += 1
+
+    # --- Accès aux colonnes -------------------------------------------------
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[:self._size]
+
+    @property
+    def amounts(self) -> np.ndarray:
+        return self._amounts[:self._size]
+
+    @property
+    def dates(self) -> np.ndarray:
+        return self._dates[:self._size]
+
+    @property
+    def category_codes(self) -> np.ndarray:
+        return self._category_codes[:self._size]
+
+    @property
+    def categories(self) -> List[str]:
+        """
+        Table des catégories : categories[code] est le nom de la catégorie.
+        """
+        return self._category_table.values
+
+    def category_code(self, category: str):
+        """
+        Retourne le code d'une catégorie, ou None si elle n'a jamais été utilisée.
+        """
+        return self._category_table.codes.get(category)
+
+    def descriptions(self) -> List[str]:
+        """
+        Retourne la description de chaque ligne.
+        """
+        table = self._description_table.values
+        return [table[code] for code in self._description_codes[:self._size]]
+
+    # --- Agrégats -----------------------------------------------------------
+
+    def total(self) -> float:
+        """
+        Somme des montants de toutes les transactions.
+        """
+        return float(self.amounts.sum())
+
+    def totals_by_category(self) -> Dict[str, float]:
+        """
+        Somme des montants par catégorie (catégories présentes uniquement).
+        """
+        codes = self.category_codes
+        totals = np.bincount(codes, weights=self.amounts, minlength=len(self.categories))
+        counts = np.bincount(codes, minlength=len(self.categories))
+        return {self.categories[code]: float(totals[code]) for code in np.flatnonzero(counts)}
+
+    def count_category(self, category: str) -> int:
+        """
+        Nombre de transactions d'une catégorie.
+        """
+        code = self.category_code(category)
+        return self._category_counts.get(code, 0)
+
+    def rows_for_category(self, category: str) -> np.ndarray:
+        """
+        Indices des lignes d'une catégorie donnée.
+        """
+        code = self.category_code(category)
+        if code is None:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.category_codes == code)
+
+    def _ensure_date_index(self) -> _DateIndex:
+        if self._date_index is None:
+            self._date_index = _DateIndex(self.dates)
+        return self._date_index
+
+    def rows_between(self, start_date: datetime = None, end_date: datetime = None) -> np.ndarray:
+        """
+        Indices des lignes dont la date est comprise entre deux dates (incluses), triés par date.
+        Une borne absente n'est pas limitée. Coût : O(log n + k).
+        """
+        index = self._ensure_date_index()
+        return index.rows(*index.bounds(start_date, end_date))
+
+    def rows_since(self, start_date: datetime) -> np.ndarray:
+        """
+        Indices des lignes datées à partir de start_date (fenêtres « N derniers jours »), triés par date.
+        """
+        return self.rows_between(start_date, None)
+
+    def trailing_sums(self, days: int = 30, today: date = None) -> Tuple[float, float]:
+        """
+        Entrées et sorties des `days` derniers jours (aujourd'hui inclus, ainsi que les transactions
+        datées dans le futur). La fenêtre est maintenue au fil des modifications et avance avec
+        le calendrier : O(1) par appel, hors changement de jour.
+
+        :param days: Taille de la fenêtre en jours
+        :param today: Jour courant (par défaut aujourd'hui)
+        :return: Un tuple (total des entrées, total des sorties) ; les sorties sont négatives
+        """
+        day = int(np.datetime64(today or date.today(), 'D').astype(np.int64))
+        window = self._windows.get(days)
+        if window is None or not window.advance(day):
+            window = _RollingWindow(days, day)
+            rows = self.rows_since(np.datetime64(day - days + 1, 'D'))
+            for row_day, amount in zip(self._dates[rows].astype('datetime64[D]').astype(np.int64).tolist(),
+                                       self._amounts[rows].tolist()):
+                window.add(row_day, amount)
+            self._windows[days] = window
+        return window.income_sum, window.expense_sum
+
+    def rows_by_date(self) -> np.ndarray:
+        """
+        Indices de toutes les lignes, triés par date.
+        """
+        return self.rows_between(None, None)
+
+    def balance_as_of(self, date: datetime, total: float = None) -> float:
+        """
+        Somme des montants des transactions datées au plus tard de `date`.
+        Seul le plus petit des deux côtés de la date est additionné : O(log n + min(k, n - k)).
+
+        :param date: Date de référence (incluse)
+        :param total: Somme de toutes les transactions, si elle est déjà connue
+        :return: Le solde à cette date
+        """
+        index = self._ensure_date_index()
+        _, position = index.bounds(None, date)
+        if total is not None and position > index.size // 2:
+            return total - float(self._amounts[index.rows(position, index.size)].sum())
+        return float(self._amounts[index.rows(0, position)].sum())
+
+    def find_row(self, transaction_id: int):
+        """
+        Retourne l'indice de la ligne portant un identifiant donné, ou None. Coût : O(1).
+        """
+        if self._id_rows is None:
+            self._build_id_index()
+        return self._id_rows.get(transaction_id)
+
+    def _build_id_index(self):
+        # Parcours à l'envers : en cas d'identifiants en double (anciennes données), la première ligne l'emporte
+        ids = self.ids.tolist()
+        self._id_rows = {ids[row]: row for row in range(len(ids) - 1, -1, -1)}
+        self._duplicate_ids = len(self._id_rows) < len(ids)
+
+    def to_columns(self, start: int = 0, end: int = None) -> Dict[str, object]:
+        """
+        Retourne les colonnes (par exemple pour construire un DataFrame pandas).
+
+        :param start: Première ligne retournée
+        :param end: Ligne de fin, exclue (par défaut la dernière ligne incluse)
+        """
+        rows = slice(start, self._size if end is None else min(end, self._size))
+        categories = self.categories
+        descriptions = self._description_table.values
+        return {
+            'transaction_id': self.ids[rows].copy(),
+            'amount': self.amounts[rows].copy(),
+            'category': [categories[code] for code in self.category_codes[rows]],
+            'description': [descriptions[code] for code in self._description_codes[:self._size][rows]],
+            'date': self.dates[rows].copy()
+        }
+
+    def columns_for_rows(self, rows: np.ndarray) -> Dict[str, object]:
+        """
+        Retourne les colonnes d'un sous-ensemble de lignes, dans l'ordre donné (voir to_columns).
+
+        :param rows: Indices des lignes
+        """
+        categories = self.categories
+        descriptions = self._description_table.values
+        return {
+            'transaction_id': self.ids[rows],
+            'amount': self.amounts[rows],
+            'category': [categories[code] for code in self.category_codes[rows]],
+            'description': [descriptions[code] for code in self._description_codes[rows]],
+            'date': self.dates[rows]
+        }
+
+    def to_dicts(self) -> List[Dict]:
+        """
+        Convertit toutes les lignes en dictionnaires (voir Transaction.to_dict).
+        """
+        categories = self._category_table.values
+        descriptions = self._description_table.values
+        user_ids = self._user_table.values
+        return [
+            {
+                'transaction_id': transaction_id,
+                'user_id': user_ids[user_code],
+                'amount': amount,
+                'category': categories[category_code],
+                'description': descriptions[description_code],
+                'date': date.isoformat()
+            }
+            for transaction_id, user_code, amount, category_code, description_code, date in zip(
+                self.ids.tolist(), self._user_codes[:self._size].tolist(), self.amounts.tolist(),
+                self.category_codes.tolist(), self._description_codes[:self._size].tolist(), self.dates.tolist())
+        ]
+
+    # --- Lecture et écriture d'une ligne -----------------------------------
+
+    def get_value(self, row: int, field: str):
+        """
+        Lit un champ d'une ligne, sous forme de valeur Python.
+        """
+        if field == 'amount':
+            return float(self._amounts[row])
+        if field == 'date':
+            return self._dates[row].item()
+        if field == 'category':
+            return self._category_table.decode(self._category_codes[row])
+        if field == 'description':
+            return self._description_table.decode(self._description_codes[row])
+        if field == 'transaction_id':
+            return int(self._ids[row])
+        if field == 'user_id':
+            return self._user_table.decode(self._user_codes[row])
+        raise KeyError(field)
+
+    def set_value(self, row: int, field: str, value):
+        """
+        Modifie un champ d'une ligne.
+        """
+        if field == 'amount':
+            self._window_add(row, -1)
+            self._amounts[row] = value
+            self._window_add(row, 1)
+        elif field == 'date':
+            if isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            date = np.datetime64(value, 'us')
+            if self._date_index is not None:
+                self._date_index.remove(row, self._dates[row])
+                self._date_index.insert(row, date)
+            self._window_add(row, -1)
+            self._dates[row] = date
+            self._window_add(row, 1)
+        elif field == 'category':
+            self._count_category(self._category_codes[row], -1)
+            self._category_codes[row] = self._category_table.encode(value)
+            self._count_category(self._category_codes[row], 1)
+        elif field == 'description':
+            self._description_codes[row] = self._description_table.encode(value)
+        elif field == 'transaction_id':
+            self._unindex_id(row)
+            self._ids[row] = value
+            self._index_id(row)
+        elif field == 'user_id':
+            self._user_codes[row] = self._user_table.encode(value)
+        else:
+            raise KeyError(field)
+        self.version += 1
+        self.edit_version += 1
+
+    def _view(self, row: int) -> Transaction:
+        """
+        Retourne l'objet Transaction lié à une ligne, en le créant si nécessaire.
+        """
+        view = self._views.get(row)
+        if view is None:
+            view = Transaction.bind(self, row)
+            self._views[row] = view
+        return view
+
+    def _write_row(self, row: int, transaction: Transaction):
+        self._ids[row] = transaction.transaction_id
+        self._amounts[row] = transaction.amount
+        self._dates[row] = np.datetime64(transaction.date, 'us')
+        self._category_codes[row] = self._category_table.encode(transaction.category)
+        self._description_codes[row] = self._description_table.encode(transaction.description)
+        self._user_codes[row] = self._user_table.encode(transaction.user_id)
+
+    def _count_category(self, code, delta: int):
+        code = int(code)
+        count = self._category_counts.get(code, 0) + delta
+        if count:
+            self._category_counts[code] = count
+        else:
+            self._category_counts.pop(code, None)
+
+    def _index_id(self, row: int):
+        transaction_id = int(self._ids[row])
+        self.id_high_water = max(self.id_high_water, transaction_id)
+        if self._id_rows is None:
+            return
+        if transaction_id in self._id_rows:
+            self._id_rows = None  # Identifiant en double : l'index sera reconstruit à la demande
+        else:
+            self._id_rows[transaction_id] = row
+
+    def _unindex_id(self, row: int):
+        if self._id_rows is None:
+            return
+        if self._duplicate_ids:
+            self._id_rows = None
+        else:
+            self._id_rows.pop(int(self._ids[row]), None)
+
+    def _window_add(self, row: int, sign: int):
+        if self._windows:
+            day = int(self._dates[row].astype('datetime64[D]').astype(np.int64))
+            amount = float(self._amounts[row])
+            for window in self._windows.values():
+                window.add(day, amount, sign)
+
+    def _index_row(self, row: int):
+        """
+        Ajoute une ligne (déjà écrite) aux index : dates, identifiants, compteurs de catégorie
+        et fenêtres glissantes.
+        """
+        if self._date_index is not None:
+            self._date_index.insert(row, self._dates[row])
+        self._index_id(row)
+        self._count_category(self._category_codes[row], 1)
+        self._window_add(row, 1)
+
+    def _unindex_row(self, row: int):
+        """
+        Retire une ligne des index, avant qu'elle ne soit supprimée ou remplacée.
+        """
+        if self._date_index is not None:
+            self._date_index.remove(row, self._dates[row])
+        self._unindex_id(row)
+        self._count_category(self._category_codes[row], -1)
+        self._window_add(row, -1)
+
+    def _shift_rows(self, start: int, offset: int):
+        """
+        Met à jour les numéros de ligne après le déplacement des colonnes : les lignes
+        qui étaient à partir de `start` sont maintenant à `row + offset`.
+        """
+        self._shift_views(start, offset)
+        if self._date_index is not None:
+            self._date_index.shift_rows(start, offset)
+        if self._id_rows is not None:
+            # Seules les lignes déplacées sont concernées : O(1) pour un ajout ou une suppression en fin
+            id_rows = self._id_rows
+            for row, transaction_id in enumerate(self._ids[start + offset:self._size].tolist(), start + offset):
+                id_rows[transaction_id] = row
+
+    def _grow(self, needed: int):
+        capacity = len(self._ids)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        for name in ('_ids', '_amounts', '_dates', '_category_codes', '_description_codes', '_user_codes'):
+            column = getattr(self, name)
+            grown = np.empty(new_capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def _shift_views(self, start: int, offset: int):
+        """
+        Met à jour les lignes des vues vivantes après une insertion ou une suppression.
+        """
+        moved = [(row, view) for row, view in self._views.items() if row >= start]
+        for row, _ in moved:
+            del self._views[row]
+        for row, view in moved:
+            view._row = row + offset
+            self._views[row + offset] = view
+
+    # --- Interface de liste -------------------------------------------------
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for row in range(self._size):
+            yield self._view(row)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._view(row) for row in range(*index.indices(self._size))]
+        return self._view(self._normalize_index(index))
+
+    def __setitem__(self, index, transaction: Transaction):
+        row = self._normalize_index(index)
+        old = self._views.pop(row, None)
+        if old is not None:
+            old.detach()
+        self._unindex_row(row)
+        self._write_row(row, transaction)
+        self._index_row(row)
+        self._adopt(row, transaction)
+        self.version += 1
+        self.edit_version += 1
+
+    def __delitem__(self, index):
+        self.pop(index)
+
+    def __contains__(self, transaction):
+        return isinstance(transaction, Transaction) and transaction._store is self
+
+    def __repr__(self):
+        return f"TransactionStore({self._size} transactions)"
+
+    def _normalize_index(self, index: int) -> int:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("transaction index out of range")
+        return index
+
+    def _adopt(self, row: int, transaction: Transaction):
+        """
+        Lie un objet Transaction libre à sa ligne, afin que l'appelant conserve le même objet.
+        """
+        if transaction._store is None:
+            transaction.attach(self, row)
+            self._views[row] = transaction
+
+    def append(self, transaction: Transaction):
+        """
+        Ajoute une transaction en fin de stockage.
+        """
+        self._grow(self._size + 1)
+        row = self._size
+        self._write_row(row, transaction)
+        self._size += 1
+        self._index_row(row)
+        self._adopt(row, transaction)
+        self.version += 1
+
+    def extend(self, transactions: Iterable[Transaction]):
+        """
+        Ajoute plusieurs transactions en fin de stockage.
+        """
+        for transaction in transactions:
+            self.append(transaction)
+
+    def insert(self, index: int, transaction: Transaction):
+        """
+        Insère une transaction avant la position donnée.
+        """
+        index = min(max(index + self._size if index < 0 else index, 0), self._size)
+        self._grow(self._size + 1)
+        for name in ('_ids', '_amounts', '_dates', '_category_codes', '_description_codes', '_user_codes'):
+            column = getattr(self, name)
+            column[index + 1:self._size + 1] = column[index:self._size]
+        self._size += 1
+        self._shift_rows(index, 1)
+        self._write_row(index, transaction)
+        self._index_row(index)
+        self._adopt(index, transaction)
+        self.version += 1
+        self.edit_version += 1
+
+    def pop(self, index: int = -1) -> Transaction:
+        """
+        Retire une transaction et la retourne (sous forme d'objet indépendant du stockage).
+        """
+        row = self._normalize_index(index)
+        transaction = self._views.pop(row, None) or Transaction.bind(self, row)
+        transaction.detach()
+        self._unindex_row(row)
+        for name in ('_ids', '_amounts', '_dates', '_category_codes', '_description_codes', '_user_codes'):
+            column = getattr(self, name)
+            column[row:self._size - 1] = column[row + 1:self._size]
+        self._size -= 1
+        self._shift_rows(row + 1, -1)
+        self.version += 1
+        self.edit_version += 1
+        return transaction
+
+    def swap_pop(self, index: int = -1) -> Transaction:
+        """
+        Retire une transaction en O(1) : la dernière ligne prend sa place, sans décaler les suivantes.
+        Contrairement à pop, l'ordre des lignes n'est pas conservé.
+
+        :param index: Position de la transaction à retirer
+        :return: La transaction retirée (sous forme d'objet indépendant du stockage)
+        """
+        row = self._normalize_index(index)
+        last = self._size - 1
+        transaction = self._views.pop(row, None) or Transaction.bind(self, row)
+        transaction.detach()
+        self._unindex_row(row)
+        if row != last:
+            for name in ('_ids', '_amounts', '_dates', '_category_codes', '_description_codes', '_user_codes'):
+                column = getattr(self, name)
+                column[row] = column[last]
+            if self._date_index is not None:
+                self._date_index.move(last, row, self._dates[row])
+            if self._id_rows is not None:
+                self._id_rows[int(self._ids[row])] = row
+            view = self._views.pop(last, None)
+            if view is not None:
+                view._row = row
+                self._views[row] = view
+        self._size -= 1
+        self.version += 1
+        self.edit_version += 1
+        return transaction
+
+    def remove(self, transaction: Transaction):
+        """
+        Retire une transaction donnée.
+        """
+        self.pop(self.index(transaction))
+
+    def index(self, transaction: Transaction) -> int:
+        """
+        Retourne la position d'une transaction du stockage.
+        """
+        if transaction._store is self:
+            return transaction._row
+        raise ValueError("transaction is not in store")
+
+    def clear(self):
+        """
+        Retire toutes les transactions.
+        """
+        for view in list(self._views.values()):
+            view.detach()
+        self._views = weakref.WeakValueDictionary()
+        self._date_index = None
+        self._id_rows = None
+        self._category_counts = {}
+        self._windows = {}
+        self._size = 0
+        self.version += 1
+        self.edit_version += 1
@@ -1,11 +1,12 @@
 from datetime import datetime
+from models.transaction_store import TransactionStore
 
 class User:
     """
     Classe représentant un utilisateur de l'application de finances personnelles.
     """
 
-    def __init__(self, user_id, username, email, created_at=None):
+    def __init__(self, user_id, username, email, created_at=None, next_transaction_id=1, next_plan_id=1):
         """
         Initialise un nouvel utilisateur.
 
@@ -13,13 +14,53 @@ class User:
         :param username: Nom d'utilisateur
         :param email: Adresse email de l'utilisateur
         :param created_at: Date de création du compte (par défaut à la date actuelle si non spécifiée)
+        :param next_transaction_id: Prochain identifiant de transaction à attribuer (persisté entre les sessions)
+        :param next_plan_id: Prochain identifiant de transaction planifiée à attribuer
         """
         self.user_id = user_id
         self.username = username
         self.email = email
         self.created_at = created_at if created_at else datetime.now()
-        self.transactions = []  # Liste pour stocker les transactions de l'utilisateur
+        self.transactions = TransactionStore()  # Stockage en colonnes des transactions de l'utilisateur
         self.budgets = []  # Liste pour stocker les budgets de l'utilisateur
+        self.planned_transactions = {}  # Transactions planifiées, par identifiant
+        self.category_rules = []  # Règles de catégorisation automatique, par ordre de priorité
+        self.next_transaction_id = next_transaction_id
+        self.next_plan_id = next_plan_id
+
+    @property
+    def transactions(self):
+        """
+        Transactions de l'utilisateur (TransactionStore, utilisable comme une liste).
+        """
+        return self._transactions
+
+    @transactions.setter
+    def transactions(self, transactions):
+        if not isinstance(transactions, TransactionStore):
+            transactions = TransactionStore(transactions)
+        self._transactions = transactions
+
+    def allocate_transaction_id(self):
+        """
+        Attribue un nouvel identifiant de transaction. Les identifiants ne sont jamais
+        réutilisés, même après la suppression d'une transaction.
+
+        :return: Le nouvel identifiant
+        """
+        transaction_id = max(self.next_transaction_id, self.transactions.id_high_water + 1)
+        self.next_transaction_id = transaction_id + 1
+        return transaction_id
+
+    def allocate_plan_id(self):
+        """
+        Attribue un nouvel identifiant de transaction planifiée.
+
+        :return: Le nouvel identifiant
+        """
+        plan_id = max(self.next_plan_id, max(self.planned_transactions, default=0) + 1)
+        self.next_plan_id = plan_id + 1
+        return plan_id
 
     def add_transaction(self, transaction):
         """
@@ -37,13 +78,50 @@ class User:
         """
         self.budgets.append(budget)
 
+    def add_planned_transaction(self, plan):
+        """
+        Ajoute une transaction planifiée à l'utilisateur.
+
+        :param plan: Objet PlannedTransaction à ajouter
+        """
+        self.planned_transactions[plan.plan_id] = plan
+
+    def remove_planned_transaction(self, plan_id):
+        """
+        Retire une transaction planifiée de l'utilisateur.
+
+        :param plan_id: L'identifiant de la transaction planifiée
+        :return: La transaction planifiée retirée, ou None si elle n'existe pas
+        """
+        return self.planned_transactions.pop(plan_id, None)
+
+    def add_category_rule(self, rule):
+        """
+        Ajoute une règle de catégorisation, après les règles existantes (priorité la plus basse).
+
+        :param rule: Objet CategoryRule à ajouter
+        """
+        self.category_rules.append(rule)
+
+    def remove_category_rule(self, rule_id):
+        """
+        Retire une règle de catégorisation.
+
+        :param rule_id: L'identifiant de la règle
+        :return: La règle retirée, ou None si elle n'existe pas
+        """
+        for i, rule in enumerate(self.category_rules):
+            if rule.rule_id == rule_id:
+                return self.category_rules.pop(i)
+        return None
+
     def get_balance(self):
         """
         Calcule et retourne le solde actuel de l'utilisateur basé sur ses transactions.
 
         :return: Le solde actuel
         """
-        return sum(transaction.amount for transaction in self.transactions)
+        return self.transactions.total()
 
     def to_dict(self):
         """
@@ -56,8 +134,10 @@ class User:
             'username': self.username,
             'email': self.email,
             'created_at': self.created_at.isoformat(),
-            'transactions': [t.to_dict() for t in self.transactions],
-            'budgets': [b.to_dict() for b in self.budgets]
+            'transactions': self.transactions.to_dicts(),
+            'budgets': [b.to_dict() for b in self.budgets],
+            'planned_transactions': [p.to_dict() for p in self.planned_transactions.values()],
+            'category_rules': [r.to_dict() for r in self.category_rules]
         }
 
     def __str__(self):
@@ -1,10 +1,30 @@
 from models.user import User
 from models.transaction import Transaction
+from models.transaction_store import TransactionStore
 from models.budget import Budget
-from services.finance_manager import FinanceManager
-from services.budget_manager import BudgetManager
-from services.user_manager import UserManager
-from datetime import datetime, timedelta
+from models.planned_transaction import PlannedTransaction
+from models.category_rule import CategoryRule
+from services.shared_store import SharedUserStore, UserWorkspace
+from services.autosave import WriteBehindSaver
+from services.report_export import export_report
+from services.categorizer import Categorizer
+from services.search_index import SearchIndex
+from services.monthly_rollup import MonthlyRollup
+from services.import_index import ImportIndex
+from services.statement_parsers import format_from_path, parse_statement
+from datetime import date as date_type, datetime, time, timedelta
+from itertools import islice
+import threading
+import config
+
+def _as_datetime(value):
+    """
+    Convertit une date sans heure (par exemple issue d'un sélecteur de date) en datetime à minuit.
+    """
+    if isinstance(value, date_type) and not isinstance(value, datetime):
+        return datetime.combine(value, time())
+    return value
+
 
 class AppController:
     """
@@ -12,16 +32,34 @@ class AppController:
     Elle coordonne les actions entre UserManager, FinanceManager et BudgetManager.
     """
 
-    def __init__(self):
+    def __init__(self, user_manager=None, persistence_mode=None, shared_store=None):
         """
         Initialise le contrôleur de l'application avec un gestionnaire d'utilisateurs,
         et prépare les gestionnaires de finances et de budget.
+
+        :param user_manager: Gestionnaire d'utilisateurs à utiliser (optionnel, créé à partir de la configuration sinon)
+        :param persistence_mode: 'sync' (sauvegarde après chaque modification) ou 'write_behind'
+                                 (sauvegarde différée et regroupée) ; par défaut config.PERSISTENCE_MODE
+        :param shared_store: Stockage partagé avec les autres sessions du processus (optionnel) ;
+                             sans lui, le contrôleur utilise son propre stockage
         """
-        self.user_manager = UserManager()
+        self.owns_store = shared_store is None
+        self.shared_store = shared_store or SharedUserStore(user_manager)
+        self.user_manager = self.shared_store.user_manager
+        self.workspace = None  # Données de l'utilisateur courant, partagées avec ses autres sessions
         self.current_user = None
         self.finance_manager = None
         self.budget_manager = None
+        self.forecasting_service = None
+        self.scheduler = None
         self.low_threshold = 0
+        self._transaction_frame = None
+        # Protège les données de l'utilisateur courant contre le thread de sauvegarde différée ;
+        # remplacé à la connexion par le verrou de l'utilisateur, commun à toutes ses sessions
+        self._own_lock = threading.RLock()
+        self.lock = self._own_lock
+        self.persistence_mode = persistence_mode or config.PERSISTENCE_MODE
+        self.autosaver = None  # Démarré à la connexion en mode différé, arrêté à la déconnexion
 
     def create_account(self, username, email, password):
         """
@@ -47,46 +85,215 @@ class AppController:
         :return: True si l'utilisateur a été connecté, False sinon
         """
         if self.user_manager.authenticate(username, password):
-            user_data = self.user_manager.get_user_data(username)
-            if user_data:
-                self.current_user = User(user_id=user_data.get('user_id', 1), username=username, email=user_data['email'])
-                self.finance_manager = FinanceManager(self.current_user)
-                self.budget_manager = BudgetManager(self.current_user)
-                self.load_user_data(user_data)
+            if self.current_user:
+                self.logout()
+            workspace = self.shared_store.acquire(username, self._open_workspace)
+            if workspace:
+                self._attach(workspace)
+                # Règlement des échéances arrivées à terme depuis la dernière session
+                self.settle_planned_transactions()
                 return self.current_user  # Retourne l'objet utilisateur
         return None
 
+    def _open_workspace(self, username):
+        """
+        Charge les données d'un utilisateur qui n'a pas encore de session ouverte
+        (appelé par SharedUserStore.acquire, sous le verrou de l'utilisateur).
+
+        :param username: Nom d'utilisateur
+        :return: L'espace de travail de l'utilisateur, ou None si ses données sont introuvables
+        """
+        user_data = self.user_manager.get_user_data(username)
+        if not user_data:
+            return None
+        meta = user_data.get('meta') or {}
+        self.current_user = User(user_id=user_data.get('user_id', 1), username=username, email=user_data['email'],
+                                 next_transaction_id=meta.get('next_transaction_id', 1),
+                                 next_plan_id=meta.get('next_plan_id', 1))
+        self.load_user_data(user_data)
+        for plan_data in meta.get('planned_transactions', []):
+            self.current_user.add_planned_transaction(PlannedTransaction.from_dict(plan_data))
+        for rule_data in meta.get('category_rules', []):
+            self.current_user.add_category_rule(CategoryRule.from_dict(rule_data))
+        workspace = UserWorkspace(self.current_user, self.shared_store.lock_for(username))
+        self._attach(workspace)
+        if config.BUDGET_RECOMPUTE_ON_LOAD:
+            drifted = self.budget_manager.recompute_all()
+            if drifted:
+                self.save_changes(budgets=drifted)
+        return workspace
+
+    def _attach(self, workspace):
+        """
+        Associe le contrôleur à l'espace de travail d'un utilisateur.
+        """
+        self.workspace = workspace
+        self.current_user = workspace.user
+        self.finance_manager = workspace.finance_manager
+        self.budget_manager = workspace.budget_manager
+        self.forecasting_service = workspace.forecasting_service
+        self.scheduler = workspace.scheduler
+        self.lock = workspace.lock
+        if self.persistence_mode == 'write_behind' and not (self.autosaver and self.autosaver.running):
+            self.autosaver = WriteBehindSaver(self._write_pending,
+                                              interval=config.AUTOSAVE_INTERVAL,
+                                              max_dirty=config.AUTOSAVE_MAX_DIRTY)
+
+    @property
+    def data_version(self):
+        """
+        Version des données de l'utilisateur courant : change à chaque modification, y compris
+        par une autre session du même utilisateur, et d'un utilisateur à l'autre.
+        """
+        return self.workspace.version if self.workspace else 0
+
     def load_user_data(self, user_data):
         """
         Charge les données de l'utilisateur (transactions et budgets).
 
         :param user_data: Dictionnaire contenant les données de l'utilisateur
         """
-        for transaction_data in user_data.get('transactions', []):
-            transaction = Transaction.from_dict(transaction_data)
-            self.current_user.add_transaction(transaction)
+        # Construction directe des colonnes, sans créer un objet Transaction par ligne
+        self.current_user.transactions = TransactionStore.from_dicts(user_data.get('transactions', []))
         for budget_data in user_data.get('budgets', []):
-            budget = Budget(**budget_data)
+            budget = Budget.from_dict(budget_data)
             self.current_user.add_budget(budget)
 
     def save_user_data(self):
         """
         Sauvegarde les données de l'utilisateur courant.
         """
-        if self.current_user:
-            transactions = [t.to_dict() for t in self.current_user.transactions]
-            budgets = [b.__dict__ for b in self.current_user.budgets]
-            self.user_manager.update_user_data(self.current_user.username, transactions, budgets)
+        with self.lock:
+            if self.current_user:
+                transactions = self.current_user.transactions.to_dicts()
+                budgets = [b.to_dict() for b in self.current_user.budgets]
+                self.user_manager.update_user_data(self.current_user.username, transactions, budgets)
+                self.save_user_meta()
+
+    def save_user_meta(self):
+        """
+        Sauvegarde les métadonnées de l'utilisateur courant (prochains identifiants, transactions planifiées
+        et règles de catégorisation).
+        """
+        user = self.current_user
+        self.user_manager.save_user_meta(user.username, {
+            'next_transaction_id': user.next_transaction_id,
+            'next_plan_id': user.next_plan_id,
+            'planned_transactions': [plan.to_dict() for plan in user.planned_transactions.values()],
+            'category_rules': [rule.to_dict() for rule in user.category_rules]
+        })
+
+    def save_changes(self, added=(), updated=(), deleted_ids=(), budgets=(), added_records=(), plans_changed=False,
+                     rules_changed=False):
+        """
+        Rend persistantes les modifications de l'utilisateur courant.
+        Seules les lignes modifiées sont écrites : immédiatement en mode synchrone, lors de la
+        prochaine sauvegarde groupée en mode différé.
+
+        :param added: Transactions ajoutées
+        :param updated: Transactions modifiées
+        :param deleted_ids: Identifiants des transactions supprimées
+        :param budgets: Budgets créés ou modifiés
+        :param added_records: Transactions ajoutées en masse, au format Transaction.to_dict (une seule écriture)
+        :param plans_changed: Les transactions planifiées ont été créées, réglées ou annulées
+        :param rules_changed: Les règles de catégorisation ont été modifiées
+        """
+        self.workspace.touch()
+        if self.autosaver:
+            self.autosaver.mark_dirty(
+                added=[t.transaction_id for t in added] + [record['transaction_id'] for record in added_records],
+                updated=[t.transaction_id for t in updated], deleted=deleted_ids,
+                budgets=[budget.budget_id for budget in budgets],
+                meta=bool(deleted_ids) or plans_changed or rules_changed)
+            return
+        username = self.current_user.username
+        for transaction in added:
+            self.user_manager.add_transaction(username, transaction.to_dict())
+        if added_records:
+            self.user_manager.add_transactions(username, list(added_records))
+        for transaction in updated:
+            self.user_manager.update_transaction(username, transaction.to_dict())
+        for transaction_id in deleted_ids:
+            self.user_manager.delete_transaction(username, transaction_id)
+        for budget in budgets:
+            self.user_manager.save_budget(username, budget.to_dict())
+        if deleted_ids or plans_changed or rules_changed:
+            # L'identifiant le plus élevé peut avoir disparu des transactions : le compteur doit être conservé
+            self.save_user_meta()
+
+    def _write_pending(self, changes):
+        """
+        Écrit les modifications en attente de la sauvegarde différée (appelé par le thread de sauvegarde) :
+        seules les lignes concernées sont écrites, avec leurs valeurs actuelles.
+
+        :param changes: Les modifications à écrire (PendingChanges)
+        """
+        with self.lock:
+            if not self.current_user:
+                return
+            username = self.current_user.username
+            store = self.current_user.transactions
+            rows = {transaction_id: store.find_row(transaction_id)
+                    for transaction_id in changes.added | changes.updated}
+            added = [store[rows[transaction_id]].to_dict() for transaction_id in sorted(changes.added)
+                     if rows[transaction_id] is not None]
+            updated = [store[rows[transaction_id]].to_dict() for transaction_id in sorted(changes.updated)
+                       if rows[transaction_id] is not None]
+            budgets = [budget.to_dict() for budget in self.current_user.budgets
+                       if budget.budget_id in changes.budgets]
+            if added:
+                self.user_manager.add_transactions(username, added)
+            for transaction in updated:
+                self.user_manager.update_transaction(username, transaction)
+            for transaction_id in sorted(changes.deleted):
+                self.user_manager.delete_transaction(username, transaction_id)
+            for budget in budgets:
+                self.user_manager.save_budget(username, budget)
+            if changes.meta:
+                self.save_user_meta()
+
+    def get_persistence_stats(self):
+        """
+        Retourne les statistiques de la sauvegarde différée.
+
+        :return: Un dictionnaire (modifications, écritures, écritures économisées), ou None en mode synchrone
+        """
+        return self.autosaver.get_stats() if self.autosaver else None
 
     def logout(self):
         """
-        Déconnecte l'utilisateur actuel et sauvegarde ses données.
+        Déconnecte l'utilisateur actuel et rend ses données durables.
+        Chaque modification ayant déjà été enregistrée (ou étant en attente de sauvegarde différée),
+        il suffit d'arrêter la sauvegarde différée, qui écrit les données en attente.
         """
         if self.current_user:
-            self.save_user_data()
+            if self.autosaver:
+                self.autosaver.stop()
+            self.save_indexes()
+            # Les données restent en mémoire tant qu'une autre session de l'utilisateur est ouverte
+            self.shared_store.release(self.current_user.username)
+            self.workspace = None
             self.current_user = None
             self.finance_manager = None
             self.budget_manager = None
+            self.forecasting_service = None
+            self.scheduler = None
+            self._transaction_frame = None
+            self.lock = self._own_lock
+
+    def close(self):
+        """
+        Arrête la sauvegarde différée et rend toutes les données durables.
+        Un stockage partagé n'est pas fermé : seule la session de ce contrôleur l'est.
+        """
+        if self.autosaver:
+            self.autosaver.stop()
+        if self.owns_store:
+            if self.current_user:
+                self.save_indexes()
+            self.shared_store.close()
+        else:
+            self.logout()
 
     def set_low_threshold(self, threshold):
         """
@@ -113,36 +320,423 @@ class AppController:
         current_balance = self.get_balance()
         return current_balance < self.low_threshold
 
-    def add_transaction(self, amount, category, description="", date=None):
+    def get_low_balance_risk(self, days=30, **options):
+        """
+        Estime par simulation la probabilité que le solde passe sous le seuil bas dans les prochains jours.
+
+        :param days: Nombre de jours de la projection
+        :param options: Options de la simulation (n_paths, seed, time_budget, workers, ...)
+        :return: Le résultat de ForecastingService.simulate_future_balance
+        """
+        with self.lock:
+            return self.forecasting_service.simulate_future_balance(days, threshold=self.low_threshold, **options)
+
+    def add_transaction(self, amount, category, description="", date=None, is_planned=False):
         """
         Ajoute une nouvelle transaction et met à jour le budget si nécessaire.
+        Une transaction planifiée (ou datée dans le futur) n'est pas enregistrée immédiatement :
+        elle est confiée au planificateur et ne compte dans le solde réglé qu'à son échéance.
 
         :param amount: Montant de la transaction
         :param category: Catégorie de la transaction
         :param description: Description de la transaction (optionnel)
         :param date: Date de la transaction (optionnel)
-        :return: La transaction créée
-        """
-        transaction = self.finance_manager.add_transaction(amount, category, description, date)
-        self.budget_manager.update_budget_spent(category, amount)
-        self.save_user_data()
+        :param is_planned: La transaction est planifiée à la date indiquée
+        :return: La transaction créée, ou la transaction planifiée (PlannedTransaction)
+        """
+        date = _as_datetime(date)
+        if is_planned or (isinstance(date, datetime) and date > datetime.now()):
+            return self.schedule_transaction(amount, category, description, start_date=date)
+        with self.lock:
+            transaction = self.finance_manager.add_transaction(amount, category, description, date)
+            updated_budgets = self.budget_manager.handle_new_transaction(transaction)
+            self.save_changes(added=[transaction], budgets=updated_budgets)
         return transaction
 
+    def schedule_transaction(self, amount, category, description="", start_date=None,
+                             frequency=None, interval=1, end_date=None):
+        """
+        Planifie une transaction ponctuelle ou récurrente. Les échéances déjà passées sont réglées immédiatement.
+
+        :param amount: Montant de chaque occurrence
+        :param category: Catégorie des transactions générées
+        :param description: Description des transactions générées (optionnel)
+        :param start_date: Date de la première échéance (par défaut maintenant)
+        :param frequency: None (ponctuelle), 'daily', 'weekly', 'monthly' ou 'yearly'
+        :param interval: Nombre de périodes entre deux échéances
+        :param end_date: Date après laquelle la récurrence s'arrête (optionnel)
+        :return: La transaction planifiée créée
+        :raises ValueError: Si la fréquence est inconnue
+        """
+        with self.lock:
+            plan = self.scheduler.schedule(amount, category, description, _as_datetime(start_date),
+                                           frequency, interval, _as_datetime(end_date))
+            self.save_changes(plans_changed=True)
+            self.settle_planned_transactions()
+        return plan
+
+    def cancel_planned_transaction(self, plan_id):
+        """
+        Annule une transaction planifiée. Les occurrences déjà réglées sont conservées.
+
+        :param plan_id: L'identifiant de la transaction planifiée
+        :return: La transaction planifiée annulée, ou None si elle n'existe pas
+        """
+        with self.lock:
+            plan = self.scheduler.cancel(plan_id)
+            if plan:
+                self.save_changes(plans_changed=True)
+        return plan
+
+    def get_planned_transactions(self):
+        """
+        Récupère les transactions planifiées de l'utilisateur, par prochaine échéance.
+
+        :return: Une liste de PlannedTransaction
+        """
+        with self.lock:
+            return sorted(self.current_user.planned_transactions.values(), key=lambda plan: plan.next_date)
+
+    def settle_planned_transactions(self, now=None):
+        """
+        Enregistre les occurrences des transactions planifiées arrivées à échéance.
+        Peu coûteux lorsqu'aucune échéance n'est due : seule la plus proche est consultée.
+
+        :param now: La date de référence (par défaut maintenant)
+        :return: Le nombre de transactions enregistrées
+        """
+        with self.lock:
+            next_due = self.scheduler.next_due_date()
+            if next_due is None or next_due > (now or datetime.now()):
+                return 0
+            rows = self.scheduler.settle(now)
+            records = self.finance_manager.add_transactions(rows)
+            updated_budgets = self.budget_manager.handle_new_transactions(records)
+            self.save_changes(added_records=records, budgets=updated_budgets, plans_changed=True)
+        return len(records)
+
+    def add_transactions(self, rows, chunk_size=None):
+        """
+        Ajoute un grand nombre de transactions (import d'historique bancaire).
+        Les lignes sont traitées par paquets : chaque paquet est validé et ajouté en une fois,
+        les budgets sont mis à jour en un seul passage et les données sauvegardées en une seule écriture.
+        Un générateur peut être passé pour importer des volumes qui ne tiennent pas en mémoire.
+
+        :param rows: Itérable de dictionnaires avec 'amount', 'category' et éventuellement 'description' et 'date' ;
+                     les lignes sans catégorie sont catégorisées par les règles de l'utilisateur
+        :param chunk_size: Nombre de lignes par paquet (par défaut config.IMPORT_CHUNK_SIZE)
+        :return: Le nombre de transactions ajoutées
+        :raises ValueError: Si une ligne est invalide (les paquets précédents restent enregistrés)
+        """
+        chunk_size = chunk_size or config.IMPORT_CHUNK_SIZE
+        rows = iter(rows)
+        added = 0
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return added
+            with self.lock:
+                self._categorize_rows(chunk)
+                records = self.finance_manager.add_transactions(chunk)
+                updated_budgets = self.budget_manager.handle_new_transactions(records)
+                self.save_changes(added_records=records, budgets=updated_budgets)
+            added += len(records)
+
+    def import_statement(self, path, fmt=None, chunk_size=None, encoding='utf-8', **options):
+        """
+        Importe un relevé bancaire (CSV, OFX ou QIF). Le fichier est lu au fil de l'eau et les
+        transactions sont ajoutées par paquets (voir add_transactions). Les lignes déjà présentes
+        dans l'historique sont ignorées grâce à l'index de déduplication de l'utilisateur :
+        réimporter un relevé qui chevauche un import précédent n'ajoute que les nouvelles lignes.
+        Les lignes sans catégorie sont catégorisées par les règles de l'utilisateur
+        (config.IMPORT_DEFAULT_CATEGORY si aucune règle ne s'applique).
+
+        :param path: Chemin du relevé
+        :param fmt: 'csv', 'ofx' ou 'qif' (par défaut déduit de l'extension du fichier)
+        :param chunk_size: Nombre de lignes par paquet (par défaut config.IMPORT_CHUNK_SIZE)
+        :param encoding: Encodage du fichier
+        :param options: Options du lecteur (delimiter, day_first ; voir services.statement_parsers)
+        :return: Un dictionnaire avec le nombre de lignes lues ('read'), importées ('imported')
+                 et ignorées car déjà présentes ('duplicates')
+        :raises ValueError: Si le format est inconnu ou si une ligne est invalide
+                            (les paquets précédents restent enregistrés)
+        """
+        fmt = fmt or format_from_path(path)
+        chunk_size = chunk_size or config.IMPORT_CHUNK_SIZE
+        stats = {'read': 0, 'imported': 0, 'duplicates': 0}
+        ranks = {}  # Lignes identiques déjà lues dans ce relevé
+        with open(path, encoding=encoding, errors='replace', newline='') as file:
+            rows = parse_statement(file, fmt, **options)
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    return stats
+                with self.lock:
+                    self._categorize_rows(chunk, config.IMPORT_DEFAULT_CATEGORY)
+                    index = self._get_import_index()
+                    new_rows, hashes = index.filter_new(chunk, ranks)
+                    records = self.finance_manager.add_transactions(new_rows)
+                    updated_budgets = self.budget_manager.handle_new_transactions(records)
+                    self.save_changes(added_records=records, budgets=updated_budgets)
+                    index.add(hashes, self.current_user.transactions.id_high_water)
+                stats['read'] += len(chunk)
+                stats['imported'] += len(records)
+                stats['duplicates'] += len(chunk) - len(records)
+
+    def search(self, query, date_range=None, category=None, limit=50, prefix=True):
+        """
+        Recherche plein texte dans les descriptions et catégories des transactions
+        (par exemple « amazon » sur trois ans). Tous les mots de la requête doivent être présents ;
+        la casse, les accents et la ponctuation sont ignorés.
+
+        :param query: Les mots recherchés
+        :param date_range: Couple (date de début, date de fin), bornes incluses et optionnelles (optionnel)
+        :param category: Catégorie recherchée (optionnel)
+        :param limit: Nombre maximal de transactions retournées (None : toutes)
+        :param prefix: Le dernier mot peut n'être que le début d'un mot (saisie semi-automatique)
+        :return: Un dictionnaire avec 'total' (nombre de transactions trouvées) et 'transactions'
+                 (les plus récentes d'abord)
+        """
+        start_date, end_date = date_range or (None, None)
+        if isinstance(end_date, date_type) and not isinstance(end_date, datetime):
+            end_date = datetime.combine(end_date, time.max)  # Journée de fin incluse
+        with self.lock:
+            self._ensure_search_index()
+            return self.finance_manager.search_transactions(query, _as_datetime(start_date), end_date,
+                                                            category, prefix, limit)
+
+    def suggest_search_terms(self, prefix, limit=10):
+        """
+        Propose des mots pour compléter une recherche en cours de saisie.
+
+        :param prefix: La saisie (seul son dernier mot est complété)
+        :param limit: Nombre maximal de propositions
+        :return: Les mots proposés, les plus fréquents d'abord
+        """
+        with self.lock:
+            return self._ensure_search_index().suggest(prefix, limit)
+
+    def _ensure_search_index(self):
+        """
+        Retourne l'index plein texte de l'utilisateur courant, relu depuis son fichier à la première recherche.
+        """
+        return self.finance_manager.get_search_index(self._search_index_path())
+
+    def _search_index_path(self):
+        return SearchIndex.path_for(self.current_user.username, self.shared_store.search_index_dir)
+
+    def get_period_report(self, period='month', year=None, number=None):
+        """
+        Rapport d'un mois, d'un trimestre ou d'une année : entrées, sorties, solde net et nombre
+        de transactions, au total et par catégorie. Calculé à partir des agrégats mensuels,
+        sans parcourir les transactions.
+
+        :param period: 'month', 'quarter' ou 'year'
+        :param year: Année (par défaut l'année en cours)
+        :param number: Numéro du mois ou du trimestre (par défaut celui en cours)
+        :return: Le rapport (voir MonthlyRollup.report)
+        :raises ValueError: Si la période est inconnue
+        """
+        year, number = self._current_period(period, year, number)
+        with self.lock:
+            return self._ensure_monthly_rollup().report(period, year, number)
+
+    def compare_periods(self, period='month', year=None, number=None, against='previous'):
+        """
+        Compare un mois, un trimestre ou une année à la période précédente ou à la même période
+        de l'année précédente.
+
+        :param period: 'month', 'quarter' ou 'year'
+        :param year: Année (par défaut l'année en cours)
+        :param number: Numéro du mois ou du trimestre (par défaut celui en cours)
+        :param against: 'previous' (période précédente) ou 'last_year' (un an plus tôt)
+        :return: Un dictionnaire avec 'current', 'previous' et 'changes' (voir MonthlyRollup.compare)
+        :raises ValueError: Si la période ou le type de comparaison est inconnu
+        """
+        year, number = self._current_period(period, year, number)
+        with self.lock:
+            return self._ensure_monthly_rollup().compare(period, year, number, against)
+
+    @staticmethod
+    def _current_period(period, year, number):
+        """
+        Complète l'année et le numéro de période par ceux de la date du jour.
+        """
+        today = date_type.today()
+        if number is None:
+            number = today.month if period == 'month' else (today.month - 1) // 3 + 1
+        return year or today.year, number
+
+    def _ensure_monthly_rollup(self):
+        """
+        Retourne les agrégats mensuels de l'utilisateur courant, relus depuis leur fichier au premier rapport.
+        """
+        return self.finance_manager.get_monthly_rollup(self._monthly_rollup_path())
+
+    def _monthly_rollup_path(self):
+        return MonthlyRollup.path_for(self.current_user.username, self.shared_store.rollup_dir)
+
+    def save_indexes(self):
+        """
+        Enregistre l'index plein texte et les agrégats mensuels de l'utilisateur courant
+        s'ils ont changé depuis leur dernier enregistrement.
+        """
+        with self.lock:
+            store = self.current_user.transactions
+            index = self.finance_manager.search_index
+            if index is not None and self.workspace.search_index_saved != index.version:
+                index.save(self._search_index_path(), store)
+                self.workspace.search_index_saved = index.version
+            rollup = self.finance_manager.monthly_rollup
+            if rollup is not None and self.workspace.rollup_saved != rollup.version:
+                rollup.save(self._monthly_rollup_path(), store)
+                self.workspace.rollup_saved = rollup.version
+
+    def add_category_rule(self, category, keyword=None, pattern=None, min_amount=None, max_amount=None):
+        """
+        Ajoute une règle de catégorisation automatique, appliquée après les règles existantes.
+
+        :param category: Catégorie attribuée aux transactions reconnues
+        :param keyword: Mot ou groupe de mots à trouver dans la description (optionnel)
+        :param pattern: Expression régulière à trouver dans la description (optionnel)
+        :param min_amount: Montant minimal, inclus (optionnel)
+        :param max_amount: Montant maximal, inclus (optionnel)
+        :return: La règle créée
+        :raises ValueError: Si la règle est invalide (voir CategoryRule)
+        """
+        with self.lock:
+            rule_id = max((rule.rule_id for rule in self.current_user.category_rules), default=0) + 1
+            rule = CategoryRule(rule_id, category, keyword, pattern, min_amount, max_amount)
+            self.current_user.add_category_rule(rule)
+            self.workspace.categorizer = Categorizer(self.current_user.category_rules)
+            self.save_changes(rules_changed=True)
+        return rule
+
+    def remove_category_rule(self, rule_id):
+        """
+        Supprime une règle de catégorisation. Les transactions déjà catégorisées ne sont pas modifiées.
+
+        :param rule_id: L'identifiant de la règle
+        :return: La règle supprimée, ou None si elle n'existe pas
+        """
+        with self.lock:
+            rule = self.current_user.remove_category_rule(rule_id)
+            if rule:
+                self.workspace.categorizer = Categorizer(self.current_user.category_rules)
+                self.save_changes(rules_changed=True)
+        return rule
+
+    def get_category_rules(self):
+        """
+        Récupère les règles de catégorisation de l'utilisateur, par ordre de priorité.
+
+        :return: Liste des règles
+        """
+        with self.lock:
+            return list(self.current_user.category_rules)
+
+    def categorize(self, descriptions, amounts=None):
+        """
+        Propose une catégorie pour un lot de transactions d'après les règles de l'utilisateur.
+
+        :param descriptions: Descriptions des transactions
+        :param amounts: Montants des transactions (optionnel)
+        :return: Pour chaque transaction, la catégorie proposée, ou None si aucune règle ne s'applique
+        """
+        with self.lock:
+            return self.workspace.categorizer.categorize_many(list(descriptions),
+                                                              None if amounts is None else list(amounts))
+
+    def _categorize_rows(self, rows, default=None):
+        """
+        Complète la catégorie des lignes qui n'en ont pas, d'après les règles de l'utilisateur.
+
+        :param rows: Lignes de transactions (modifiées sur place)
+        :param default: Catégorie des lignes qu'aucune règle ne reconnaît (None : laissées sans catégorie)
+        """
+        missing = [row for row in rows if not row.get('category')]
+        if not missing:
+            return
+        categories = self.workspace.categorizer.categorize_many([row.get('description', "") for row in missing],
+                                                                [row.get('amount') for row in missing])
+        for row, category in zip(missing, categories):
+            if category or default:
+                row['category'] = category or default
+
+    def _get_import_index(self):
+        """
+        Retourne l'index de déduplication de l'utilisateur courant, à jour des transactions saisies depuis.
+        """
+        workspace = self.workspace
+        if workspace.import_index is None:
+            workspace.import_index = ImportIndex.for_user(self.current_user.username, self.shared_store.import_index_dir)
+        workspace.import_index.sync_with_store(self.current_user.transactions)
+        return workspace.import_index
+
     def get_balance(self):
         """
         Récupère le solde actuel de l'utilisateur.
         """
         if self.finance_manager:
-            return self.finance_manager.get_balance()
+            with self.lock:
+                return self.finance_manager.get_balance()
         return 0  # Retourne 0 si le finance_manager n'est pas initialisé
 
+    def get_settled_balance(self):
+        """
+        Récupère le solde réglé : transactions datées au plus tard d'aujourd'hui, hors échéances à venir.
+
+        :return: Le solde réglé
+        """
+        return self.get_balance_as_of(datetime.now())
+
+    def get_projected_balance(self, date):
+        """
+        Récupère le solde prévisionnel à une date donnée : solde à cette date, augmenté des
+        occurrences des transactions planifiées qui seront arrivées à échéance.
+
+        :param date: La date de référence
+        :return: Le solde prévisionnel
+        """
+        if not self.finance_manager:
+            return 0
+        date = _as_datetime(date)
+        with self.lock:
+            return self.get_balance_as_of(date) + self.scheduler.projected_total(date)
+
+    def get_balance_as_of(self, date):
+        """
+        Récupère le solde de l'utilisateur à une date donnée.
+
+        :param date: La date de référence
+        :return: Le solde à cette date
+        """
+        if self.finance_manager:
+            with self.lock:
+                return self.finance_manager.get_balance_as_of(date)
+        return 0
+
+    def recompute_budgets(self, verify_only=False):
+        """
+        Recalcule le montant dépensé de tous les budgets à partir des transactions.
+
+        :param verify_only: Signale les écarts sans corriger les budgets
+        :return: La liste des budgets dont le montant dépensé était incorrect
+        """
+        with self.lock:
+            drifted = self.budget_manager.recompute_all(verify_only)
+            if drifted and not verify_only:
+                self.save_changes(budgets=drifted)
+        return drifted
+
     def get_budget_status(self):
         """
         Récupère le statut actuel des budgets.
 
         :return: Un dictionnaire avec le statut des budgets
         """
-        return self.budget_manager.get_budget_status()
+        with self.lock:
+            return self.budget_manager.get_budget_status()
 
     def get_transactions(self):
         """
@@ -154,17 +748,20 @@ class AppController:
 
     def delete_last_transaction(self):
         """
-        Supprime la dernière transaction et met à jour le solde et le budget.
+        Supprime la dernière transaction enregistrée (celle dont l'identifiant est le plus élevé)
+        et met à jour le solde et le budget.
 
         :return: La transaction supprimée ou None si aucune transaction n'existe
         """
-        if self.current_user.transactions:
-            last_transaction = self.current_user.transactions[-1]
-            deleted_transaction = self.finance_manager.delete_transaction(last_transaction.transaction_id)
-            if deleted_transaction:
-                self.budget_manager.handle_transaction_deletion(deleted_transaction)
-                self.save_user_data()
-            return deleted_transaction
+        with self.lock:
+            if self.current_user.transactions:
+                # Les suppressions ne conservent pas l'ordre des lignes : la dernière n'est pas forcément la plus récente
+                last_id = int(self.current_user.transactions.ids.max())
+                deleted_transaction = self.finance_manager.delete_transaction(last_id)
+                if deleted_transaction:
+                    updated_budgets = self.budget_manager.handle_transaction_deletion(deleted_transaction)
+                    self.save_changes(deleted_ids=[deleted_transaction.transaction_id], budgets=updated_budgets)
+                return deleted_transaction
         return None
 
     def set_budget(self, category, amount, period_start=None, period_end=None):
@@ -182,8 +779,9 @@ class AppController:
         if period_end is None:
             period_end = (period_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
         
-        budget = self.budget_manager.create_budget(category, amount, period_start, period_end)
-        self.save_user_data()
+        with self.lock:
+            budget = self.budget_manager.create_budget(category, amount, period_start, period_end)
+            self.save_changes(budgets=[budget])
         return budget
 
     def get_budgets(self):
@@ -204,15 +802,78 @@ class AppController:
         :param description: La nouvelle description
         :return: La transaction mise à jour ou None si non trouvée
         """
-        old_transaction = next((t for t in self.current_user.transactions if t.transaction_id == transaction_id), None)
-        if old_transaction:
-            new_transaction = self.finance_manager.update_transaction(transaction_id, amount, category, description)
-            if new_transaction:
-                self.budget_manager.handle_transaction_update(old_transaction, new_transaction)
-                self.save_user_data()
-            return new_transaction
+        with self.lock:
+            row = self.current_user.transactions.find_row(transaction_id)
+            if row is not None:
+                # Copie de l'état initial : la transaction est modifiée sur place
+                old_transaction = Transaction.from_dict(self.current_user.transactions[row].to_dict())
+                new_transaction = self.finance_manager.update_transaction(transaction_id, amount, category, description)
+                if new_transaction:
+                    updated_budgets = self.budget_manager.handle_transaction_update(old_transaction, new_transaction)
+                    self.save_changes(updated=[new_transaction], budgets=updated_budgets)
+                return new_transaction
         return None
 
+    def get_transactions_frame(self):
+        """
+        Récupère les transactions sous forme de DataFrame pandas, conservé d'un appel à l'autre :
+        les nouvelles transactions y sont ajoutées au lieu de reconstruire tout le DataFrame.
+        Le DataFrame retourné ne doit pas être modifié.
+
+        :return: Un DataFrame (voir services.transaction_frame.TransactionFrame.get)
+        """
+        # pandas n'est nécessaire que pour l'interface Streamlit
+        from services.transaction_frame import TransactionFrame
+        with self.lock:
+            if self._transaction_frame is None:
+                self._transaction_frame = TransactionFrame()
+            return self._transaction_frame.get(self.current_user.transactions)
+
+    def get_category_breakdown(self):
+        """
+        Récupère le total des dépenses et des revenus par catégorie, mémorisé jusqu'à la prochaine modification.
+
+        :return: Un dictionnaire avec 'expenses' et 'incomes' (séries pandas indexées par catégorie)
+        """
+        with self.lock:
+            self.get_transactions_frame()
+            return self._transaction_frame.category_breakdown(self.current_user.transactions)
+
+    def query_transactions(self, category=None, start_date=None, end_date=None, min_amount=None, max_amount=None,
+                           sort_by='date', descending=True, offset=0, limit=50):
+        """
+        Recherche des transactions avec filtres, tri et pagination (voir FinanceManager.query_transactions).
+        Seules les transactions de la page demandée sont retournées, avec le nombre total de résultats.
+
+        :param category: Catégorie recherchée (optionnel)
+        :param start_date: Date de début de la période, incluse (optionnel)
+        :param end_date: Date de fin de la période, incluse (optionnel)
+        :param min_amount: Montant minimal, inclus (optionnel)
+        :param max_amount: Montant maximal, inclus (optionnel)
+        :param sort_by: Colonne de tri : 'date', 'amount', 'category' ou 'transaction_id'
+        :param descending: Tri décroissant
+        :param offset: Nombre de transactions à sauter
+        :param limit: Nombre maximal de transactions retournées
+        :return: Un dictionnaire avec 'total' et 'transactions'
+        """
+        with self.lock:
+            return self.finance_manager.query_transactions(category, _as_datetime(start_date), _as_datetime(end_date),
+                                                           min_amount, max_amount, sort_by, descending, offset, limit)
+
+    def export_report(self, path, start_date=None, end_date=None, fmt=None):
+        """
+        Exporte les transactions d'une période dans un fichier CSV, Parquet ou Feather,
+        par paquets (voir services.report_export).
+
+        :param path: Chemin du fichier de rapport
+        :param start_date: Date de début de la période, incluse (optionnel)
+        :param end_date: Date de fin de la période, incluse (optionnel)
+        :param fmt: 'csv', 'parquet' ou 'feather' (par défaut déduit de l'extension du fichier)
+        :return: Le nombre de transactions exportées
+        """
+        with self.lock:
+            return export_report(self.finance_manager, path, _as_datetime(start_date), _as_datetime(end_date), fmt)
+
     def get_transactions_by_category(self, category):
         """
         Récupère toutes les transactions d'une catégorie spécifique.
@@ -220,7 +881,8 @@ class AppController:
         :param category: La catégorie des transactions à récupérer
         :return: Une liste des transactions de la catégorie spécifiée
         """
-        return self.finance_manager.get_transactions_by_category(category)
+        with self.lock:
+            return self.finance_manager.get_transactions_by_category(category)
 
     def get_total_by_category(self):
         """
@@ -228,7 +890,8 @@ class AppController:
 
         :return: Un dictionnaire avec les catégories comme clés et les totaux comme valeurs
         """
-        return self.finance_manager.get_total_by_category()
+        with self.lock:
+            return self.finance_manager.get_total_by_category()
 
     def get_transactions_for_period(self, start_date, end_date):
         """
@@ -238,4 +901,5 @@ class AppController:
         :param end_date: Date de fin de la période
         :return: Une liste des transactions dans la période spécifiée
         """
-        return self.finance_manager.get_transactions_for_period(start_date, end_date)
\ No newline at end of file
+        with self.lock:
+            return self.finance_manager.get_transactions_for_period(start_date, end_date)
\ No newline at end of file
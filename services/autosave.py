@@ -0,0 +1,161 @@
+import atexit
+import logging
+import threading
+
+
+class PendingChanges:
+    """
+    Modifications pas encore sauvegardées, réduites à leur effet net : une transaction ajoutée
+    puis modifiée reste un ajout, une transaction ajoutée puis supprimée n'est jamais écrite.
+    """
+
+    def __init__(self):
+        self.added = set()  # Identifiants des transactions ajoutées
+        self.updated = set()  # Identifiants des transactions déjà enregistrées puis modifiées
+        self.deleted = set()  # Identifiants des transactions enregistrées puis supprimées
+        self.budgets = set()  # Identifiants des budgets créés ou modifiés
+        self.meta = False  # Les métadonnées de l'utilisateur ont changé
+
+    def record(self, added=(), updated=(), deleted=(), budgets=(), meta=False):
+        """
+        Ajoute des modifications à celles en attente.
+
+        :param added: Identifiants des transactions ajoutées
+        :param updated: Identifiants des transactions modifiées
+        :param deleted: Identifiants des transactions supprimées
+        :param budgets: Identifiants des budgets créés ou modifiés
+        :param meta: Les métadonnées ont changé
+        """
+        self.added.update(added)
+        self.updated.update(transaction_id for transaction_id in updated if transaction_id not in self.added)
+        for transaction_id in deleted:
+            if transaction_id in self.added:
+                self.added.discard(transaction_id)  # Jamais écrite : rien à supprimer
+            else:
+                self.updated.discard(transaction_id)
+                self.deleted.add(transaction_id)
+        self.budgets.update(budgets)
+        self.meta = self.meta or bool(meta)
+
+    def merge(self, later: 'PendingChanges'):
+        """
+        Ajoute des modifications plus récentes à celles-ci (par exemple après un échec d'écriture).
+
+        :param later: Les modifications survenues depuis
+        """
+        self.record(later.added, later.updated, later.deleted, later.budgets, later.meta)
+
+    def __bool__(self):
+        return bool(self.added or self.updated or self.deleted or self.budgets or self.meta)
+
+
+class WriteBehindSaver:
+    """
+    Sauvegarde différée : les modifications sont notées (voir PendingChanges),
+    et un thread d'arrière-plan les regroupe en une seule écriture par intervalle
+    (ou dès que le nombre de modifications en attente atteint un seuil).
+    Seules les lignes modifiées sont écrites.
+    """
+
+    def __init__(self, save_callback, interval=2.0, max_dirty=20):
+        """
+        Initialise et démarre le thread de sauvegarde.
+
+        :param save_callback: Fonction qui écrit sur le disque les modifications (PendingChanges) qu'elle reçoit
+        :param interval: Délai maximal (en secondes) entre une modification et sa sauvegarde
+        :param max_dirty: Nombre de modifications en attente déclenchant une sauvegarde immédiate
+        """
+        self.save_callback = save_callback
+        self.interval = interval
+        self.max_dirty = max_dirty
+        self.dirty_count = 0  # Modifications pas encore sauvegardées
+        self.mutations = 0  # Nombre total de modifications signalées
+        self.flushes = 0  # Nombre d'écritures réellement effectuées
+        self.pending = PendingChanges()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="write-behind-saver", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    @property
+    def running(self):
+        """
+        Le thread de sauvegarde est actif (stop n'a pas été appelé).
+        """
+        return not self._stopped.is_set()
+
+    def mark_dirty(self, **changes):
+        """
+        Signale une modification à sauvegarder.
+
+        :param changes: Lignes concernées (voir PendingChanges.record)
+        """
+        with self._lock:
+            self.pending.record(**changes)
+            self.dirty_count += 1
+            self.mutations += 1
+            if self.dirty_count >= self.max_dirty:
+                self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Les modifications restent marquées : elles seront retentées à la prochaine échéance
+                logging.exception("Échec de la sauvegarde différée")
+
+    def flush(self):
+        """
+        Écrit immédiatement les modifications en attente, s'il y en a.
+
+        :return: True si une écriture a eu lieu, False sinon
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, changes = self.dirty_count, self.pending
+                self.dirty_count, self.pending = 0, PendingChanges()
+            if not pending:
+                return False
+            try:
+                self.save_callback(changes)
+            except Exception:
+                with self._lock:
+                    self.dirty_count += pending
+                    changes.merge(self.pending)
+                    self.pending = changes
+                raise
+            self.flushes += 1
+            return True
+
+    def stop(self):
+        """
+        Arrête le thread et sauvegarde les modifications restantes.
+        """
+        if not self._stopped.is_set():
+            self._stopped.set()
+            self._wake.set()
+            if self._thread is not threading.current_thread():
+                self._thread.join()
+            atexit.unregister(self.stop)
+        self.flush()
+
+    def get_stats(self):
+        """
+        Retourne les statistiques de la sauvegarde différée.
+
+        :return: Un dictionnaire avec le nombre de modifications, d'écritures effectuées
+                 et d'écritures économisées par le regroupement
+        """
+        with self._lock:
+            return {
+                'mutations': self.mutations,
+                'flushes': self.flushes,
+                'flushes_saved': self.mutations - self.dirty_count - self.flushes,
+                'pending': self.dirty_count
+            }
@@ -0,0 +1,108 @@
+"""
+Évaluation des modèles de prévision sur l'historique d'un utilisateur (backtest à origine glissante).
+
+Pour chaque origine, le modèle est ajusté sur les jours qui la précèdent puis comparé
+aux montants réels des `horizon` jours suivants.
+
+Exemple :
+    python -m services.backtesting alice --horizon 30
+"""
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from services.forecast_models import ForecastModel, default_models
+
+
+def backtest(values: np.ndarray, origin: np.datetime64, models: List[ForecastModel] = None,
+             horizon: int = 30, min_train: int = 60, step: int = 7) -> Dict[str, Dict[str, float]]:
+    """
+    Évalue des modèles de prévision sur une série quotidienne.
+
+    :param values: Montants quotidiens, du plus ancien au plus récent
+    :param origin: Date (datetime64[D]) du premier élément de la série
+    :param models: Modèles à comparer (par défaut default_models())
+    :param horizon: Nombre de jours prédits à chaque origine
+    :param min_train: Nombre minimal de jours d'historique avant la première origine
+    :param step: Nombre de jours entre deux origines
+    :return: Par modèle : nombre d'origines ('runs'), erreur absolue moyenne quotidienne ('mae'),
+             erreur quadratique moyenne ('rmse'), erreur absolue moyenne sur le total de
+             l'horizon ('horizon_error') et temps total d'ajustement et de prédiction en secondes
+             ('fit_time', 'predict_time')
+    """
+    values = np.asarray(values, dtype=np.float64)
+    origin = np.datetime64(origin, 'D')
+    models = models if models is not None else default_models()
+    cutoffs = np.arange(min_train, len(values) - horizon + 1, step)
+    results = {}
+    for model in models:
+        errors = np.empty((len(cutoffs), horizon))
+        fit_time = predict_time = 0.0
+        for i, cutoff in enumerate(cutoffs):
+            start = time.perf_counter()
+            model.fit(values[:cutoff], origin)
+            fit_time += time.perf_counter() - start
+            start = time.perf_counter()
+            predicted = model.predict(horizon)
+            predict_time += time.perf_counter() - start
+            errors[i] = predicted - values[cutoff:cutoff + horizon]
+        results[repr(model)] = {
+            'runs': len(cutoffs),
+            'mae': float(np.abs(errors).mean()) if len(cutoffs) else float('nan'),
+            'rmse': float(np.sqrt((errors ** 2).mean())) if len(cutoffs) else float('nan'),
+            'horizon_error': float(np.abs(errors.sum(axis=1)).mean()) if len(cutoffs) else float('nan'),
+            'fit_time': fit_time,
+            'predict_time': predict_time
+        }
+    return results
+
+
+def best_model(results: Dict[str, Dict[str, float]], metric: str = 'horizon_error') -> str:
+    """
+    Retourne le nom du modèle ayant la plus petite erreur.
+
+    :param results: Résultats retournés par backtest
+    :param metric: Métrique à minimiser
+    :return: Le nom (repr) du meilleur modèle, ou None si aucun modèle n'a pu être évalué
+    """
+    evaluated = {name: scores[metric] for name, scores in results.items() if scores['runs']}
+    return min(evaluated, key=evaluated.get) if evaluated else None
+
+
+def main():
+    from services.forecasting import ForecastingService
+    from services.user_manager import UserManager
+    from models.transaction_store import TransactionStore
+    from models.user import User
+
+    parser = argparse.ArgumentParser(description="Compare les modèles de prévision sur l'historique d'un utilisateur.")
+    parser.add_argument('username', help="Nom de l'utilisateur")
+    parser.add_argument('--horizon', type=int, default=30, help="Nombre de jours prédits")
+    parser.add_argument('--min-train', type=int, default=60, help="Historique minimal avant la première origine")
+    parser.add_argument('--step', type=int, default=7, help="Nombre de jours entre deux origines")
+    args = parser.parse_args()
+
+    user_manager = UserManager.from_config()
+    try:
+        user_data = user_manager.get_user_data(args.username)
+        if user_data is None:
+            parser.error(f"Utilisateur inconnu : {args.username}")
+        user = User(user_data.get('user_id', 1), args.username, user_data['email'])
+        user.transactions = TransactionStore.from_dicts(user_data.get('transactions', []))
+    finally:
+        user_manager.close()
+
+    values, origin = ForecastingService(user).get_daily_series()
+    results = backtest(values, origin, horizon=args.horizon, min_train=args.min_train, step=args.step)
+    print(f"{'modèle':<50} {'origines':>8} {'MAE':>10} {'RMSE':>10} {'err. horizon':>12} {'temps (ms)':>10}")
+    for name, scores in results.items():
+        total_ms = (scores['fit_time'] + scores['predict_time']) * 1000
+        print(f"{name:<50} {scores['runs']:>8} {scores['mae']:>10.2f} {scores['rmse']:>10.2f} "
+              f"{scores['horizon_error']:>12.2f} {total_ms:>10.1f}")
+    print(f"Meilleur modèle : {best_model(results)}")
+
+
+if __name__ == '__main__':
+    main()
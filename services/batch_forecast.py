@@ -0,0 +1,168 @@
+"""
+Calcul des prévisions de tous les utilisateurs (traitement de nuit).
+
+Les utilisateurs sont lus un par un depuis le stockage, réduits à quelques colonnes NumPy
+puis répartis entre plusieurs processus qui appliquent la logique de ForecastingService.
+Les résultats sont écrits au fur et à mesure dans un fichier JSON Lines (une ligne par utilisateur).
+
+Exemple :
+    python -m services.batch_forecast data/forecasts.jsonl --workers 4
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from models.transaction_store import TransactionStore
+from models.user import User
+from services.forecasting import ForecastingService
+
+
+def compact_user_data(user_data: Dict) -> Dict[str, object]:
+    """
+    Réduit les transactions d'un utilisateur à des colonnes NumPy (voir TransactionStore.from_arrays).
+
+    :param user_data: Données de l'utilisateur, au format retourné par UserManager.get_user_data
+    :return: Un dictionnaire de colonnes, peu coûteux à transmettre à un autre processus
+    """
+    transactions = user_data.get('transactions', [])
+    n = len(transactions)
+    categories = {}
+    return {
+        'ids': np.fromiter((t['transaction_id'] for t in transactions), dtype=np.int64, count=n),
+        'amounts': np.fromiter((t['amount'] for t in transactions), dtype=np.float64, count=n),
+        'dates': np.array([t['date'] for t in transactions], dtype='datetime64[us]'),
+        'category_codes': np.fromiter((categories.setdefault(t['category'], len(categories)) for t in transactions),
+                                      dtype=np.int32, count=n),
+        'categories': list(categories)
+    }
+
+
+def iter_compact_users(user_manager) -> Iterator[Tuple[str, Dict[str, object]]]:
+    """
+    Parcourt les utilisateurs du stockage sous forme compacte, en libérant chacun après lecture.
+
+    :param user_manager: Le gestionnaire d'utilisateurs
+    :return: Un itérateur de tuples (nom d'utilisateur, colonnes)
+    """
+    for username in user_manager.iter_usernames():
+        user_data = user_manager.get_user_data(username)
+        if user_data is None:
+            continue
+        columns = compact_user_data(user_data)
+        user_manager.release_user_data(username)
+        yield username, columns
+
+
+def forecast_user(username: str, columns: Dict[str, object], horizon: int = 30) -> Dict[str, object]:
+    """
+    Calcule les prévisions d'un utilisateur à partir de ses colonnes compactes.
+
+    :param username: Nom d'utilisateur
+    :param columns: Colonnes retournées par compact_user_data
+    :param horizon: Nombre de jours de la prévision de solde
+    :return: Un dictionnaire sérialisable avec le solde, le solde prévu, la moyenne quotidienne,
+             l'objectif d'épargne suggéré et le rythme de dépense par catégorie
+    """
+    user = User(None, username, None)
+    user.transactions = TransactionStore.from_arrays(**columns)
+    service = ForecastingService(user)
+    return {
+        'username': username,
+        'transactions': len(user.transactions),
+        'balance': user.get_balance(),
+        'predicted_balance': service.predict_future_balance(horizon),
+        'horizon': horizon,
+        'daily_average': service.get_daily_average(),
+        'savings_goal': service.suggest_savings_goal(),
+        'burn_rates': service.get_burn_rates()
+    }
+
+
+def _log_progress(done: int, elapsed: float):
+    logging.info(f"{done} utilisateurs traités ({done / max(elapsed, 1e-9):.1f} utilisateurs/s)")
+
+
+def run_batch(user_manager, output_path: str, horizon: int = 30, workers: Optional[int] = None,
+              progress: Callable[[int, float], None] = _log_progress, progress_every: int = 100) -> Dict[str, float]:
+    """
+    Calcule les prévisions de tous les utilisateurs et les écrit dans un fichier JSON Lines.
+
+    :param user_manager: Le gestionnaire d'utilisateurs
+    :param output_path: Chemin du fichier de résultats
+    :param horizon: Nombre de jours de la prévision de solde
+    :param workers: Nombre de processus (1 ou None : dans le processus courant)
+    :param progress: Fonction appelée avec (utilisateurs traités, secondes écoulées)
+    :param progress_every: Nombre d'utilisateurs entre deux appels de `progress`
+    :return: Un dictionnaire avec le nombre d'utilisateurs traités ('users'), en erreur ('errors'),
+             la durée ('elapsed') et le débit ('users_per_second')
+    """
+    start = time.perf_counter()
+    stats = {'users': 0, 'errors': 0}
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(output_path, 'w') as output:
+        def record(username, compute):
+            try:
+                result = compute()
+            except Exception:
+                logging.exception(f"Échec de la prévision pour {username}")
+                stats['errors'] += 1
+                return
+            output.write(json.dumps(result) + '\n')
+            stats['users'] += 1
+            if progress and stats['users'] % progress_every == 0:
+                progress(stats['users'], time.perf_counter() - start)
+
+        users = iter_compact_users(user_manager)
+        if workers is None or workers <= 1:
+            for username, columns in users:
+                record(username, lambda: forecast_user(username, columns, horizon))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # Nombre limité de tâches en attente : les utilisateurs ne sont lus qu'au fur et à mesure
+                pending = {}
+                for username, columns in users:
+                    pending[executor.submit(forecast_user, username, columns, horizon)] = username
+                    if len(pending) >= workers * 4:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            record(pending.pop(future), future.result)
+                for future in wait(pending).done:
+                    record(pending.pop(future), future.result)
+
+    stats['elapsed'] = time.perf_counter() - start
+    stats['users_per_second'] = stats['users'] / max(stats['elapsed'], 1e-9)
+    if progress:
+        progress(stats['users'], stats['elapsed'])
+    return stats
+
+
+def main():
+    from services.user_manager import UserManager
+
+    parser = argparse.ArgumentParser(description="Calcule les prévisions de tous les utilisateurs.")
+    parser.add_argument('output', help="Fichier de résultats (JSON Lines)")
+    parser.add_argument('--horizon', type=int, default=30, help="Nombre de jours de la prévision de solde")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Nombre de processus")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+    user_manager = UserManager.from_config()
+    try:
+        stats = run_batch(user_manager, args.output, horizon=args.horizon, workers=args.workers)
+    finally:
+        user_manager.close()
+    print(f"{stats['users']} utilisateurs traités ({stats['errors']} en erreur) en {stats['elapsed']:.1f} s, "
+          f"soit {stats['users_per_second']:.1f} utilisateurs/s.")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,107 @@
 from models.budget import Budget
 from models.user import User
 from models.transaction import Transaction
-from typing import List, Dict
-from datetime import datetime
+from typing import List, Dict, Optional
+from datetime import datetime, timedelta
+from bisect import bisect_right
 import logging
+import math
+import numpy as np
+
+
+class _BudgetIntervals:
+    """
+    Budgets d'une catégorie, triés par date de début, avec un arbre de segments des dates de fin.
+    Les budgets couvrant une date se trouvent en O(log n) par budget trouvé : recherche dichotomique
+    sur les dates de début, puis descente dans l'arbre en écartant les sous-arbres dont la plus
+    grande date de fin précède la date (un budget de longue durée ne force plus à tout parcourir).
+    """
+
+    def __init__(self):
+        self.starts = []
+        self.budgets = []
+        self._size = 0  # Nombre de feuilles de l'arbre (puissance de 2)
+        self._max_ends = None  # Arbre de segments : _max_ends[k] = plus grande date de fin sous le nœud k
+
+    def add(self, budget: Budget):
+        position = bisect_right(self.starts, budget.period_start)
+        self.starts.insert(position, budget.period_start)
+        self.budgets.insert(position, budget)
+        if self._max_ends is not None and position == len(self.budgets) - 1 and position < self._size:
+            # Cas courant : le budget est le plus récent, seul le chemin vers sa feuille est mis à jour
+            node = self._size + position
+            self._max_ends[node] = budget.period_end
+            while node > 1:
+                node //= 2
+                self._max_ends[node] = max(self._max_ends[2 * node], self._max_ends[2 * node + 1])
+        else:
+            self._max_ends = None  # Reconstruit à la prochaine recherche
+
+    def _build(self):
+        self._size = 1
+        while self._size < len(self.budgets):
+            self._size *= 2
+        tree = [datetime.min] * (2 * self._size)
+        tree[self._size:self._size + len(self.budgets)] = [budget.period_end for budget in self.budgets]
+        for node in range(self._size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self._max_ends = tree
+
+    def covering(self, date: datetime) -> List[Budget]:
+        """
+        Retourne les budgets dont la période contient la date, dans l'ordre des dates de début.
+        """
+        if self._max_ends is None:
+            self._build()
+        limit = bisect_right(self.starts, date)  # Seuls budgets[:limit] ont commencé
+        found = []
+        tree = self._max_ends
+        stack = [(1, 0, self._size)]
+        while stack:
+            node, low, high = stack.pop()
+            if low >= limit or tree[node] < date:
+                continue
+            if high - low == 1:
+                found.append(self.budgets[low])
+            else:
+                middle = (low + high) // 2
+                # Sous-arbre droit empilé en premier : les budgets sortent dans l'ordre des débuts
+                stack.append((2 * node + 1, middle, high))
+                stack.append((2 * node, low, middle))
+        return found
+
+    def next_start_after(self, date: datetime) -> Optional[datetime]:
+        position = bisect_right(self.starts, date)
+        return self.starts[position] if position < len(self.starts) else None
+
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _code_or_missing(code):
+    return -1 if code is None else code
+
+
+def _datetime_column(values) -> np.ndarray:
+    """
+    Convertit des datetime en microsecondes depuis l'epoch (plus rapide que np.array(..., 'datetime64[us]')).
+    """
+    return np.fromiter(((value - _EPOCH) // _MICROSECOND for value in values), dtype=np.int64)
 
 
 class BudgetManager:
     """
     Gère les budgets de l'utilisateur par catégorie.
+
+    Le montant dépensé d'un budget (spent) est la somme, en valeur positive, des dépenses
+    de sa catégorie datées dans sa période. Il est maintenu au fil des modifications et
+    peut être recalculé entièrement à partir des transactions (recompute_all).
+
+    Les budgets sont indexés par catégorie et par période. Les budgets actifs à la date
+    courante (l'ensemble « chaud ») sont mis en cache jusqu'à la prochaine échéance :
+    fin d'une période active ou début d'une période future. Les budgets expirés ne sont
+    donc plus parcourus à chaque transaction.
     """
 
     def __init__(self, user: User):
@@ -18,8 +111,73 @@ class BudgetManager:
         :param user: L'utilisateur dont les budgets sont gérés
         """
         self.user = user
+        self._intervals = {}  # Index des périodes, par catégorie
+        self._indexed = None  # (liste indexée, nombre de budgets indexés)
+        self._hot = None  # Budgets actifs à la date du cache, par catégorie
+        self._hot_since = None  # Le cache est valide de cette date jusqu'à la prochaine échéance
+        self._hot_last_day = None
+        self._hot_next_start = None
         logging.debug(f"BudgetManager initialized for user: {user.username}")
 
+    def reindex(self):
+        """
+        Reconstruit l'index des budgets (après une modification directe de leurs périodes).
+        """
+        self._intervals = {}
+        for budget in self.user.budgets:
+            self._intervals.setdefault(budget.category, _BudgetIntervals()).add(budget)
+        self._indexed = (self.user.budgets, len(self.user.budgets))
+        self._hot = None
+
+    def _sync_index(self):
+        """
+        Indexe les budgets ajoutés à la liste de l'utilisateur depuis le dernier appel.
+        """
+        budgets = self.user.budgets
+        if self._indexed is None or self._indexed[0] is not budgets or self._indexed[1] > len(budgets):
+            self.reindex()
+        elif self._indexed[1] < len(budgets):
+            for budget in budgets[self._indexed[1]:]:
+                self._intervals.setdefault(budget.category, _BudgetIntervals()).add(budget)
+            self._indexed = (budgets, len(budgets))
+            self._hot = None
+
+    def get_budgets_covering(self, category: str, date: datetime) -> List[Budget]:
+        """
+        Retourne les budgets d'une catégorie dont la période contient une date donnée.
+
+        :param category: La catégorie du budget
+        :param date: La date (par exemple celle d'une transaction)
+        :return: La liste des budgets couvrant cette date
+        """
+        self._sync_index()
+        intervals = self._intervals.get(category)
+        return intervals.covering(date) if intervals else []
+
+    def get_active_budgets(self, now: Optional[datetime] = None) -> Dict[str, List[Budget]]:
+        """
+        Retourne les budgets actifs à la date courante, par catégorie.
+
+        :param now: Date de référence (par défaut maintenant)
+        :return: Un dictionnaire avec les catégories comme clés et les budgets actifs comme valeurs
+        """
+        self._sync_index()
+        now = now or datetime.now()
+        if self._hot is None or not (self._hot_since <= now <= self._hot_last_day and now < self._hot_next_start):
+            self._hot = {}
+            self._hot_since = now
+            self._hot_last_day = datetime.max  # Fin de période active la plus proche
+            self._hot_next_start = datetime.max  # Début de période future le plus proche
+            for category, intervals in self._intervals.items():
+                active = intervals.covering(now)
+                if active:
+                    self._hot[category] = active
+                    self._hot_last_day = min([self._hot_last_day] + [b.period_end for b in active])
+                next_start = intervals.next_start_after(now)
+                if next_start is not None:
+                    self._hot_next_start = min(self._hot_next_start, next_start)
+        return self._hot
+
 
     def create_budget(self, category: str, amount: float, period_start: datetime, period_end: datetime) -> Budget:
         """
@@ -61,14 +219,13 @@ class BudgetManager:
         :return: Un dictionnaire avec les catégories comme clés et les statuts de budget comme valeurs
         """
         status = {}
-        now = datetime.now()
-        for budget in self.user.budgets:
-            if budget.period_start <= now <= budget.period_end:
-                status[budget.category] = {
-                    "allocated": budget.amount,
-                    "spent": budget.spent,
-                    "remaining": budget.get_remaining()
-                }
+        for category, budgets in self.get_active_budgets().items():
+            budget = budgets[-1]  # En cas de chevauchement, le budget le plus récent
+            status[category] = {
+                "allocated": budget.amount,
+                "spent": budget.spent,
+                "remaining": budget.get_remaining()
+            }
         return status
         
 
@@ -77,26 +234,72 @@ class BudgetManager:
         Met à jour le montant dépensé pour tous les budgets actifs d'une catégorie.
         
         :param category: La catégorie du budget à mettre à jour
-        :param amount: Le montant à ajouter aux dépenses (négatif pour les dépenses)
+        :param amount: Le montant à ajouter aux dépenses (positif pour une dépense, négatif pour l'annuler)
+        :return: La liste des budgets modifiés
         """
-        now = datetime.now()
         logging.debug(f"Updating budget spent for category: {category}, amount: {amount}")
-        for budget in self.user.budgets:
-            if budget.category == category and budget.period_start <= now <= budget.period_end:
-                old_spent = budget.spent
-                budget.add_expense(amount)
-                logging.debug(f"Budget updated: category={category}, old_spent={old_spent}, new_spent={budget.spent}")
+        updated = []
+        for budget in self.get_active_budgets().get(category, ()):
+            old_spent = budget.spent
+            budget.add_expense(amount)
+            updated.append(budget)
+            logging.debug(f"Budget updated: category={category}, old_spent={old_spent}, new_spent={budget.spent}")
+        return updated
+
+    def _add_expense(self, transaction, sign: int, updated: List[Budget]):
+        """
+        Répercute une dépense (sign=1) ou son annulation (sign=-1) sur les budgets
+        couvrant la date de la transaction.
+        """
+        if not transaction.is_expense():
+            return
+        for budget in self.get_budgets_covering(transaction.category, transaction.date):
+            budget.add_expense(-transaction.amount * sign)
+            if budget not in updated:
+                updated.append(budget)
+
+    def handle_new_transaction(self, transaction: Transaction) -> List[Budget]:
+        """
+        Met à jour les budgets suite à l'ajout d'une transaction.
+
+        :param transaction: La transaction ajoutée
+        :return: La liste des budgets modifiés
+        """
+        updated = []
+        self._add_expense(transaction, 1, updated)
+        logging.debug(f"After addition, budgets updated: {[str(b) for b in updated]}")
+        return updated
+
+    def handle_new_transactions(self, records: List[Dict]) -> List[Budget]:
+        """
+        Met à jour les budgets suite à l'ajout en masse de transactions, avec une seule
+        modification par budget.
+
+        :param records: Les transactions ajoutées, au format Transaction.to_dict
+        :return: La liste des budgets modifiés
+        """
+        expenses = {}
+        for record in records:
+            if record['amount'] < 0:
+                date = datetime.fromisoformat(record['date']) if isinstance(record['date'], str) else record['date']
+                for budget in self.get_budgets_covering(record['category'], date):
+                    expenses[budget] = expenses.get(budget, 0.0) - record['amount']
+        for budget, amount in expenses.items():
+            budget.add_expense(amount)
+        return list(expenses)
 
     def handle_transaction_deletion(self, transaction: Transaction):
         """
         Met à jour les budgets suite à la suppression d'une transaction.
         
         :param transaction: La transaction supprimée
+        :return: La liste des budgets modifiés
         """
         logging.debug(f"Handling deletion of transaction: {transaction}")
-        if transaction.is_expense():
-            self.update_budget_spent(transaction.category, -transaction.amount)
-        logging.debug(f"After deletion, budget spent: {self.get_budget_by_category(transaction.category)[0].spent}")
+        updated = []
+        self._add_expense(transaction, -1, updated)
+        logging.debug(f"After deletion, budgets updated: {[str(b) for b in updated]}")
+        return updated
 
     def handle_transaction_update(self, old_transaction: Transaction, new_transaction: Transaction):
         """
@@ -104,10 +307,76 @@ class BudgetManager:
         
         :param old_transaction: L'ancienne version de la transaction
         :param new_transaction: La nouvelle version de la transaction
+        :return: La liste des budgets modifiés
         """
         logging.debug(f"Handling update of transaction: Old={old_transaction}, New={new_transaction}")
-        if old_transaction.is_expense():
-            self.update_budget_spent(old_transaction.category, -old_transaction.amount)
-        if new_transaction.is_expense():
-            self.update_budget_spent(new_transaction.category, new_transaction.amount)
-        logging.debug(f"After update, budget spent: {self.get_budget_by_category(new_transaction.category)[0].spent}")
+        updated = []
+        self._add_expense(old_transaction, -1, updated)
+        self._add_expense(new_transaction, 1, updated)
+        logging.debug(f"After update, budgets updated: {[str(b) for b in updated]}")
+        return updated
+
+    def compute_spent(self) -> np.ndarray:
+        """
+        Calcule le montant dépensé de chaque budget à partir des transactions, en un seul
+        passage vectorisé : les transactions sont triées par (catégorie, date), et les bornes
+        de chaque budget sont recherchées par dichotomie dans les sommes cumulées des dépenses.
+
+        :return: Le montant dépensé de chaque budget, dans l'ordre de user.budgets
+        """
+        budgets = self.user.budgets
+        store = self.user.transactions
+        spent = np.zeros(len(budgets))
+        if not budgets or not len(store):
+            return spent
+        codes = np.fromiter((_code_or_missing(store.category_code(b.category)) for b in budgets),
+                            dtype=np.int64, count=len(budgets))
+        known = codes >= 0
+        if not known.any():
+            return spent
+        codes = codes[known]
+        starts = _datetime_column(b.period_start for b, k in zip(budgets, known) if k)
+        ends = _datetime_column(b.period_end for b, k in zip(budgets, known) if k)
+
+        # Clé entière unique (catégorie, date) : la date est décalée par rapport à la plus ancienne.
+        # Si la clé risque de déborder, les dates sont remplacées par leur rang parmi les dates connues.
+        dates = store.dates.view(np.int64)
+        origin = int(min(dates.min(), starts.min()))
+        span = int(max(dates.max(), ends.max())) - origin + 1
+        if span * len(store.categories) < 2 ** 62:
+            date_offsets, start_offsets, end_offsets = dates - origin, starts - origin, ends - origin
+        else:
+            all_dates = np.unique(np.concatenate([dates, starts, ends]))
+            span = len(all_dates)
+            date_offsets, start_offsets, end_offsets = (np.searchsorted(all_dates, values)
+                                                        for values in (dates, starts, ends))
+        keys = store.category_codes.astype(np.int64) * span + date_offsets
+        order = np.argsort(keys)
+        sorted_keys = keys[order]
+        amounts = store.amounts
+        expenses = np.where(amounts < 0, -amounts, 0.0)[order]
+        cumulative = np.concatenate([[0.0], np.cumsum(expenses)])
+
+        low = np.searchsorted(sorted_keys, codes * span + start_offsets, side='left')
+        high = np.searchsorted(sorted_keys, codes * span + end_offsets, side='right')
+        spent[known] = cumulative[high] - cumulative[low]
+        return spent
+
+    def recompute_all(self, verify_only: bool = False) -> List[Budget]:
+        """
+        Recalcule le montant dépensé de tous les budgets à partir des transactions.
+
+        :param verify_only: Signale les écarts sans corriger les budgets
+        :return: La liste des budgets dont le montant dépensé était incorrect
+        """
+        drifted = []
+        for budget, spent in zip(self.user.budgets, self.compute_spent().tolist()):
+            if not math.isclose(budget.spent, spent, abs_tol=1e-6):
+                logging.debug(f"Budget {budget.budget_id} incohérent : spent={budget.spent}, attendu={spent}")
+                drifted.append(budget)
+                if not verify_only:
+                    budget.spent = spent
+        if drifted:
+            logging.warning(f"{len(drifted)} budget(s) incohérent(s) pour {self.user.username}"
+                            + ("" if verify_only else ", montants recalculés"))
+        return drifted
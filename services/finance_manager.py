@@ -1,11 +1,23 @@
 from models.transaction import Transaction
 from models.user import User
-from typing import List, Dict, Optional
+from services.search_index import SearchIndex
+from services.monthly_rollup import MonthlyRollup
+from typing import Iterable, Iterator, List, Dict, Optional
 from datetime import datetime
+import logging
+import math
+import numpy as np
+
+SORT_FIELDS = ('date', 'amount', 'category', 'transaction_id')
 
 class FinanceManager:
     """
     Gère les opérations financières de l'utilisateur, y compris les transactions et les catégories.
+
+    Le solde et les totaux par catégorie sont maintenus au fil des ajouts, modifications et
+    suppressions. Si les transactions sont modifiées en dehors du gestionnaire (chargement,
+    modification directe d'une transaction), le numéro de version du stockage change et
+    les totaux sont recalculés à la lecture suivante.
     """
 
     def __init__(self, user: User):
@@ -16,6 +28,13 @@ class FinanceManager:
         """
         self.user = user
         self.categories = set()  # Ensemble pour stocker les catégories uniques
+        self.balance = 0.0  # Solde courant
+        self.category_totals = {}  # Total courant par catégorie
+        self._store = None  # Stockage pour lequel les totaux ont été calculés
+        self._synced_version = None  # Version du stockage correspondant aux totaux
+        self.search_index = None  # Index plein texte, construit à la première recherche (voir get_search_index)
+        self.monthly_rollup = None  # Agrégats mensuels, chargés au premier rapport (voir get_monthly_rollup)
+        self.rebuild_totals()
 
     def add_transaction(self, amount, category, description="", date=None):
         """
@@ -27,7 +46,8 @@ class FinanceManager:
         :param date: La date de la transaction (optionnel)
         :return: La transaction créée
         """
-        transaction_id = len(self.user.transactions) + 1
+        self._sync()
+        transaction_id = self.user.allocate_transaction_id()
         transaction = Transaction(
             transaction_id=transaction_id,
             user_id=self.user.user_id,
@@ -38,17 +58,127 @@ class FinanceManager:
         )
         self.user.add_transaction(transaction)
         self.categories.add(category)  # Ajout de la catégorie à l'ensemble des catégories
+        self._apply_delta(category, transaction.amount)
+        if self.search_index is not None:
+            self.search_index.add(transaction_id, transaction.description, category)
+        if self.monthly_rollup is not None:
+            self.monthly_rollup.add(transaction.date, category, transaction.amount)
+        self._mark_synced()
         return transaction
 
-    # Les méthodes suivantes restent inchangées
+    def add_transactions(self, rows: Iterable[Dict]) -> List[Dict]:
+        """
+        Ajoute plusieurs transactions en une seule opération. Toutes les lignes sont
+        validées avant l'ajout : en cas d'erreur, aucune transaction n'est ajoutée.
+
+        :param rows: Dictionnaires avec 'amount', 'category' et éventuellement 'description' et 'date'
+        :return: Les transactions ajoutées, au format Transaction.to_dict
+        """
+        self._sync()
+        records = [self._validate_row(index, row) for index, row in enumerate(rows)]
+        for record in records:
+            record['transaction_id'] = self.user.allocate_transaction_id()
+        self.user.transactions.extend_dicts(records)
+        for record in records:
+            self.categories.add(record['category'])
+            self._apply_delta(record['category'], record['amount'])
+            if self.search_index is not None:
+                self.search_index.add(record['transaction_id'], record['description'], record['category'])
+            if self.monthly_rollup is not None:
+                self.monthly_rollup.add(datetime.fromisoformat(record['date']), record['category'], record['amount'])
+        self._mark_synced()
+        return records
+
+    def _validate_row(self, index: int, row: Dict) -> Dict:
+        """
+        Vérifie et normalise une ligne d'import.
+
+        :param index: Position de la ligne (pour le message d'erreur)
+        :param row: Dictionnaire représentant la transaction
+        :return: Un dictionnaire au format Transaction.to_dict, sans identifiant
+        """
+        try:
+            amount = float(row['amount'])
+            category = row['category']
+            date = row.get('date')
+            if date is None:
+                date = datetime.now()
+            elif isinstance(date, str):
+                date = datetime.fromisoformat(date)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Ligne {index} invalide : {e!r}") from e
+        if not math.isfinite(amount) or not isinstance(category, str) or not category:
+            raise ValueError(f"Ligne {index} invalide : {row!r}")
+        return {
+            'user_id': self.user.user_id,
+            'amount': amount,
+            'category': category,
+            'description': row.get('description') or "",
+            'date': date.isoformat()
+        }
+
+    def rebuild_totals(self):
+        """
+        Recalcule entièrement le solde et les totaux par catégorie à partir des transactions.
+        """
+        store = self.user.transactions
+        self.balance = store.total()
+        self.category_totals = store.totals_by_category()
+        self.categories = set(self.category_totals)
+        self._store = store
+        self._synced_version = store.version
+        self.search_index = None  # Reconstruit à la prochaine recherche
+        self.monthly_rollup = None  # Recalculés au prochain rapport
+
+    def verify_totals(self, rebuild=True) -> bool:
+        """
+        Vérifie que le solde et les totaux maintenus correspondent aux transactions.
+
+        :param rebuild: Recalcule les totaux en cas d'écart
+        :return: True si les totaux sont cohérents, False sinon
+        """
+        store = self.user.transactions
+        expected = store.totals_by_category()
+        consistent = (
+            store is self._store
+            and math.isclose(self.balance, store.total(), abs_tol=1e-6)
+            and expected.keys() == self.category_totals.keys()
+            and all(math.isclose(total, self.category_totals[category], abs_tol=1e-6)
+                    for category, total in expected.items())
+        )
+        if not consistent:
+            logging.warning(f"Totaux incohérents pour {self.user.username}, recalcul nécessaire")
+            if rebuild:
+                self.rebuild_totals()
+        return consistent
+
+    def _sync(self):
+        """
+        Recalcule les totaux si les transactions ont été modifiées en dehors du gestionnaire.
+        """
+        store = self.user.transactions
+        if store is not self._store or store.version != self._synced_version:
+            self.rebuild_totals()
+
+    def _mark_synced(self):
+        self._synced_version = self.user.transactions.version
+        if self.search_index is not None:
+            self.search_index.version = self._synced_version
+        if self.monthly_rollup is not None:
+            self.monthly_rollup.version = self._synced_version
+
+    def _apply_delta(self, category: str, amount: float):
+        self.balance += amount
+        self.category_totals[category] = self.category_totals.get(category, 0.0) + amount
 
     def get_balance(self) -> float:
         """
-        Calcule et retourne le solde actuel de l'utilisateur.
+        Retourne le solde actuel de l'utilisateur.
         
         :return: Le solde actuel
         """
-        return sum(transaction.amount for transaction in self.user.transactions)
+        self._sync()
+        return self.balance
 
     def get_transactions_by_category(self, category: str) -> List[Transaction]:
         """
@@ -57,7 +187,8 @@ class FinanceManager:
         :param category: La catégorie à filtrer
         :return: Une liste des transactions de la catégorie spécifiée
         """
-        return [t for t in self.user.transactions if t.category == category]
+        store = self.user.transactions
+        return [store[row] for row in store.rows_for_category(category)]
 
     def get_total_by_category(self) -> Dict[str, float]:
         """
@@ -65,11 +196,8 @@ class FinanceManager:
         
         :return: Un dictionnaire avec les catégories comme clés et les totaux comme valeurs
         """
-        totals = {}
-        for category in self.categories:
-            total = sum(t.amount for t in self.user.transactions if t.category == category)
-            totals[category] = total
-        return totals
+        self._sync()
+        return dict(self.category_totals)
 
     def get_transactions_for_period(self, start_date: datetime, end_date: datetime) -> List[Transaction]:
         """
@@ -79,8 +207,157 @@ class FinanceManager:
         :param end_date: La date de fin de la période
         :return: Une liste des transactions dans la période spécifiée
         """
-        return [t for t in self.user.transactions if start_date <= t.date <= end_date]
+        store = self.user.transactions
+        return [store[row] for row in store.rows_between(start_date, end_date)]
     
+    def iter_transactions_for_period(self, start_date: datetime = None, end_date: datetime = None,
+                                     chunk_size: int = 10000) -> Iterator[Dict[str, object]]:
+        """
+        Parcourt par paquets, dans l'ordre chronologique, les transactions d'une période
+        (même sélection que get_transactions_for_period), sans créer d'objet Transaction.
+
+        :param start_date: La date de début de la période, incluse (optionnel)
+        :param end_date: La date de fin de la période, incluse (optionnel)
+        :param chunk_size: Nombre de transactions par paquet
+        :return: Un itérateur de paquets de colonnes (voir TransactionStore.columns_for_rows)
+        """
+        store = self.user.transactions
+        rows = store.rows_between(start_date, end_date)
+        for offset in range(0, len(rows), chunk_size):
+            yield store.columns_for_rows(rows[offset:offset + chunk_size])
+
+    def query_transactions(self, category: str = None, start_date: datetime = None, end_date: datetime = None,
+                           min_amount: float = None, max_amount: float = None, sort_by: str = 'date',
+                           descending: bool = True, offset: int = 0, limit: int = 50) -> Dict[str, object]:
+        """
+        Recherche des transactions avec filtres, tri et pagination. Le filtrage et le tri portent
+        sur les colonnes du stockage ; seules les transactions de la page demandée sont matérialisées.
+
+        :param category: Catégorie recherchée (optionnel)
+        :param start_date: Date de début de la période, incluse (optionnel)
+        :param end_date: Date de fin de la période, incluse (optionnel)
+        :param min_amount: Montant minimal, inclus (optionnel)
+        :param max_amount: Montant maximal, inclus (optionnel)
+        :param sort_by: Colonne de tri : 'date', 'amount', 'category' ou 'transaction_id'
+        :param descending: Tri décroissant (par défaut les plus récentes d'abord)
+        :param offset: Nombre de transactions à sauter
+        :param limit: Nombre maximal de transactions retournées (None : toutes)
+        :return: Un dictionnaire avec 'total' (nombre de transactions correspondant aux filtres)
+                 et 'transactions' (les transactions de la page)
+        :raises ValueError: Si la colonne de tri est inconnue
+        """
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Colonne de tri inconnue : {sort_by}")
+        store = self.user.transactions
+        if start_date is not None or end_date is not None:
+            rows = store.rows_between(start_date, end_date)
+        else:
+            rows = np.arange(len(store))
+        if category is not None:
+            code = store.category_code(category)
+            rows = rows[store.category_codes[rows] == code] if code is not None else rows[:0]
+        if min_amount is not None:
+            rows = rows[store.amounts[rows] >= min_amount]
+        if max_amount is not None:
+            rows = rows[store.amounts[rows] <= max_amount]
+
+        # Lignes dans l'ordre d'insertion : à clé égale, le tri stable conserve cet ordre
+        rows = np.sort(rows)
+        if sort_by == 'category':
+            # Rang alphabétique de chaque code de catégorie
+            ranks = np.empty(len(store.categories), dtype=np.int64)
+            ranks[np.argsort(np.array(store.categories, dtype=object))] = np.arange(len(ranks))
+            keys = ranks[store.category_codes[rows]]
+        elif sort_by == 'date':
+            keys = store.dates[rows]
+        elif sort_by == 'amount':
+            keys = store.amounts[rows]
+        else:
+            keys = store.ids[rows]
+        order = np.argsort(keys, kind='stable')
+        if descending:
+            order = order[::-1]
+        end = None if limit is None else offset + limit
+        return {
+            'total': len(rows),
+            'transactions': [store[row] for row in rows[order[offset:end]].tolist()]
+        }
+
+    def get_search_index(self, path: str = None) -> SearchIndex:
+        """
+        Retourne l'index plein texte des transactions, à jour. Il est construit (ou relu depuis
+        un fichier, s'il correspond toujours aux transactions) lors du premier appel, puis tenu
+        à jour à chaque modification.
+
+        :param path: Fichier de l'index enregistré (optionnel)
+        :return: L'index
+        """
+        self._sync()
+        if self.search_index is None:
+            store = self.user.transactions
+            index = SearchIndex.load(path, store) if path else None
+            self.search_index = index if index is not None else SearchIndex.build(store)
+            self.search_index.version = store.version
+        return self.search_index
+
+    def get_monthly_rollup(self, path: str = None) -> MonthlyRollup:
+        """
+        Retourne les agrégats mensuels par catégorie, à jour. Ils sont calculés (ou relus depuis
+        un fichier, s'ils correspondent toujours aux transactions) lors du premier appel, puis tenus
+        à jour à chaque modification.
+
+        :param path: Fichier des agrégats enregistrés (optionnel)
+        :return: Les agrégats
+        """
+        self._sync()
+        if self.monthly_rollup is None:
+            store = self.user.transactions
+            rollup = MonthlyRollup.load(path, store) if path else None
+            self.monthly_rollup = rollup if rollup is not None else MonthlyRollup.build(store)
+            self.monthly_rollup.version = store.version
+        return self.monthly_rollup
+
+    def search_transactions(self, query: str, start_date: datetime = None, end_date: datetime = None,
+                            category: str = None, prefix: bool = True, limit: int = 50) -> Dict[str, object]:
+        """
+        Recherche les transactions dont la description ou la catégorie contient tous les mots d'une requête.
+        Seules les transactions contenant les mots demandés sont examinées (voir SearchIndex).
+
+        :param query: Les mots recherchés
+        :param start_date: Date de début de la période, incluse (optionnel)
+        :param end_date: Date de fin de la période, incluse (optionnel)
+        :param category: Catégorie recherchée (optionnel)
+        :param prefix: Le dernier mot peut n'être que le début d'un mot
+        :param limit: Nombre maximal de transactions retournées (None : toutes)
+        :return: Un dictionnaire avec 'total' (nombre de transactions trouvées) et 'transactions'
+                 (les plus récentes d'abord)
+        """
+        store = self.user.transactions
+        ids = self.get_search_index().lookup(query, prefix)
+        rows = np.array([row for row in map(store.find_row, ids) if row is not None], dtype=np.int64)
+        if start_date is not None:
+            rows = rows[store.dates[rows] >= np.datetime64(start_date)]
+        if end_date is not None:
+            rows = rows[store.dates[rows] <= np.datetime64(end_date)]
+        if category is not None:
+            code = store.category_code(category)
+            rows = rows[store.category_codes[rows] == code] if code is not None else rows[:0]
+        rows = rows[np.argsort(store.dates[rows], kind='stable')[::-1]]
+        return {
+            'total': len(rows),
+            'transactions': [store[row] for row in rows[:limit].tolist()]
+        }
+
+    def get_balance_as_of(self, date: datetime) -> float:
+        """
+        Retourne le solde à une date donnée (transactions datées au plus tard de cette date).
+
+        :param date: La date de référence
+        :return: Le solde à cette date
+        """
+        self._sync()
+        return self.user.transactions.balance_as_of(date, total=self.balance)
+
     def delete_transaction(self, transaction_id: int) -> Optional[Transaction]:
         """
         Supprime une transaction de l'utilisateur.
@@ -88,16 +365,25 @@ class FinanceManager:
         :param transaction_id: L'ID de la transaction à supprimer
         :return: La transaction supprimée ou None si non trouvée
         """
-        for i, transaction in enumerate(self.user.transactions):
-            if transaction.transaction_id == transaction_id:
-                deleted_transaction = self.user.transactions.pop(i)
-                
-                # Mise à jour des catégories si nécessaire
-                if not any(t.category == deleted_transaction.category for t in self.user.transactions):
-                    self.categories.remove(deleted_transaction.category)
-                
-                return deleted_transaction
-        return None
+        self._sync()
+        store = self.user.transactions
+        row = store.find_row(transaction_id)
+        if row is None:
+            return None
+        deleted_transaction = store.swap_pop(row)  # O(1) : l'ordre des lignes n'a pas d'importance ici
+        self._apply_delta(deleted_transaction.category, -deleted_transaction.amount)
+        if self.search_index is not None:
+            self.search_index.remove(transaction_id, deleted_transaction.description, deleted_transaction.category)
+        if self.monthly_rollup is not None:
+            self.monthly_rollup.remove(deleted_transaction.date, deleted_transaction.category, deleted_transaction.amount)
+
+        # Mise à jour des catégories si nécessaire
+        if not store.count_category(deleted_transaction.category):
+            self.categories.discard(deleted_transaction.category)
+            self.category_totals.pop(deleted_transaction.category, None)
+
+        self._mark_synced()
+        return deleted_transaction
 
     def update_transaction(self, transaction_id: int, amount: float, category: str, description: str) -> Optional[Transaction]:
         """
@@ -109,17 +395,32 @@ class FinanceManager:
         :param description: La nouvelle description
         :return: La transaction mise à jour ou None si non trouvée
         """
-        for transaction in self.user.transactions:
-            if transaction.transaction_id == transaction_id:
-                old_category = transaction.category
-                transaction.amount = amount
-                transaction.category = category
-                transaction.description = description
-                
-                # Mise à jour des catégories si nécessaire
-                self.categories.add(category)
-                if not any(t.category == old_category for t in self.user.transactions):
-                    self.categories.remove(old_category)
-                
-                return transaction
-        return None
\ No newline at end of file
+        self._sync()
+        store = self.user.transactions
+        row = store.find_row(transaction_id)
+        if row is None:
+            return None
+        transaction = store[row]
+        old_category = transaction.category
+        if self.search_index is not None:
+            self.search_index.remove(transaction_id, transaction.description, old_category)
+        if self.monthly_rollup is not None:
+            self.monthly_rollup.remove(transaction.date, old_category, transaction.amount)
+        self._apply_delta(old_category, -transaction.amount)
+        transaction.amount = amount
+        transaction.category = category
+        transaction.description = description
+        self._apply_delta(category, transaction.amount)
+        if self.search_index is not None:
+            self.search_index.add(transaction_id, description, category)
+        if self.monthly_rollup is not None:
+            self.monthly_rollup.add(transaction.date, category, transaction.amount)
+
+        # Mise à jour des catégories si nécessaire
+        self.categories.add(category)
+        if not store.count_category(old_category):
+            self.categories.discard(old_category)
+            self.category_totals.pop(old_category, None)
+
+        self._mark_synced()
+        return transaction
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""
+Modèles de prévision des flux quotidiens.
+
+Chaque modèle est ajusté sur une série de montants quotidiens (un élément par jour,
+le premier correspondant à la date `origin`) puis prédit les montants des jours suivants.
+Tous les calculs sont vectorisés sur la série.
+"""
+import numpy as np
+
+
+class ForecastModel:
+    """
+    Interface commune des modèles de prévision.
+    """
+
+    name = 'base'
+
+    def fit(self, values: np.ndarray, origin: np.datetime64) -> 'ForecastModel':
+        """
+        Ajuste le modèle sur une série quotidienne.
+
+        :param values: Montants quotidiens, du plus ancien au plus récent
+        :param origin: Date (datetime64[D]) du premier élément de la série
+        :return: Le modèle lui-même
+        """
+        raise NotImplementedError
+
+    def predict(self, horizon: int) -> np.ndarray:
+        """
+        Prédit les montants des jours qui suivent la série d'ajustement.
+
+        :param horizon: Nombre de jours à prédire
+        :return: Tableau de `horizon` montants quotidiens
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class FlatAverageModel(ForecastModel):
+    """
+    Moyenne des derniers jours, prolongée telle quelle (comportement historique du service).
+    """
+
+    name = 'flat'
+
+    def __init__(self, window: int = 30):
+        """
+        :param window: Nombre de jours de la moyenne
+        """
+        self.window = window
+        self.level = 0.0
+
+    def fit(self, values, origin):
+        # Les jours antérieurs à l'historique comptent pour zéro, comme dans la moyenne sur 30 jours d'origine
+        self.level = float(values[-self.window:].sum()) / self.window if len(values) else 0.0
+        return self
+
+    def predict(self, horizon):
+        return np.full(horizon, self.level)
+
+    def __repr__(self):
+        return f"FlatAverageModel(window={self.window})"
+
+
+class EwmaModel(ForecastModel):
+    """
+    Lissage exponentiel simple : les jours récents pèsent davantage que les jours anciens.
+    """
+
+    name = 'ewma'
+
+    def __init__(self, alpha: float = 0.05):
+        """
+        :param alpha: Facteur de lissage (entre 0 et 1) ; plus il est grand, plus le modèle est réactif
+        """
+        self.alpha = alpha
+        self.level = 0.0
+
+    def fit(self, values, origin):
+        if not len(values):
+            self.level = 0.0
+            return self
+        # Poids (1 - alpha)^k du jour le plus récent (k = 0) au plus ancien, normalisés
+        # pour un historique fini ; les poids négligeables (< 1e-12) sont ignorés
+        span = len(values)
+        if self.alpha >= 1:
+            span = 1
+        elif self.alpha > 0:
+            span = min(span, int(np.log(1e-12) / np.log1p(-self.alpha)) + 1)
+        weights = (1 - self.alpha) ** np.arange(span - 1, -1, -1)
+        self.level = float(np.dot(values[-span:], weights) / weights.sum())
+        return self
+
+    def predict(self, horizon):
+        return np.full(horizon, self.level)
+
+    def __repr__(self):
+        return f"EwmaModel(alpha={self.alpha})"
+
+
+class SeasonalModel(ForecastModel):
+    """
+    Décomposition saisonnière : niveau récent + profil par jour du mois (salaire, loyer)
+    + profil par jour de la semaine (courses du week-end).
+    """
+
+    name = 'seasonal'
+
+    def __init__(self, window: int = 56, weekly: bool = True, monthly: bool = True):
+        """
+        :param window: Nombre de jours servant à estimer le niveau et le profil hebdomadaire
+        :param weekly: Active la composante hebdomadaire
+        :param monthly: Active la composante mensuelle (estimée sur tout l'historique)
+        """
+        self.window = window
+        self.weekly = weekly
+        self.monthly = monthly
+        self.level = 0.0
+        self.weekday_profile = np.zeros(7)
+        self.monthday_profile = np.zeros(31)
+        self.next_day = None
+
+    @staticmethod
+    def _profile(keys, values, size):
+        """
+        Écart moyen à la moyenne générale, par valeur de clé (jour de la semaine ou du mois).
+        """
+        counts = np.bincount(keys, minlength=size)
+        sums = np.bincount(keys, weights=values, minlength=size)
+        means = np.divide(sums, counts, out=np.zeros(size), where=counts > 0)
+        return np.where(counts > 0, means - values.mean(), 0.0)
+
+    @staticmethod
+    def _calendar(days):
+        weekdays = (days.astype(np.int64) + 3) % 7  # Le 1970-01-01 était un jeudi (lundi = 0)
+        monthdays = (days - days.astype('datetime64[M]').astype('datetime64[D]')).astype(np.int64)
+        return weekdays, monthdays
+
+    def fit(self, values, origin):
+        values = np.asarray(values, dtype=np.float64)
+        origin = np.datetime64(origin, 'D')
+        self.next_day = origin + len(values)
+        if not len(values):
+            self.level = 0.0
+            return self
+        weekdays, monthdays = self._calendar(origin + np.arange(len(values)))
+        residual = values
+        self.monthday_profile = np.zeros(31)
+        if self.monthly:
+            self.monthday_profile = self._profile(monthdays, values, 31)
+            residual = values - self.monthday_profile[monthdays]
+        recent = residual[-self.window:]
+        self.level = float(recent.mean())
+        self.weekday_profile = np.zeros(7)
+        if self.weekly:
+            self.weekday_profile = self._profile(weekdays[-self.window:], recent, 7)
+        return self
+
+    def predict(self, horizon):
+        if self.next_day is None:
+            return np.zeros(horizon)
+        weekdays, monthdays = self._calendar(self.next_day + np.arange(horizon))
+        return self.level + self.weekday_profile[weekdays] + self.monthday_profile[monthdays]
+
+    def __repr__(self):
+        return f"SeasonalModel(window={self.window}, weekly={self.weekly}, monthly={self.monthly})"
+
+
+def default_models():
+    """
+    Retourne les modèles comparés par défaut lors d'un backtest.
+
+    :return: Liste de modèles non ajustés
+    """
+    return [FlatAverageModel(), EwmaModel(), SeasonalModel()]
@@ -1,72 +1,262 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
+import numpy as np
 from models.transaction import Transaction
 from models.user import User
+from services.backtesting import backtest, best_model
+from services.forecast_models import FlatAverageModel, ForecastModel, default_models
+from services.monte_carlo import simulate_balance
+import config
+
+
+class _CashFlow:
+    """
+    Flux de trésorerie quotidiens d'un utilisateur, par catégorie (jour × catégorie),
+    calculés en une seule passe sur les colonnes du TransactionStore.
+    Les entrées (montants positifs) et les sorties (montants négatifs) sont séparées.
+    """
+
+    def __init__(self, store, today: np.datetime64):
+        """
+        :param store: Le TransactionStore de l'utilisateur
+        :param today: Le jour courant (datetime64[D]), toujours inclus dans la série
+        """
+        self.categories = store.categories
+        days = store.dates.astype('datetime64[D]')
+        self.origin = min(days.min(), today) if len(days) else today
+        self.today = int((today - self.origin).astype(np.int64))
+        day_numbers = (days - self.origin).astype(np.int64)
+        n_days = max(int(day_numbers.max()) + 1 if len(days) else 0, self.today + 1)
+        n_categories = max(len(self.categories), 1)
+        cells = day_numbers * n_categories + store.category_codes
+        amounts = store.amounts
+        size = n_days * n_categories
+        self.inflow = np.bincount(cells, weights=np.where(amounts > 0, amounts, 0.0),
+                                  minlength=size).reshape(n_days, n_categories)
+        self.outflow = np.bincount(cells, weights=np.where(amounts < 0, amounts, 0.0),
+                                   minlength=size).reshape(n_days, n_categories)
+        self.counts = np.bincount(cells, minlength=size).reshape(n_days, n_categories)
+        self.net = (self.inflow + self.outflow).sum(axis=1)  # Variation du solde par jour
+        self.balance = np.cumsum(self.net)  # Solde en fin de journée
+        first_days = np.argmax(self.counts > 0, axis=0)
+        self.first_day = np.where(self.counts.any(axis=0), first_days, -1)  # Premier jour actif, par catégorie
+
+    def day_number(self, date) -> int:
+        """
+        Convertit une date en numéro de jour dans la série (peut être hors de la série).
+        """
+        return int((np.datetime64(date, 'D') - self.origin).astype(np.int64))
+
+    def recent(self, days: int) -> slice:
+        """
+        Tranche des lignes des `days` derniers jours (aujourd'hui inclus, ainsi que les transactions futures).
+        """
+        return slice(max(self.today - days + 1, 0), None)
+
 
 class ForecastingService:
     """
     Service pour effectuer des prévisions financières basées sur l'historique des transactions.
+
+    Les prévisions sont calculées à partir d'une matrice des flux quotidiens par catégorie,
+    construite une fois puis mise en cache. Le cache est invalidé lorsque la version du
+    TransactionStore change (ajout, modification ou suppression de transaction) ou au changement de jour.
+    Le solde futur est prévu par un modèle interchangeable (voir services.forecast_models).
     """
 
-    def __init__(self, user: User):
+    def __init__(self, user: User, model: ForecastModel = None):
         """
         Initialise le service de prévision pour un utilisateur donné.
-        
+
         :param user: L'utilisateur pour lequel les prévisions sont faites
+        :param model: Modèle de prévision des flux quotidiens (par défaut la moyenne des 30 derniers jours)
         """
         self.user = user
+        self.model = model or FlatAverageModel(30)
+        self._cash_flow = None
+        self._cache_key = None  # (stockage, version, jour) correspondant au cache
+
+    def _get_cash_flow(self) -> _CashFlow:
+        """
+        Retourne la matrice des flux quotidiens, recalculée si les transactions ont changé.
+        """
+        store = self.user.transactions
+        today = np.datetime64(datetime.now().date(), 'D')
+        key = (id(store), store.version, today)
+        if self._cash_flow is None or self._cache_key != key:
+            self._cash_flow = _CashFlow(store, today)
+            self._cache_key = key
+        return self._cash_flow
+
+    def get_daily_series(self) -> Tuple[np.ndarray, np.datetime64]:
+        """
+        Retourne la variation quotidienne du solde jusqu'à aujourd'hui inclus.
+
+        :return: Un tuple (montants quotidiens, date du premier jour)
+        """
+        cash_flow = self._get_cash_flow()
+        return cash_flow.net[:cash_flow.today + 1], cash_flow.origin
+
+    def predict_daily_flows(self, days: int) -> np.ndarray:
+        """
+        Prédit la variation du solde pour chacun des prochains jours avec le modèle courant.
+
+        :param days: Nombre de jours à prédire
+        :return: Tableau des variations quotidiennes prévues
+        """
+        values, origin = self.get_daily_series()
+        return self.model.fit(values, origin).predict(days)
 
     def predict_future_balance(self, days: int) -> float:
         """
         Prédit le solde futur basé sur les tendances des transactions passées.
-        
+
         :param days: Nombre de jours dans le futur pour la prévision
         :return: Le solde prévu
         """
-        current_balance = sum(t.amount for t in self.user.transactions)
-        daily_average = self._calculate_daily_average()
-        predicted_change = daily_average * days
+        current_balance = self.user.transactions.total()
+        predicted_change = float(self.predict_daily_flows(days).sum())
         return current_balance + predicted_change
 
-    def _calculate_daily_average(self) -> float:
+    def simulate_future_balance(self, days: int, threshold: Optional[float] = None,
+                                history_days: int = config.MONTE_CARLO_HISTORY_DAYS, **options) -> Dict:
+        """
+        Projette le solde par simulation de Monte-Carlo : les flux des prochains jours sont tirés
+        parmi les flux quotidiens des derniers jours de l'historique.
+
+        :param days: Nombre de jours dans le futur
+        :param threshold: Seuil de solde dont on estime la probabilité de franchissement (optionnel)
+        :param history_days: Nombre de jours d'historique servant au tirage
+        :param options: Options de services.monte_carlo.simulate_balance
+                        (n_paths, percentiles, seed, time_budget, workers, chunk_size)
+        :return: Bandes de confiance par centile, probabilité de passer sous le seuil,
+                 nombre de trajectoires simulées et durée (voir simulate_balance)
+        """
+        values, _ = self.get_daily_series()
+        return simulate_balance(values[-history_days:], self.user.transactions.total(), days,
+                                threshold=threshold, **options)
+
+    def select_model(self, models: List[ForecastModel] = None, horizon: int = 30,
+                     metric: str = 'horizon_error') -> Dict[str, Dict[str, float]]:
+        """
+        Évalue plusieurs modèles sur l'historique de l'utilisateur et retient le plus précis.
+        Le modèle courant est conservé si l'historique est trop court pour les comparer.
+
+        :param models: Modèles candidats (par défaut default_models())
+        :param horizon: Nombre de jours prédits lors de l'évaluation
+        :param metric: Métrique à minimiser (voir services.backtesting.backtest)
+        :return: Les résultats de l'évaluation, par modèle
+        """
+        models = models if models is not None else default_models()
+        values, origin = self.get_daily_series()
+        results = backtest(values, origin, models, horizon=horizon)
+        best = best_model(results, metric)
+        if best is not None:
+            self.model = next(model for model in models if repr(model) == best)
+        return results
+
+    def get_daily_average(self) -> float:
         """
         Calcule la moyenne quotidienne des transactions sur les 30 derniers jours.
-        
+
         :return: La moyenne quotidienne des transactions
         """
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        recent_transactions = [t for t in self.user.transactions if t.date >= thirty_days_ago]
-        if not recent_transactions:
-            return 0
-        total_amount = sum(t.amount for t in recent_transactions)
-        return total_amount / 30
+        income, expenses = self.user.transactions.trailing_sums(30)
+        return (income + expenses) / 30
 
     def predict_category_spending(self, category: str, days: int) -> float:
         """
         Prédit les dépenses futures pour une catégorie spécifique.
-        
+
         :param category: La catégorie pour laquelle faire la prévision
         :param days: Nombre de jours dans le futur pour la prévision
         :return: Les dépenses prévues pour la catégorie
         """
-        category_transactions = [t for t in self.user.transactions if t.category == category]
-        if not category_transactions:
+        cash_flow = self._get_cash_flow()
+        code = self.user.transactions.category_code(category)
+        if code is None or cash_flow.first_day[code] < 0:
             return 0
-        total_spent = sum(t.amount for t in category_transactions if t.amount < 0)
-        days_since_first_transaction = (datetime.now() - min(t.date for t in category_transactions)).days
+        total_spent = float(cash_flow.outflow[:, code].sum())
+        days_since_first_transaction = cash_flow.today - int(cash_flow.first_day[code])
         daily_average = abs(total_spent) / max(days_since_first_transaction, 1)
         return daily_average * days
 
     def suggest_savings_goal(self) -> float:
         """
         Suggère un objectif d'épargne basé sur les habitudes de dépenses.
-        
+
         :return: Le montant suggéré pour l'épargne mensuelle
         """
-        monthly_income = sum(t.amount for t in self.user.transactions if t.amount > 0 and t.date >= datetime.now() - timedelta(days=30))
-        monthly_expenses = abs(sum(t.amount for t in self.user.transactions if t.amount < 0 and t.date >= datetime.now() - timedelta(days=30)))
-        
+        monthly_income, monthly_expenses = self.user.transactions.trailing_sums(30)
+        monthly_expenses = abs(monthly_expenses)
+
         if monthly_income > monthly_expenses:
             return (monthly_income - monthly_expenses) * 0.2  # Suggère d'épargner 20% du surplus
         else:
-            return 0  # Pas de suggestion d'épargne si les dépenses dépassent les revenus
\ No newline at end of file
+            return 0  # Pas de suggestion d'épargne si les dépenses dépassent les revenus
+
+    def get_balance_at(self, date: datetime) -> float:
+        """
+        Retourne le solde en fin de journée à une date donnée.
+
+        :param date: La date de référence
+        :return: Le solde à la fin de cette journée
+        """
+        cash_flow = self._get_cash_flow()
+        day = cash_flow.day_number(date)
+        if day < 0:
+            return 0.0
+        return float(cash_flow.balance[min(day, len(cash_flow.balance) - 1)])
+
+    def get_daily_balances(self) -> Dict[datetime, float]:
+        """
+        Retourne le solde en fin de journée pour chaque jour de l'historique.
+
+        :return: Un dictionnaire avec les jours comme clés et les soldes comme valeurs
+        """
+        cash_flow = self._get_cash_flow()
+        days = cash_flow.origin + np.arange(len(cash_flow.balance))
+        return dict(zip(days.astype('datetime64[us]').tolist(), cash_flow.balance.tolist()))
+
+    def get_category_burn_rate(self, category: str, days: int = 30) -> float:
+        """
+        Calcule le rythme de dépense quotidien d'une catégorie sur les derniers jours.
+
+        :param category: La catégorie
+        :param days: Nombre de jours de la fenêtre
+        :return: La dépense moyenne par jour (positive)
+        """
+        code = self.user.transactions.category_code(category)
+        if code is None:
+            return 0.0
+        cash_flow = self._get_cash_flow()
+        return abs(float(cash_flow.outflow[cash_flow.recent(days), code].sum())) / days
+
+    def get_burn_rates(self, days: int = 30) -> Dict[str, float]:
+        """
+        Calcule le rythme de dépense quotidien de toutes les catégories sur les derniers jours.
+
+        :param days: Nombre de jours de la fenêtre
+        :return: Un dictionnaire avec les catégories comme clés et les dépenses moyennes par jour comme valeurs
+        """
+        cash_flow = self._get_cash_flow()
+        spent = -cash_flow.outflow[cash_flow.recent(days)].sum(axis=0) / days
+        return {category: float(spent[code]) for code, category in enumerate(cash_flow.categories) if spent[code]}
+
+    def estimate_goal_date(self, target_balance: float, days: int = 30) -> Optional[datetime]:
+        """
+        Estime la date à laquelle le solde atteindra un objectif, au rythme des derniers jours.
+
+        :param target_balance: Le solde visé
+        :param days: Nombre de jours servant à mesurer le rythme d'épargne
+        :return: La date estimée, aujourd'hui si l'objectif est déjà atteint, ou None s'il ne sera jamais atteint
+        """
+        cash_flow = self._get_cash_flow()
+        current_balance = float(cash_flow.balance[-1])
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        if current_balance >= target_balance:
+            return today
+        daily_savings = float(cash_flow.net[cash_flow.recent(days)].sum()) / days
+        if daily_savings <= 0:
+            return None
+        return today + timedelta(days=int(np.ceil((target_balance - current_balance) / daily_savings)))
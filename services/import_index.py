@@ -0,0 +1,184 @@
+"""
+Index de déduplication des imports de relevés bancaires.
+
+Chaque transaction est résumée par une empreinte de 64 bits calculée sur (jour, montant, description
+normalisée, rang). Le rang distingue les transactions identiques d'une même journée (deux cafés
+au même prix) : la k-ième occurrence d'une même ligne dans un relevé n'est un doublon que si
+l'historique contient déjà au moins k occurrences identiques.
+
+L'index est conservé dans un fichier binaire par utilisateur : un en-tête (plus grand identifiant
+de transaction déjà indexé) suivi des empreintes, ajoutées en fin de fichier à chaque import.
+En mémoire, les empreintes sont gardées dans un tableau trié (recherche dichotomique) complété
+par un petit ensemble des ajouts récents, fusionné de temps en temps.
+"""
+import hashlib
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+from urllib.parse import quote
+
+import numpy as np
+
+import config
+from utils.data_processing import normalize_description
+
+_HEADER = np.dtype('<i8')
+_HASH = np.dtype('<u8')
+
+
+def transaction_hash(date: datetime, amount: float, description: str, rank: int = 0) -> int:
+    """
+    Calcule l'empreinte de 64 bits d'une transaction.
+
+    :param date: Date de la transaction (seul le jour compte)
+    :param amount: Montant (arrondi au centime)
+    :param description: Description (normalisée par normalize_description)
+    :param rank: Rang de la transaction parmi les transactions identiques
+    :return: L'empreinte, entier non signé de 64 bits
+    """
+    key = f"{date:%Y-%m-%d}|{round(amount * 100)}|{normalize_description(description)}|{rank}"
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little')
+
+
+class ImportIndex:
+    """
+    Ensemble persistant des empreintes des transactions d'un utilisateur.
+    """
+
+    MERGE_RATIO = 8  # Fusion du petit ensemble lorsqu'il dépasse 1/8 du tableau trié
+
+    def __init__(self, path: str = None):
+        """
+        Charge l'index d'un fichier (ou crée un index vide).
+
+        :param path: Chemin du fichier de l'index (None : index en mémoire uniquement)
+        """
+        self.path = path
+        self.indexed_high_water = 0  # Plus grand identifiant de transaction déjà indexé
+        self._sorted = np.empty(0, dtype=_HASH)
+        self._recent = set()
+        # Un fichier sans en-tête complet (arrêt pendant sa création) est traité comme un index vide :
+        # les transactions déjà enregistrées sont réindexées par sync_with_store
+        size = os.path.getsize(path) if path and os.path.exists(path) else 0
+        if size >= _HEADER.itemsize:
+            with open(path, 'rb') as file:
+                self.indexed_high_water = int(np.fromfile(file, dtype=_HEADER, count=1)[0])
+                self._sorted = np.sort(np.fromfile(file, dtype=_HASH, count=self._hash_count(size)))
+
+    @classmethod
+    def for_user(cls, username: str, directory: str = None) -> 'ImportIndex':
+        """
+        Charge l'index d'un utilisateur.
+
+        :param username: Nom d'utilisateur
+        :param directory: Répertoire des index (par défaut config.IMPORT_INDEX_DIR)
+        :return: L'index de l'utilisateur
+        """
+        return cls(os.path.join(directory or config.IMPORT_INDEX_DIR, quote(username, safe='') + '.bin'))
+
+    def __len__(self):
+        return len(self._sorted) + len(self._recent)
+
+    def __contains__(self, value: int) -> bool:
+        if value in self._recent:
+            return True
+        position = np.searchsorted(self._sorted, np.uint64(value))
+        return position < len(self._sorted) and int(self._sorted[position]) == value
+
+    def _first_free_hash(self, date: datetime, amount: float, description: str) -> int:
+        """
+        Empreinte de la prochaine occurrence d'une transaction : le premier rang absent de l'index.
+        """
+        rank = 0
+        while True:
+            value = transaction_hash(date, amount, description, rank)
+            if value not in self:
+                return value
+            rank += 1
+
+    def sync_with_store(self, store):
+        """
+        Ajoute à l'index les transactions enregistrées depuis la dernière synchronisation
+        (par exemple saisies dans un formulaire). Coût proportionnel au nombre de nouvelles transactions.
+
+        :param store: Le TransactionStore de l'utilisateur
+        """
+        rows = np.flatnonzero(store.ids > self.indexed_high_water)
+        if not len(rows) and store.id_high_water <= self.indexed_high_water:
+            return
+        columns = store.columns_for_rows(rows[np.argsort(store.ids[rows], kind='stable')])
+        hashes = []
+        for date, amount, description in zip(columns['date'].tolist(), columns['amount'].tolist(),
+                                             columns['description']):
+            value = self._first_free_hash(date, amount, description)
+            self._recent.add(value)
+            hashes.append(value)
+        self.add(hashes, store.id_high_water, already_added=True)
+
+    def filter_new(self, rows: List[Dict], ranks: Dict[int, int]) -> Tuple[List[Dict], List[int]]:
+        """
+        Sépare les lignes d'un relevé déjà présentes dans l'historique.
+
+        :param rows: Lignes du relevé ('date', 'amount', 'description')
+        :param ranks: Compteur des lignes identiques déjà vues dans le relevé, conservé d'un paquet à l'autre
+        :return: Un tuple (lignes nouvelles, empreintes de ces lignes)
+        """
+        new_rows, hashes = [], []
+        for row in rows:
+            base = transaction_hash(row['date'], row['amount'], row.get('description', ""), 0)
+            rank = ranks.get(base, 0)
+            ranks[base] = rank + 1
+            value = base if rank == 0 else transaction_hash(row['date'], row['amount'],
+                                                            row.get('description', ""), rank)
+            if value not in self:
+                new_rows.append(row)
+                hashes.append(value)
+        return new_rows, hashes
+
+    def add(self, hashes: Iterable[int], high_water: int, already_added: bool = False):
+        """
+        Ajoute des empreintes à l'index et les enregistre en fin de fichier.
+
+        :param hashes: Les empreintes des transactions enregistrées
+        :param high_water: Plus grand identifiant de transaction désormais indexé
+        :param already_added: Les empreintes sont déjà dans l'ensemble en mémoire
+        """
+        hashes = list(hashes)
+        if not already_added:
+            self._recent.update(hashes)
+        self.indexed_high_water = max(self.indexed_high_water, high_water)
+        if len(self._recent) > max(len(self._sorted) // self.MERGE_RATIO, 1024):
+            self._sorted = np.union1d(self._sorted, np.fromiter(self._recent, dtype=_HASH, count=len(self._recent)))
+            self._recent = set()
+        if self.path:
+            self._append(np.array(hashes, dtype=_HASH))
+
+    @staticmethod
+    def _hash_count(size: int) -> int:
+        """
+        Nombre d'empreintes complètes d'un fichier d'index de taille donnée (une empreinte
+        tronquée par un arrêt pendant l'écriture est ignorée).
+        """
+        return max(size - _HEADER.itemsize, 0) // _HASH.itemsize
+
+    def _append(self, hashes: np.ndarray):
+        """
+        Ajoute des empreintes en fin de fichier puis met à jour l'en-tête.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        mode = 'r+b' if size >= _HEADER.itemsize else 'w+b'
+        with open(self.path, mode) as file:
+            if mode == 'w+b':
+                file.write(np.array([0], dtype=_HEADER).tobytes())
+            else:
+                file.truncate(_HEADER.itemsize + self._hash_count(size) * _HASH.itemsize)
+            file.seek(0, os.SEEK_END)
+            file.write(hashes.tobytes())
+            file.flush()
+            os.fsync(file.fileno())
+            # L'en-tête n'est mis à jour qu'une fois les empreintes écrites
+            file.seek(0)
+            file.write(np.array([self.indexed_high_water], dtype=_HEADER).tobytes())
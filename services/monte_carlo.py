@@ -0,0 +1,97 @@
+"""
+Projections de solde par simulation de Monte-Carlo.
+
+Les flux quotidiens futurs sont tirés au hasard (avec remise) parmi les flux quotidiens
+de l'historique, pour un grand nombre de trajectoires simulées sous forme de tableaux NumPy.
+Les trajectoires sont réparties en paquets de taille fixe, chacun avec sa propre graine
+dérivée de la graine initiale : le résultat ne dépend pas du nombre de processus utilisés.
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+import config
+
+
+def _simulate_chunk(history: np.ndarray, start_balance: float, days: int, n_paths: int,
+                    seed: np.random.SeedSequence) -> np.ndarray:
+    """
+    Simule un paquet de trajectoires de solde.
+
+    :return: Tableau (n_paths, days) des soldes en fin de journée
+    """
+    rng = np.random.default_rng(seed)
+    flows = history[rng.integers(0, len(history), size=(n_paths, days))]
+    return start_balance + np.cumsum(flows, axis=1)
+
+
+def simulate_balance(history: np.ndarray, start_balance: float, days: int,
+                     n_paths: int = config.MONTE_CARLO_PATHS, threshold: Optional[float] = None,
+                     percentiles: Sequence[float] = (5, 25, 50, 75, 95), seed: int = 0,
+                     time_budget: Optional[float] = None, workers: Optional[int] = config.MONTE_CARLO_WORKERS,
+                     chunk_size: int = config.MONTE_CARLO_CHUNK_SIZE) -> Dict:
+    """
+    Projette le solde sur les prochains jours par tirage aléatoire des flux quotidiens passés.
+
+    :param history: Flux quotidiens de l'historique servant au tirage
+    :param start_balance: Solde actuel
+    :param days: Nombre de jours projetés
+    :param n_paths: Nombre de trajectoires simulées
+    :param threshold: Seuil de solde dont on estime la probabilité de franchissement (optionnel)
+    :param percentiles: Centiles des bandes de confiance
+    :param seed: Graine aléatoire (deux appels avec la même graine donnent le même résultat)
+    :param time_budget: Durée maximale en secondes ; au-delà, seuls les paquets terminés sont utilisés
+    :param workers: Nombre de processus (1 ou None : dans le processus courant)
+    :param chunk_size: Nombre de trajectoires par paquet
+    :return: Un dictionnaire avec 'bands' (centile -> solde prévu par jour), 'probability_below'
+             (probabilité de passer sous le seuil au moins un jour, ou None sans seuil),
+             'paths' (nombre de trajectoires effectivement simulées) et 'elapsed' (secondes)
+    """
+    if n_paths < 1:
+        raise ValueError("n_paths doit être positif")
+    start = time.perf_counter()
+    history = np.asarray(history, dtype=np.float64)
+    if not len(history):
+        history = np.zeros(1)
+    sizes = [min(chunk_size, n_paths - offset) for offset in range(0, n_paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    deadline = start + time_budget if time_budget is not None else None
+    results = {}
+
+    if workers is None or workers <= 1 or len(sizes) == 1:
+        for index, (size, chunk_seed) in enumerate(zip(sizes, seeds)):
+            if results and deadline is not None and time.perf_counter() >= deadline:
+                break
+            results[index] = _simulate_chunk(history, start_balance, days, size, chunk_seed)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = {executor.submit(_simulate_chunk, history, start_balance, days, size, chunk_seed): index
+                       for index, (size, chunk_seed) in enumerate(zip(sizes, seeds))}
+            pending = set(futures)
+            while pending:
+                # Au moins un paquet est attendu, même si le budget de temps est déjà dépassé
+                timeout = None if deadline is None or not results else max(deadline - time.perf_counter(), 0)
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[futures[future]] = future.result()
+                if deadline is not None and time.perf_counter() >= deadline and results:
+                    break
+        finally:
+            # Les paquets non commencés sont abandonnés si le budget de temps est épuisé
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    # Paquets assemblés dans l'ordre : le résultat est indépendant de l'ordre de fin des processus
+    balances = np.concatenate([results[index] for index in sorted(results)])
+    bands = np.percentile(balances, percentiles, axis=0)
+    probability = None
+    if threshold is not None:
+        probability = float((balances.min(axis=1) < threshold).mean())
+    return {
+        'bands': {p: band for p, band in zip(percentiles, bands)},
+        'probability_below': probability,
+        'paths': len(balances),
+        'elapsed': time.perf_counter() - start
+    }
@@ -0,0 +1,294 @@
+"""
+Agrégats mensuels matérialisés : entrées, sorties et nombre de transactions par (mois, catégorie).
+
+Les agrégats sont tenus à jour par FinanceManager à chaque ajout, modification ou suppression :
+un rapport mensuel, trimestriel ou annuel et les comparaisons d'une période à l'autre ne lisent que
+les mois concernés, quel que soit le nombre de transactions. Ils sont enregistrés dans un fichier JSON
+par utilisateur avec une empreinte des colonnes agrégées (identifiants, dates, montants, catégories) :
+au chargement, des agrégats périmés sont recalculés.
+"""
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import numpy as np
+
+import config
+from utils.file_handlers import atomic_write_json
+
+PERIODS = ('month', 'quarter', 'year')
+
+_INCOME, _EXPENSE, _COUNT = range(3)
+
+
+def month_index(value) -> int:
+    """
+    Numéro de mois (année * 12 + mois - 1) d'une date.
+
+    :param value: Une date ou un datetime
+    :return: Le numéro de mois
+    """
+    return value.year * 12 + value.month - 1
+
+
+def month_label(index: int) -> str:
+    """
+    Libellé 'AAAA-MM' d'un numéro de mois.
+
+    :param index: Le numéro de mois (voir month_index)
+    :return: Le libellé
+    """
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def period_bounds(period: str, year: int, number: int = 1) -> Tuple[int, int]:
+    """
+    Premier et dernier mois d'une période.
+
+    :param period: 'month', 'quarter' ou 'year'
+    :param year: Année
+    :param number: Numéro du mois (1 à 12) ou du trimestre (1 à 4) ; ignoré pour une année
+    :return: Un tuple (premier mois, dernier mois), en numéros de mois
+    :raises ValueError: Si la période est inconnue ou le numéro invalide
+    """
+    if period == 'month' and 1 <= number <= 12:
+        first = last = year * 12 + number - 1
+    elif period == 'quarter' and 1 <= number <= 4:
+        first = year * 12 + 3 * (number - 1)
+        last = first + 2
+    elif period == 'year':
+        first, last = year * 12, year * 12 + 11
+    else:
+        raise ValueError(f"Période inconnue : {period} {number}")
+    return first, last
+
+
+def previous_period(period: str, year: int, number: int = 1, against: str = 'previous') -> Tuple[int, int]:
+    """
+    Période de comparaison : la période précédente, ou la même période l'année précédente.
+
+    :param period: 'month', 'quarter' ou 'year'
+    :param year: Année de la période comparée
+    :param number: Numéro du mois ou du trimestre
+    :param against: 'previous' (période précédente) ou 'last_year' (même période un an plus tôt)
+    :return: Un tuple (année, numéro) de la période de comparaison
+    :raises ValueError: Si le type de comparaison est inconnu
+    """
+    if against == 'last_year' or period == 'year':
+        return year - 1, number
+    if against != 'previous':
+        raise ValueError(f"Comparaison inconnue : {against}")
+    if number > 1:
+        return year, number - 1
+    return year - 1, 12 if period == 'month' else 4
+
+
+class MonthlyRollup:
+    """
+    Table des agrégats par mois puis par catégorie : [entrées, sorties, nombre de transactions].
+    Les sorties sont négatives.
+    """
+
+    def __init__(self, months: Dict[int, Dict[str, List[float]]] = None):
+        """
+        :param months: Agrégats par numéro de mois puis par catégorie (optionnel)
+        """
+        self.months = months or {}
+        self.version = None  # Version du TransactionStore agrégé (voir FinanceManager.get_monthly_rollup)
+
+    @classmethod
+    def build(cls, store) -> 'MonthlyRollup':
+        """
+        Calcule les agrégats de toutes les transactions d'un stockage en un seul passage vectorisé.
+
+        :param store: Le TransactionStore de l'utilisateur
+        :return: Les agrégats
+        """
+        rollup = cls()
+        if not len(store):
+            return rollup
+        months = store.dates.astype('datetime64[M]').astype(np.int64) + 1970 * 12
+        codes = store.category_codes.astype(np.int64)
+        amounts = store.amounts
+        keys, inverse = np.unique(months * len(store.categories) + codes, return_inverse=True)
+        incomes = np.bincount(inverse, weights=np.where(amounts > 0, amounts, 0.0), minlength=len(keys))
+        expenses = np.bincount(inverse, weights=np.where(amounts < 0, amounts, 0.0), minlength=len(keys))
+        counts = np.bincount(inverse, minlength=len(keys))
+        categories = store.categories
+        for key, income, expense, count in zip(keys.tolist(), incomes.tolist(), expenses.tolist(), counts.tolist()):
+            month, code = divmod(key, len(categories))
+            rollup.months.setdefault(month, {})[categories[code]] = [income, expense, count]
+        return rollup
+
+    def add(self, when, category: str, amount: float, sign: int = 1):
+        """
+        Ajoute (ou retire, avec sign=-1) une transaction aux agrégats.
+
+        :param when: Date de la transaction
+        :param category: Sa catégorie
+        :param amount: Son montant
+        :param sign: 1 pour un ajout, -1 pour un retrait
+        """
+        month = month_index(when)
+        categories = self.months.setdefault(month, {})
+        cell = categories.get(category)
+        if cell is None:
+            cell = categories[category] = [0.0, 0.0, 0]
+        cell[_INCOME if amount > 0 else _EXPENSE] += sign * amount
+        cell[_COUNT] += sign
+        if cell[_COUNT] <= 0:
+            del categories[category]
+            if not categories:
+                del self.months[month]
+
+    def remove(self, when, category: str, amount: float):
+        """
+        Retire une transaction des agrégats.
+
+        :param when: Date de la transaction
+        :param category: Sa catégorie
+        :param amount: Son montant
+        """
+        self.add(when, category, amount, sign=-1)
+
+    def summary(self, first_month: int, last_month: int) -> Dict[str, object]:
+        """
+        Totaux d'une suite de mois. Coût proportionnel au nombre de mois (et de catégories par mois).
+
+        :param first_month: Premier mois, inclus (numéro de mois)
+        :param last_month: Dernier mois, inclus (numéro de mois)
+        :return: Un dictionnaire avec 'income', 'expense', 'net', 'count' et 'categories'
+                 (mêmes totaux par catégorie)
+        """
+        categories = {}
+        for month in range(first_month, last_month + 1):
+            for category, (income, expense, count) in self.months.get(month, {}).items():
+                totals = categories.setdefault(category, {'income': 0.0, 'expense': 0.0, 'count': 0})
+                totals['income'] += income
+                totals['expense'] += expense
+                totals['count'] += count
+        for totals in categories.values():
+            totals['net'] = totals['income'] + totals['expense']
+        return {
+            'income': sum(totals['income'] for totals in categories.values()),
+            'expense': sum(totals['expense'] for totals in categories.values()),
+            'net': sum(totals['net'] for totals in categories.values()),
+            'count': sum(totals['count'] for totals in categories.values()),
+            'categories': categories
+        }
+
+    def report(self, period: str, year: int, number: int = 1) -> Dict[str, object]:
+        """
+        Rapport d'un mois, d'un trimestre ou d'une année.
+
+        :param period: 'month', 'quarter' ou 'year'
+        :param year: Année
+        :param number: Numéro du mois ou du trimestre
+        :return: Les totaux de la période (voir summary), avec 'start' et 'end' ('AAAA-MM')
+        """
+        first, last = period_bounds(period, year, number)
+        report = self.summary(first, last)
+        report['start'], report['end'] = month_label(first), month_label(last)
+        return report
+
+    def compare(self, period: str, year: int, number: int = 1, against: str = 'previous') -> Dict[str, object]:
+        """
+        Compare une période à la précédente (ou à la même période de l'année précédente).
+
+        :param period: 'month', 'quarter' ou 'year'
+        :param year: Année
+        :param number: Numéro du mois ou du trimestre
+        :param against: 'previous' ou 'last_year'
+        :return: Un dictionnaire avec 'current' et 'previous' (voir report) et 'changes'
+                 (écart du solde net, au total et par catégorie)
+        """
+        current = self.report(period, year, number)
+        previous = self.report(period, *previous_period(period, year, number, against))
+        categories = set(current['categories']) | set(previous['categories'])
+        return {
+            'current': current,
+            'previous': previous,
+            'changes': {
+                'net': current['net'] - previous['net'],
+                'categories': {category: current['categories'].get(category, {}).get('net', 0.0)
+                               - previous['categories'].get(category, {}).get('net', 0.0)
+                               for category in sorted(categories)}
+            }
+        }
+
+    def to_dict(self) -> Dict[str, Dict[str, List[float]]]:
+        """
+        Convertit les agrégats en dictionnaire pour la sérialisation (mois au format 'AAAA-MM').
+        """
+        return {month_label(month): categories for month, categories in self.months.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Dict[str, List[float]]]) -> 'MonthlyRollup':
+        """
+        Crée des agrégats à partir d'un dictionnaire (voir to_dict).
+        """
+        months = {}
+        for label, categories in data.items():
+            year, month = label.split('-')
+            months[int(year) * 12 + int(month) - 1] = {category: list(cell) for category, cell in categories.items()}
+        return cls(months)
+
+    # --- Persistance ----------------------------------------------------------
+
+    @staticmethod
+    def path_for(username: str, directory: str = None) -> str:
+        """
+        Chemin du fichier des agrégats d'un utilisateur.
+
+        :param username: Nom d'utilisateur
+        :param directory: Répertoire des agrégats (par défaut config.ROLLUP_DIR)
+        """
+        return os.path.join(directory or config.ROLLUP_DIR, quote(username, safe='') + '.json')
+
+    @staticmethod
+    def fingerprint(store) -> str:
+        """
+        Empreinte des colonnes agrégées d'un stockage, calculée sur les tableaux NumPy
+        (bien plus rapide qu'un nouveau calcul des agrégats).
+
+        :param store: Le TransactionStore
+        :return: L'empreinte, en hexadécimal
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(store.ids.astype('<i8').tobytes())
+        digest.update(store.dates.astype('datetime64[us]').astype('<i8').tobytes())
+        digest.update(store.amounts.astype('<f8').tobytes())
+        # Noms plutôt que codes : les codes dépendent de l'ordre de chargement
+        digest.update('\x1e'.join(np.array(store.categories, dtype=object)[store.category_codes]).encode())
+        return digest.hexdigest()
+
+    def save(self, path: str, store):
+        """
+        Enregistre les agrégats et l'empreinte du stockage agrégé.
+
+        :param path: Chemin du fichier
+        :param store: Le TransactionStore agrégé
+        """
+        atomic_write_json(path, {'fingerprint': self.fingerprint(store), 'months': self.to_dict()})
+
+    @classmethod
+    def load(cls, path: str, store) -> Optional['MonthlyRollup']:
+        """
+        Relit des agrégats enregistrés, s'ils correspondent toujours aux transactions du stockage.
+
+        :param path: Chemin du fichier
+        :param store: Le TransactionStore de l'utilisateur
+        :return: Les agrégats, ou None si le fichier est absent, illisible ou périmé
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('fingerprint') != cls.fingerprint(store):
+            return None
+        return cls.from_dict(data.get('months') or {})
@@ -0,0 +1,119 @@
+"""
+Export des transactions d'une période sous forme de rapport (CSV, Parquet ou Feather).
+
+Les transactions sont lues par paquets de colonnes (voir FinanceManager.iter_transactions_for_period)
+et chaque paquet est écrit dès qu'il est lu : la mémoire utilisée ne dépend pas de la longueur
+de la période exportée. Les formats Parquet et Feather nécessitent pyarrow.
+"""
+import csv
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+import config
+
+FORMATS = ('csv', 'parquet', 'feather')
+CSV_HEADER = ["Date", "Montant", "Catégorie", "Description"]
+
+
+def format_from_path(path: str) -> str:
+    """
+    Déduit le format d'export de l'extension d'un fichier ('.csv', '.parquet', '.feather' ou '.arrow').
+
+    :param path: Chemin du fichier
+    :return: Le format
+    :raises ValueError: Si l'extension n'est pas reconnue
+    """
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    fmt = 'feather' if extension == 'arrow' else extension
+    if fmt not in FORMATS:
+        raise ValueError(f"Format de rapport inconnu : {path}")
+    return fmt
+
+
+def write_csv(chunks: Iterable[Dict[str, object]], file) -> int:
+    """
+    Écrit un rapport CSV paquet par paquet.
+
+    :param chunks: Paquets de colonnes ('date', 'amount', 'category', 'description')
+    :param file: Fichier texte ouvert en écriture (avec newline='')
+    :return: Le nombre de transactions écrites
+    """
+    writer = csv.writer(file)
+    writer.writerow(CSV_HEADER)
+    count = 0
+    for chunk in chunks:
+        dates = np.datetime_as_string(chunk['date'], unit='D')
+        amounts = np.char.mod('%.2f', chunk['amount'])
+        writer.writerows(zip(dates.tolist(), amounts.tolist(), chunk['category'], chunk['description']))
+        count += len(dates)
+    return count
+
+
+def _arrow_batch(chunk: Dict[str, object]):
+    import pyarrow as pa
+
+    return pa.record_batch([
+        pa.array(chunk['date'], type=pa.timestamp('us')),
+        pa.array(chunk['amount'], type=pa.float64()),
+        pa.array(chunk['category'], type=pa.string()),
+        pa.array(chunk['description'], type=pa.string())
+    ], names=['date', 'amount', 'category', 'description'])
+
+
+def write_columnar(chunks: Iterable[Dict[str, object]], path: str, fmt: str = 'parquet') -> int:
+    """
+    Écrit un rapport en colonnes : un groupe de lignes Parquet (ou un lot Feather) par paquet.
+
+    :param chunks: Paquets de colonnes ('date', 'amount', 'category', 'description')
+    :param path: Chemin du fichier
+    :param fmt: 'parquet' ou 'feather'
+    :return: Le nombre de transactions écrites
+    """
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    schema = pa.schema([('date', pa.timestamp('us')), ('amount', pa.float64()),
+                        ('category', pa.string()), ('description', pa.string())])
+    if fmt == 'parquet':
+        writer = pa.parquet.ParquetWriter(path, schema)  # Les catégories y sont encodées par dictionnaire
+    else:
+        writer = pa.ipc.new_file(path, schema)
+    count = 0
+    try:
+        for chunk in chunks:
+            writer.write_batch(_arrow_batch(chunk))
+            count += len(chunk['amount'])
+    finally:
+        writer.close()
+    return count
+
+
+def export_report(finance_manager, path: str, start_date: Optional[datetime] = None,
+                  end_date: Optional[datetime] = None, fmt: Optional[str] = None, chunk_size: int = config.REPORT_CHUNK_SIZE) -> int:
+    """
+    Exporte les transactions d'une période dans un fichier.
+
+    :param finance_manager: Le FinanceManager de l'utilisateur
+    :param path: Chemin du fichier de rapport
+    :param start_date: Date de début de la période, incluse (optionnel)
+    :param end_date: Date de fin de la période, incluse (optionnel)
+    :param fmt: 'csv', 'parquet' ou 'feather' (par défaut déduit de l'extension du fichier)
+    :param chunk_size: Nombre de transactions lues et écrites à la fois
+    :return: Le nombre de transactions exportées
+    :raises ValueError: Si le format est inconnu
+    """
+    fmt = fmt or format_from_path(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Format de rapport inconnu : {fmt}")
+    chunks = finance_manager.iter_transactions_for_period(start_date, end_date, chunk_size)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if fmt == 'csv':
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            return write_csv(chunks, file)
+    return write_columnar(chunks, path, fmt)
@@ -0,0 +1,131 @@
+import heapq
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from models.planned_transaction import PlannedTransaction
+from models.user import User
+
+
+def _occurrence_stream(plan: PlannedTransaction, until: datetime) -> Iterator[Tuple[datetime, int, PlannedTransaction]]:
+    for date in plan.occurrences(until):
+        yield date, plan.plan_id, plan
+
+
+class TransactionScheduler:
+    """
+    Planificateur des transactions planifiées et récurrentes d'un utilisateur.
+
+    Les planifications sont rangées dans un tas (min-heap) ordonné par prochaine échéance :
+    le passage de règlement ne consulte que les planifications arrivées à échéance, sans parcourir
+    les autres. Seule la prochaine échéance de chaque planification est conservée ; les occurrences
+    futures ne sont jamais enregistrées comme transactions, elles sont générées à la demande
+    pour le solde prévisionnel.
+    """
+
+    def __init__(self, user: User):
+        """
+        Initialise le planificateur à partir des planifications de l'utilisateur.
+
+        :param user: L'utilisateur dont les transactions planifiées sont gérées
+        """
+        self.user = user
+        self._heap = []  # Entrées (prochaine échéance, identifiant de planification)
+        for plan in user.planned_transactions.values():
+            self._push(plan)
+
+    def _push(self, plan: PlannedTransaction):
+        if plan.next_date is not None:
+            heapq.heappush(self._heap, (plan.next_date, plan.plan_id))
+
+    def _discard_stale(self):
+        """
+        Retire du sommet du tas les entrées obsolètes (planification annulée ou échéance déplacée).
+        Les entrées ne sont pas supprimées à l'annulation mais ignorées lorsqu'elles arrivent au sommet.
+        """
+        while self._heap:
+            date, plan_id = self._heap[0]
+            plan = self.user.planned_transactions.get(plan_id)
+            if plan is not None and plan.next_date == date:
+                return
+            heapq.heappop(self._heap)
+
+    def schedule(self, amount: float, category: str, description: str = "", start_date: datetime = None,
+                 frequency: str = None, interval: int = 1, end_date: datetime = None) -> PlannedTransaction:
+        """
+        Planifie une transaction ponctuelle ou récurrente.
+
+        :param amount: Montant de chaque occurrence
+        :param category: Catégorie des transactions générées
+        :param description: Description des transactions générées
+        :param start_date: Date de la première échéance (par défaut maintenant)
+        :param frequency: None (ponctuelle), 'daily', 'weekly', 'monthly' ou 'yearly'
+        :param interval: Nombre de périodes entre deux échéances
+        :param end_date: Date après laquelle la récurrence s'arrête (optionnel)
+        :return: La transaction planifiée créée
+        :raises ValueError: Si la fréquence est inconnue
+        """
+        plan = PlannedTransaction(self.user.allocate_plan_id(), self.user.user_id, amount, category, description,
+                                  start_date, frequency, interval, end_date)
+        self.user.add_planned_transaction(plan)
+        self._push(plan)
+        return plan
+
+    def cancel(self, plan_id: int) -> Optional[PlannedTransaction]:
+        """
+        Annule une planification. Les occurrences déjà réglées restent enregistrées.
+
+        :param plan_id: L'identifiant de la planification
+        :return: La planification annulée, ou None si elle n'existe pas
+        """
+        return self.user.remove_planned_transaction(plan_id)
+
+    def next_due_date(self) -> Optional[datetime]:
+        """
+        Retourne la prochaine échéance, toutes planifications confondues.
+
+        :return: La date de la prochaine échéance, ou None s'il n'y en a aucune
+        """
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def settle(self, now: datetime = None) -> List[Dict]:
+        """
+        Règle les échéances arrivées à terme : chaque occurrence due est convertie en transaction
+        et sa planification passe à l'échéance suivante. Les planifications terminées sont retirées.
+        Le coût est proportionnel au nombre d'occurrences dues, pas au nombre de planifications.
+
+        :param now: La date de référence (par défaut maintenant)
+        :return: Les transactions à enregistrer, au format accepté par FinanceManager.add_transactions
+        """
+        now = now or datetime.now()
+        rows = []
+        while self.next_due_date() is not None and self._heap[0][0] <= now:
+            _, plan_id = heapq.heappop(self._heap)
+            plan = self.user.planned_transactions[plan_id]
+            rows.append(plan.to_transaction_dict(plan.next_date))
+            if plan.advance():
+                self._push(plan)
+            else:
+                self.user.remove_planned_transaction(plan_id)
+        return rows
+
+    def iter_occurrences(self, until: datetime) -> Iterator[Tuple[datetime, PlannedTransaction]]:
+        """
+        Génère, par ordre chronologique, les occurrences à venir jusqu'à une date donnée (incluse),
+        sans les régler ni modifier les planifications.
+
+        :param until: Date limite
+        :return: Un itérateur de tuples (date d'échéance, planification)
+        """
+        streams = [_occurrence_stream(plan, until) for plan in self.user.planned_transactions.values()]
+        for date, _, plan in heapq.merge(*streams, key=lambda entry: entry[:2]):
+            yield date, plan
+
+    def projected_total(self, until: datetime) -> float:
+        """
+        Calcule la somme des occurrences à venir jusqu'à une date donnée (incluse).
+
+        :param until: Date limite
+        :return: La variation prévue du solde
+        """
+        return sum(plan.amount for _, plan in self.iter_occurrences(until))
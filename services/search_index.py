@@ -0,0 +1,249 @@
+"""
+Index plein texte des transactions d'un utilisateur.
+
+Chaque description et chaque catégorie est découpée en mots normalisés (minuscules, sans accents ni
+ponctuation, voir normalize_description). Pour chaque mot, l'index conserve la liste triée des
+identifiants des transactions qui le contiennent : une recherche ne parcourt que les listes des mots
+demandés, jamais l'ensemble des transactions. Le vocabulaire est gardé trié pour la recherche par préfixe
+(saisie semi-automatique).
+
+L'index est tenu à jour par FinanceManager à chaque ajout, modification ou suppression et enregistré
+dans un fichier JSON par utilisateur, accompagné d'une empreinte des transactions indexées : au chargement,
+un index dont l'empreinte ne correspond plus aux transactions est reconstruit.
+"""
+import hashlib
+import json
+import os
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Set
+from urllib.parse import quote
+
+import config
+from utils.data_processing import normalize_description
+from utils.file_handlers import atomic_write_json
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Découpe un texte en mots normalisés.
+
+    :param text: Le texte
+    :return: Les mots, dans l'ordre du texte
+    """
+    return normalize_description(text).split()
+
+
+class SearchIndex:
+    """
+    Index inversé : mot -> identifiants triés des transactions qui le contiennent.
+    """
+
+    def __init__(self, postings: Dict[str, List[int]] = None):
+        """
+        :param postings: Listes d'identifiants par mot (optionnel, par exemple relues depuis un fichier)
+        """
+        self.postings = postings or {}
+        self._vocabulary = sorted(self.postings)
+        self.version = None  # Version du TransactionStore indexé (voir FinanceManager.get_search_index)
+
+    @staticmethod
+    def document_tokens(description: str, category: str) -> Set[str]:
+        """
+        Mots indexés pour une transaction.
+
+        :param description: Description de la transaction
+        :param category: Catégorie de la transaction
+        :return: L'ensemble des mots de la description et de la catégorie
+        """
+        return set(tokenize(description)) | set(tokenize(category))
+
+    @classmethod
+    def build(cls, store) -> 'SearchIndex':
+        """
+        Construit l'index de toutes les transactions d'un stockage.
+        Chaque description distincte n'est découpée qu'une fois.
+
+        :param store: Le TransactionStore de l'utilisateur
+        :return: Le nouvel index
+        """
+        columns = store.to_columns()
+        token_cache = {}
+        postings = {}
+        rows = sorted(zip(columns['transaction_id'].tolist(), columns['description'], columns['category']))
+        for transaction_id, description, category in rows:
+            key = (description, category)
+            tokens = token_cache.get(key)
+            if tokens is None:
+                tokens = token_cache[key] = cls.document_tokens(description, category)
+            for token in tokens:
+                posting = postings.get(token)
+                if posting is None:
+                    postings[token] = [transaction_id]
+                elif posting[-1] != transaction_id:
+                    posting.append(transaction_id)
+        return cls(postings)
+
+    def __len__(self):
+        return len(self.postings)
+
+    def add(self, transaction_id: int, description: str, category: str):
+        """
+        Indexe une transaction.
+
+        :param transaction_id: Identifiant de la transaction
+        :param description: Sa description
+        :param category: Sa catégorie
+        """
+        for token in self.document_tokens(description, category):
+            posting = self.postings.get(token)
+            if posting is None:
+                self.postings[token] = [transaction_id]
+                insort(self._vocabulary, token)
+            elif posting[-1] < transaction_id:
+                posting.append(transaction_id)  # Cas courant : les identifiants sont croissants
+            else:
+                position = bisect_left(posting, transaction_id)
+                if position == len(posting) or posting[position] != transaction_id:
+                    posting.insert(position, transaction_id)
+
+    def remove(self, transaction_id: int, description: str, category: str):
+        """
+        Retire une transaction de l'index.
+
+        :param transaction_id: Identifiant de la transaction
+        :param description: Sa description au moment de l'indexation
+        :param category: Sa catégorie au moment de l'indexation
+        """
+        for token in self.document_tokens(description, category):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            position = bisect_left(posting, transaction_id)
+            if position < len(posting) and posting[position] == transaction_id:
+                posting.pop(position)
+            if not posting:
+                del self.postings[token]
+                self._vocabulary.pop(bisect_left(self._vocabulary, token))
+
+    def complete(self, prefix: str) -> List[str]:
+        """
+        Mots du vocabulaire commençant par un préfixe.
+
+        :param prefix: Le préfixe (normalisé)
+        :return: Les mots, par ordre alphabétique
+        """
+        start = bisect_left(self._vocabulary, prefix)
+        end = bisect_right(self._vocabulary, prefix + '\uffff')
+        return self._vocabulary[start:end]
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Propose des mots pour compléter une saisie, les plus fréquents d'abord.
+
+        :param prefix: Le début du mot saisi
+        :param limit: Nombre maximal de propositions
+        :return: Les mots proposés
+        """
+        tokens = tokenize(prefix)
+        if not tokens:
+            return []
+        completions = self.complete(tokens[-1])
+        return sorted(completions, key=lambda token: (-len(self.postings[token]), token))[:limit]
+
+    def lookup(self, query: str, prefix: bool = True) -> List[int]:
+        """
+        Identifiants des transactions contenant tous les mots d'une requête.
+
+        :param query: La requête
+        :param prefix: Le dernier mot de la requête peut n'être que le début d'un mot (saisie en cours)
+        :return: Les identifiants, par ordre croissant
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        postings = [self.postings.get(token, []) for token in set(tokens[:-1] if prefix else tokens)]
+        if prefix:
+            completions = self.complete(tokens[-1])
+            if len(completions) == 1:
+                postings.append(self.postings[completions[0]])
+            else:
+                postings.append(sorted(set().union(*(self.postings[token] for token in completions))))
+        return self._intersect(postings)
+
+    @staticmethod
+    def _intersect(postings: List[List[int]]) -> List[int]:
+        """
+        Intersection de listes triées : chaque identifiant de la plus courte est recherché
+        par dichotomie dans les autres.
+        """
+        postings = sorted(postings, key=len)
+        result = postings[0]
+        for posting in postings[1:]:
+            if not result:
+                break
+            kept = []
+            low = 0
+            for transaction_id in result:
+                low = bisect_left(posting, transaction_id, low)
+                if low == len(posting):
+                    break
+                if posting[low] == transaction_id:
+                    kept.append(transaction_id)
+            result = kept
+        return list(result)
+
+    # --- Persistance ----------------------------------------------------------
+
+    @staticmethod
+    def path_for(username: str, directory: str = None) -> str:
+        """
+        Chemin du fichier de l'index d'un utilisateur.
+
+        :param username: Nom d'utilisateur
+        :param directory: Répertoire des index (par défaut config.SEARCH_INDEX_DIR)
+        """
+        return os.path.join(directory or config.SEARCH_INDEX_DIR, quote(username, safe='') + '.json')
+
+    @staticmethod
+    def fingerprint(store) -> str:
+        """
+        Empreinte des données indexées (identifiants, descriptions et catégories) d'un stockage.
+
+        :param store: Le TransactionStore
+        :return: L'empreinte, en hexadécimal
+        """
+        columns = store.to_columns()
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(columns['transaction_id'].astype('<i8').tobytes())
+        digest.update('\x1e'.join(columns['category']).encode())
+        digest.update('\x1e'.join(columns['description']).encode())
+        return digest.hexdigest()
+
+    def save(self, path: str, store):
+        """
+        Enregistre l'index et l'empreinte du stockage indexé.
+
+        :param path: Chemin du fichier
+        :param store: Le TransactionStore indexé
+        """
+        atomic_write_json(path, {'fingerprint': self.fingerprint(store), 'postings': self.postings})
+
+    @classmethod
+    def load(cls, path: str, store) -> Optional['SearchIndex']:
+        """
+        Relit un index enregistré, s'il correspond toujours aux transactions du stockage.
+
+        :param path: Chemin du fichier
+        :param store: Le TransactionStore de l'utilisateur
+        :return: L'index, ou None si le fichier est absent, illisible ou périmé
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('fingerprint') != cls.fingerprint(store):
+            return None
+        return cls(data.get('postings'))
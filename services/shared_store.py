@@ -0,0 +1,141 @@
+"""
+Données des utilisateurs partagées par toutes les sessions d'un même processus.
+
+Un seul UserManager (et donc une seule copie du stockage) est utilisé par toutes les sessions,
+et les données en mémoire d'un utilisateur connecté (UserWorkspace) sont chargées une seule fois,
+quel que soit le nombre de sessions ouvertes pour cet utilisateur. Chaque utilisateur a son
+propre verrou : les modifications d'un même utilisateur sont sérialisées, celles d'utilisateurs
+différents peuvent avoir lieu en parallèle.
+"""
+import itertools
+import threading
+from typing import Callable, Dict, Optional
+
+from models.user import User
+from services.budget_manager import BudgetManager
+from services.categorizer import Categorizer
+from services.finance_manager import FinanceManager
+from services.forecasting import ForecastingService
+from services.scheduler import TransactionScheduler
+from services.user_manager import UserManager
+
+# Numéros de version uniques dans le processus : deux espaces de travail n'ont jamais la même version
+_versions = itertools.count(1)
+
+
+class UserWorkspace:
+    """
+    Données en mémoire d'un utilisateur connecté et gestionnaires associés,
+    partagés par toutes les sessions de cet utilisateur.
+    """
+
+    def __init__(self, user: User, lock: threading.RLock):
+        """
+        :param user: L'utilisateur, avec ses transactions, budgets et transactions planifiées chargés
+        :param lock: Le verrou de l'utilisateur (voir SharedUserStore.lock_for)
+        """
+        self.user = user
+        self.lock = lock
+        self.finance_manager = FinanceManager(user)
+        self.budget_manager = BudgetManager(user)
+        self.forecasting_service = ForecastingService(user)
+        self.scheduler = TransactionScheduler(user)
+        self.categorizer = Categorizer(user.category_rules)  # Règles compilées, recompilées à chaque modification
+        self.import_index = None  # Index de déduplication des imports, chargé au premier import
+        self.search_index_saved = None  # Version des transactions de l'index plein texte enregistré
+        self.rollup_saved = None  # Version des transactions des agrégats mensuels enregistrés
+        self.sessions = 0  # Nombre de sessions connectées
+        self.version = next(_versions)  # Change à chaque modification des données
+
+    def touch(self):
+        """
+        Signale une modification des données de l'utilisateur.
+        """
+        self.version = next(_versions)
+
+
+class SharedUserStore:
+    """
+    Stockage partagé par toutes les sessions du processus (par exemple un singleton
+    mis en cache par st.cache_resource dans l'application Streamlit).
+    """
+
+    def __init__(self, user_manager: UserManager = None, import_index_dir: str = None, search_index_dir: str = None,
+                 rollup_dir: str = None):
+        """
+        :param user_manager: Gestionnaire d'utilisateurs à partager (optionnel, créé à partir de la configuration sinon)
+        :param import_index_dir: Répertoire des index de déduplication des imports (par défaut config.IMPORT_INDEX_DIR)
+        :param search_index_dir: Répertoire des index plein texte (par défaut config.SEARCH_INDEX_DIR)
+        :param rollup_dir: Répertoire des agrégats mensuels (par défaut config.ROLLUP_DIR)
+        """
+        self.user_manager = user_manager or UserManager.from_config()
+        self.import_index_dir = import_index_dir
+        self.search_index_dir = search_index_dir
+        self.rollup_dir = rollup_dir
+        self._lock = threading.Lock()  # Protège les dictionnaires ci-dessous, jamais pendant un chargement
+        self._user_locks = {}
+        self._workspaces = {}
+
+    def lock_for(self, username: str) -> threading.RLock:
+        """
+        Retourne le verrou d'un utilisateur, qui sérialise ses chargements et ses modifications.
+
+        :param username: Nom d'utilisateur
+        :return: Le verrou (réentrant) de l'utilisateur
+        """
+        with self._lock:
+            return self._user_locks.setdefault(username, threading.RLock())
+
+    def acquire(self, username: str, load: Callable[[str], Optional[UserWorkspace]]) -> Optional[UserWorkspace]:
+        """
+        Ouvre une session pour un utilisateur. Ses données ne sont chargées que si aucune
+        autre session ne les a déjà en mémoire.
+
+        :param username: Nom d'utilisateur
+        :param load: Fonction appelée (sous le verrou de l'utilisateur) pour charger ses données
+        :return: L'espace de travail de l'utilisateur, ou None si le chargement a échoué
+        """
+        with self.lock_for(username):
+            workspace = self._workspaces.get(username)
+            if workspace is None:
+                workspace = load(username)
+                if workspace is None:
+                    return None
+                with self._lock:
+                    self._workspaces[username] = workspace
+            workspace.sessions += 1
+            return workspace
+
+    def release(self, username: str):
+        """
+        Ferme une session. Les modifications en attente sont rendues durables, et les données
+        de l'utilisateur sont libérées lorsque sa dernière session est fermée.
+
+        :param username: Nom d'utilisateur
+        """
+        with self.lock_for(username):
+            workspace = self._workspaces.get(username)
+            if workspace is None:
+                return
+            workspace.sessions -= 1
+            self.user_manager.flush()
+            if workspace.sessions <= 0:
+                with self._lock:
+                    del self._workspaces[username]
+                self.user_manager.release_user_data(username)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Retourne le nombre d'utilisateurs en mémoire et de sessions ouvertes.
+
+        :return: Un dictionnaire avec 'users' et 'sessions'
+        """
+        with self._lock:
+            return {'users': len(self._workspaces),
+                    'sessions': sum(workspace.sessions for workspace in self._workspaces.values())}
+
+    def close(self):
+        """
+        Rend toutes les données durables et libère les ressources du stockage.
+        """
+        self.user_manager.close()
@@ -0,0 +1,218 @@
+"""
+Lecture des relevés bancaires (CSV, OFX, QIF).
+
+Chaque lecteur parcourt le fichier ligne par ligne et produit les transactions au fur et à mesure,
+sous forme de dictionnaires acceptés par FinanceManager.add_transactions
+('date', 'amount', 'description' et éventuellement 'category') : la taille du relevé n'est pas limitée
+par la mémoire disponible.
+"""
+import csv
+import os
+import re
+import unicodedata
+from datetime import datetime
+from itertools import chain
+from typing import Dict, Iterator, Optional, TextIO
+
+FORMATS = ('csv', 'ofx', 'qif')
+
+# Noms de colonnes reconnus dans les relevés CSV (normalisés : minuscules, sans accents)
+CSV_COLUMNS = {
+    'date': ('date', 'date operation', 'date de l operation', 'date comptable', 'date valeur', 'booking date'),
+    'amount': ('montant', 'amount', 'montant eur', 'valeur'),
+    'debit': ('debit', 'debit eur'),
+    'credit': ('credit', 'credit eur'),
+    'description': ('libelle', 'description', 'label', 'libelle operation', 'memo', 'intitule'),
+    'category': ('categorie', 'category')
+}
+
+_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%d/%m/%y', '%Y%m%d')
+
+
+def _normalize_name(name: str) -> str:
+    text = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii').lower()
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text).split())
+
+
+def parse_amount(text: str) -> float:
+    """
+    Convertit un montant écrit à la française ou à l'anglaise ('1 234,56', '-1,234.56', '12.5 €').
+
+    :param text: Le montant tel qu'il apparaît dans le relevé
+    :return: Le montant
+    :raises ValueError: Si le texte n'est pas un montant
+    """
+    text = re.sub(r'[^\d,.+-]', '', text)
+    if ',' in text and ('.' not in text or text.rindex(',') > text.rindex('.')):
+        text = text.replace('.', '').replace(',', '.')  # Virgule décimale
+    else:
+        text = text.replace(',', '')
+    return float(text)
+
+
+def parse_date(text: str, day_first: bool = True) -> datetime:
+    """
+    Convertit une date de relevé (ISO, jj/mm/aaaa, jj/mm/aa, aaaammjj...).
+
+    :param text: La date telle qu'elle apparaît dans le relevé
+    :param day_first: Les dates ambiguës (01/02/2024) sont au format jour/mois ; sinon mois/jour
+    :return: La date
+    :raises ValueError: Si le texte n'est pas une date reconnue
+    """
+    text = text.strip().replace("'", '/')
+    formats = _DATE_FORMATS if day_first else tuple(f.replace('%d/%m', '%m/%d') for f in _DATE_FORMATS)
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return datetime.fromisoformat(text)
+
+
+def parse_csv(file: TextIO, delimiter: Optional[str] = None, day_first: bool = True) -> Iterator[Dict]:
+    """
+    Lit un relevé CSV. Les colonnes sont reconnues d'après leur nom (voir CSV_COLUMNS) ;
+    le montant peut être donné dans une seule colonne ou dans deux colonnes débit et crédit.
+
+    :param file: Fichier texte ouvert en lecture (avec newline='')
+    :param delimiter: Séparateur (par défaut détecté sur la ligne d'en-tête)
+    :param day_first: Format jour/mois des dates ambiguës
+    :return: Un itérateur de transactions
+    :raises ValueError: Si les colonnes nécessaires sont absentes ou si une ligne est invalide
+    """
+    header_line = file.readline()
+    if delimiter is None:
+        delimiter = max(';,\t|', key=header_line.count)
+    header = next(csv.reader([header_line], delimiter=delimiter), [])
+    names = [_normalize_name(name) for name in header]
+    columns = {field: next((i for i, name in enumerate(names) if name in aliases), None)
+               for field, aliases in CSV_COLUMNS.items()}
+    if columns['date'] is None or (columns['amount'] is None and columns['debit'] is None
+                                   and columns['credit'] is None):
+        raise ValueError(f"Colonnes de date ou de montant introuvables : {header!r}")
+
+    def cell(values, field):
+        index = columns[field]
+        return values[index].strip() if index is not None and index < len(values) else ""
+
+    for line_number, values in enumerate(csv.reader(file, delimiter=delimiter), start=2):
+        if not any(value.strip() for value in values):
+            continue
+        try:
+            if columns['amount'] is not None:
+                amount = parse_amount(cell(values, 'amount'))
+            else:
+                debit, credit = cell(values, 'debit'), cell(values, 'credit')
+                amount = (parse_amount(credit) if credit else 0.0) - (abs(parse_amount(debit)) if debit else 0.0)
+            row = {'date': parse_date(cell(values, 'date'), day_first), 'amount': amount,
+                   'description': cell(values, 'description')}
+        except ValueError as e:
+            raise ValueError(f"Ligne {line_number} invalide : {e}") from e
+        category = cell(values, 'category')
+        if category:
+            row['category'] = category
+        yield row
+
+
+_OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)')
+
+
+def parse_ofx(file: TextIO) -> Iterator[Dict]:
+    """
+    Lit un relevé OFX (formats SGML 1.x et XML 2.x) : une transaction par bloc <STMTTRN>.
+
+    :param file: Fichier texte ouvert en lecture
+    :return: Un itérateur de transactions
+    :raises ValueError: Si une transaction est invalide
+    """
+    fields = None
+    for line in file:
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                if not closing:
+                    fields = {}
+                elif fields is not None:
+                    yield _ofx_transaction(fields)
+                    fields = None
+            elif fields is not None and not closing and value.strip():
+                fields[tag] = value.strip()
+
+
+def _ofx_transaction(fields: Dict[str, str]) -> Dict:
+    try:
+        date = datetime.strptime(fields['DTPOSTED'][:8], '%Y%m%d')
+        amount = parse_amount(fields['TRNAMT'])
+    except (KeyError, ValueError) as e:
+        raise ValueError(f"Transaction OFX invalide : {fields!r}") from e
+    parts = [fields[tag] for tag in ('NAME', 'MEMO') if fields.get(tag)]
+    if len(parts) == 2 and parts[1].startswith(parts[0]):
+        parts = parts[1:]
+    return {'date': date, 'amount': amount, 'description': ' '.join(parts)}
+
+
+def parse_qif(file: TextIO, day_first: bool = True) -> Iterator[Dict]:
+    """
+    Lit un relevé QIF : un champ par ligne (D date, T montant, P bénéficiaire, M mémo, L catégorie),
+    chaque transaction se terminant par '^'.
+
+    :param file: Fichier texte ouvert en lecture
+    :param day_first: Format jour/mois des dates ambiguës
+    :return: Un itérateur de transactions
+    :raises ValueError: Si une transaction est invalide
+    """
+    fields = {}
+    for line_number, line in enumerate(chain(file, ['^']), start=1):
+        line = line.strip()
+        if not line or line.startswith('!'):
+            continue
+        code, value = line[0], line[1:].strip()
+        if code != '^':
+            fields.setdefault(code, value)
+            continue
+        if not fields:
+            continue
+        try:
+            row = {'date': parse_date(fields['D'], day_first), 'amount': parse_amount(fields.get('T') or fields['U']),
+                   'description': ' '.join(fields[code] for code in ('P', 'M') if fields.get(code))}
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"Transaction QIF invalide avant la ligne {line_number} : {fields!r}") from e
+        category = fields.get('L', "")
+        if category and not category.startswith('['):  # [Compte] : virement entre comptes
+            row['category'] = category
+        fields = {}
+        yield row
+
+
+def format_from_path(path: str) -> str:
+    """
+    Déduit le format d'un relevé de l'extension du fichier.
+
+    :param path: Chemin du fichier
+    :return: 'csv', 'ofx' ou 'qif'
+    :raises ValueError: Si l'extension n'est pas reconnue
+    """
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    fmt = 'ofx' if extension == 'qfx' else extension
+    if fmt not in FORMATS:
+        raise ValueError(f"Format de relevé inconnu : {path}")
+    return fmt
+
+
+def parse_statement(file: TextIO, fmt: str, **options) -> Iterator[Dict]:
+    """
+    Lit un relevé dans le format indiqué.
+
+    :param file: Fichier texte ouvert en lecture (avec newline='')
+    :param fmt: 'csv', 'ofx' ou 'qif'
+    :param options: Options du lecteur (delimiter, day_first)
+    :return: Un itérateur de transactions
+    :raises ValueError: Si le format est inconnu
+    """
+    if fmt == 'csv':
+        return parse_csv(file, **options)
+    if fmt == 'ofx':
+        return parse_ofx(file)
+    if fmt == 'qif':
+        return parse_qif(file, **options)
+    raise ValueError(f"Format de relevé inconnu : {fmt}")
@@ -0,0 +1,126 @@
+from typing import Dict, Iterator, List, Optional
+
+
+class StorageBackend:
+    """
+    Interface commune des moteurs de stockage utilisés par UserManager.
+    Les données échangées sont des dictionnaires sérialisables
+    (voir Transaction.to_dict et Budget.to_dict).
+    """
+
+    def iter_usernames(self) -> Iterator[str]:
+        """
+        Parcourt les noms de tous les utilisateurs enregistrés.
+
+        :return: Un itérateur sur les noms d'utilisateur
+        """
+        raise NotImplementedError
+
+    def get_credentials(self, username: str) -> Optional[Dict]:
+        """
+        Récupère les informations de connexion d'un utilisateur, sans ses transactions ni ses budgets.
+
+        :param username: Nom d'utilisateur
+        :return: Dictionnaire avec 'email', 'password' et éventuellement 'user_id', ou None
+        """
+        raise NotImplementedError
+
+    def create_user(self, username: str, email: str, password: str) -> bool:
+        """
+        Crée un nouvel utilisateur sans transaction ni budget.
+
+        :return: True si l'utilisateur a été créé, False s'il existe déjà
+        """
+        raise NotImplementedError
+
+    def delete_user(self, username: str) -> bool:
+        """
+        Supprime un utilisateur et toutes ses données.
+
+        :return: True si l'utilisateur a été supprimé, False s'il n'existait pas
+        """
+        raise NotImplementedError
+
+    def load_user(self, username: str) -> Optional[Dict]:
+        """
+        Charge toutes les données d'un utilisateur.
+
+        :param username: Nom d'utilisateur
+        :return: Dictionnaire avec 'email', 'password', 'transactions', 'budgets'
+                 et éventuellement 'meta' (métadonnées, voir save_user_meta), ou None
+        """
+        raise NotImplementedError
+
+    def release_user(self, username: str):
+        """
+        Indique que les données d'un utilisateur ne sont plus utilisées (déconnexion).
+        Les moteurs qui chargent les utilisateurs à la demande peuvent alors libérer la mémoire.
+
+        :param username: Nom d'utilisateur
+        """
+
+    def import_user(self, username: str, data: Dict):
+        """
+        Enregistre un utilisateur complet (identifiants, transactions et budgets),
+        en remplaçant ses données existantes. Utilisé par l'outil de migration.
+
+        :param username: Nom d'utilisateur
+        :param data: Dictionnaire au format retourné par load_user
+        """
+        raise NotImplementedError
+
+    def replace_user_data(self, username: str, transactions: List[Dict], budgets: List[Dict]):
+        """
+        Remplace toutes les transactions et tous les budgets d'un utilisateur.
+        """
+        raise NotImplementedError
+
+    def insert_transaction(self, username: str, transaction: Dict):
+        """
+        Enregistre une nouvelle transaction.
+        """
+        raise NotImplementedError
+
+    def insert_transactions(self, username: str, transactions: List[Dict]):
+        """
+        Enregistre plusieurs nouvelles transactions en une seule écriture.
+        Les moteurs qui le peuvent remplacent cette implémentation par défaut.
+        """
+        for transaction in transactions:
+            self.insert_transaction(username, transaction)
+
+    def update_transaction(self, username: str, transaction: Dict):
+        """
+        Enregistre la modification d'une transaction existante.
+        """
+        raise NotImplementedError
+
+    def delete_transaction(self, username: str, transaction_id: int):
+        """
+        Enregistre la suppression d'une transaction.
+        """
+        raise NotImplementedError
+
+    def save_budget(self, username: str, budget: Dict):
+        """
+        Enregistre la création ou la modification d'un budget.
+        """
+        raise NotImplementedError
+
+    def save_user_meta(self, username: str, meta: Dict):
+        """
+        Enregistre les métadonnées d'un utilisateur (par exemple le prochain identifiant de transaction),
+        en remplaçant les précédentes.
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        """
+        Rend durables toutes les modifications en attente.
+        """
+
+    def close(self):
+        """
+        Rend durables les modifications en attente et libère les ressources.
+        """
+        self.flush()
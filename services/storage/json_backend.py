@@ -0,0 +1,298 @@
+import json
+import os
+import threading
+from urllib.parse import quote, unquote
+
+import config
+from services.storage.base import StorageBackend
+from utils.file_handlers import JournalFile, atomic_write_json
+
+
+class JsonStorageBackend(StorageBackend):
+    """
+    Stockage de tous les utilisateurs dans un unique fichier JSON, chargé entièrement en mémoire.
+
+    En mode journalisé, chaque modification est ajoutée sous forme d'un petit
+    enregistrement au journal de l'utilisateur concerné au lieu de réécrire tout
+    le fichier JSON. Au chargement, les journaux sont rejoués par-dessus le
+    dernier instantané.
+    """
+
+    def __init__(self, file_path='data/user_data.json', journal=False, journal_dir=None,
+                 fsync_batch=config.JOURNAL_FSYNC_BATCH, fsync_interval=config.JOURNAL_FSYNC_INTERVAL,
+                 compact_threshold=config.JOURNAL_COMPACT_THRESHOLD):
+        """
+        Initialise le stockage JSON.
+
+        :param file_path: Chemin du fichier JSON pour stocker les données utilisateur
+        :param journal: Active le mode de stockage journalisé
+        :param journal_dir: Répertoire des journaux (par défaut 'journal' à côté du fichier JSON)
+        :param fsync_batch: Nombre d'enregistrements entre deux fsync du journal
+        :param fsync_interval: Délai maximal (en secondes) entre deux fsync du journal
+        :param compact_threshold: Nombre d'enregistrements journalisés avant réécriture de l'instantané
+        """
+        self.file_path = file_path
+        self.journal = journal
+        self.journal_dir = journal_dir or os.path.join(os.path.dirname(file_path), 'journal')
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.compact_threshold = compact_threshold
+        self.journals = {}  # Journaux ouverts, par nom d'utilisateur
+        self._positions = {}  # (utilisateur, clé) -> (liste indexée, identifiant -> position dans la liste)
+        # Sérialise les écritures : plusieurs sessions peuvent partager le même stockage
+        self.lock = threading.RLock()
+        self.users = self.load_users()
+        if self.journal:
+            self.replay_journals()
+
+    def load_users(self):
+        """
+        Charge les données utilisateur à partir du fichier JSON.
+
+        :return: Dictionnaire contenant les données utilisateur
+        """
+        if os.path.exists(self.file_path):
+            with open(self.file_path, 'r') as f:
+                return json.load(f)
+        return {}
+
+    def save_users(self):
+        """
+        Sauvegarde les données utilisateur dans le fichier JSON.
+        Crée le répertoire parent si nécessaire.
+        """
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        with open(self.file_path, 'w') as f:
+            json.dump(self.users, f)
+
+    def iter_usernames(self):
+        return iter(list(self.users))
+
+    def get_credentials(self, username):
+        user = self.users.get(username)
+        if user is None:
+            return None
+        return {key: user[key] for key in ('email', 'password', 'user_id') if key in user}
+
+    def create_user(self, username, email, password):
+        with self.lock:
+            if username in self.users:
+                return False
+            self._write(username, {'op': 'create_user', 'email': email, 'password': password})
+            return True
+
+    def delete_user(self, username):
+        with self.lock:
+            if username not in self.users:
+                return False
+            del self.users[username]
+            self._positions.pop((username, 'transaction_id'), None)
+            self._positions.pop((username, 'budget_id'), None)
+            if self.journal:
+                # Opération rare : on réécrit l'instantané puis on efface le journal de l'utilisateur
+                self.compact()
+                self._get_journal(username).truncate()
+                del self.journals[username]
+            else:
+                self.save_users()
+            return True
+
+    def load_user(self, username):
+        return self.users.get(username)
+
+    def import_user(self, username, data):
+        self._write(username, {'op': 'import_user', 'user': data})
+
+    def replace_user_data(self, username, transactions, budgets):
+        if username in self.users:
+            self._write(username, {'op': 'replace_user', 'transactions': transactions, 'budgets': budgets})
+
+    def insert_transaction(self, username, transaction):
+        if username in self.users:
+            self._write(username, {'op': 'add_transaction', 'transaction': transaction})
+
+    def insert_transactions(self, username, transactions):
+        if username in self.users:
+            self._write(username, {'op': 'add_transactions', 'transactions': transactions})
+
+    def update_transaction(self, username, transaction):
+        if username in self.users:
+            self._write(username, {'op': 'update_transaction', 'transaction': transaction})
+
+    def delete_transaction(self, username, transaction_id):
+        if username in self.users:
+            self._write(username, {'op': 'delete_transaction', 'transaction_id': transaction_id})
+
+    def save_budget(self, username, budget):
+        if username in self.users:
+            self._write(username, {'op': 'save_budget', 'budget': budget})
+
+    def save_user_meta(self, username, meta):
+        if username in self.users:
+            self._write(username, {'op': 'save_meta', 'meta': meta})
+
+    def _write(self, username, record):
+        """
+        Applique une modification en mémoire puis la rend persistante :
+        ajout au journal en mode journalisé, réécriture complète du fichier sinon.
+
+        :param username: Nom d'utilisateur concerné
+        :param record: Enregistrement décrivant la modification
+        """
+        with self.lock:
+            if self.journal:
+                user = self.users.get(username, {})
+                record['seq'] = user.get('journal_seq', 0) + 1
+                self._apply(username, record)
+                journal = self._get_journal(username)
+                journal.append(record)
+                if journal.record_count >= self.compact_threshold:
+                    self.compact()
+            else:
+                self._apply(username, record)
+                self.save_users()
+
+    def _apply(self, username, record):
+        """
+        Applique un enregistrement de journal aux données en mémoire.
+        Les opérations sont indexées par identifiant, de sorte que rejouer un
+        enregistrement déjà présent dans l'instantané ne crée pas de doublon.
+
+        :param username: Nom d'utilisateur concerné
+        :param record: Enregistrement à appliquer
+        """
+        op = record['op']
+        if op == 'create_user':
+            self.users[username] = {
+                'email': record['email'],
+                'password': record['password'],  # Note: Dans une application réelle, il faudrait hasher le mot de passe
+                'transactions': [],
+                'budgets': []
+            }
+        elif op == 'import_user':
+            self.users[username] = dict(record['user'])
+        user = self.users.get(username)
+        if user is None:
+            return
+        if op == 'replace_user':
+            user['transactions'] = record['transactions']
+            user['budgets'] = record['budgets']
+        elif op in ('add_transaction', 'update_transaction'):
+            self._upsert(username, user['transactions'], 'transaction_id', record['transaction'])
+        elif op == 'add_transactions':
+            # Rejouer un lot déjà présent dans l'instantané ne doit pas créer de doublons
+            for transaction in record['transactions']:
+                self._upsert(username, user['transactions'], 'transaction_id', transaction, replace=False)
+        elif op == 'delete_transaction':
+            self._remove(username, user['transactions'], 'transaction_id', record['transaction_id'])
+        elif op == 'save_budget':
+            self._upsert(username, user['budgets'], 'budget_id', record['budget'])
+        elif op == 'save_meta':
+            user['meta'] = record['meta']
+        if 'seq' in record:
+            user['journal_seq'] = record['seq']
+
+    def _index(self, username, items, key):
+        """
+        Index identifiant -> position des éléments d'une liste de l'utilisateur, construit à la première
+        utilisation puis tenu à jour : ajouts, modifications et suppressions se font en O(1)
+        quelle que soit la taille de l'historique. Reconstruit si la liste a été remplacée.
+        """
+        cached = self._positions.get((username, key))
+        if cached is None or cached[0] is not items:
+            # En cas d'identifiants en double (anciennes données), le dernier élément l'emporte
+            cached = (items, {item[key]: position for position, item in enumerate(items)})
+            self._positions[(username, key)] = cached
+        return cached[1]
+
+    def _upsert(self, username, items, key, item, replace=True):
+        """
+        Remplace l'élément ayant la même clé, ou l'ajoute en fin de liste.
+
+        :param replace: Remplacer un élément existant (sinon il est conservé tel quel)
+        """
+        positions = self._index(username, items, key)
+        position = positions.get(item[key])
+        if position is None:
+            positions[item[key]] = len(items)
+            items.append(item)
+        elif replace:
+            items[position] = item
+
+    def _remove(self, username, items, key, value):
+        """
+        Retire l'élément ayant une clé donnée : le dernier élément prend sa place (l'ordre de la liste
+        n'est pas conservé).
+        """
+        positions = self._index(username, items, key)
+        if len(positions) < len(items):
+            # Identifiants en double : toutes les occurrences sont retirées, puis l'index est reconstruit
+            items[:] = [item for item in items if item[key] != value]
+            self._positions.pop((username, key), None)
+            return
+        position = positions.pop(value, None)
+        if position is None:
+            return
+        last = items.pop()
+        if position < len(items):
+            items[position] = last
+            positions[last[key]] = position
+
+    def _journal_path(self, username):
+        return os.path.join(self.journal_dir, quote(username, safe='') + '.jsonl')
+
+    def _get_journal(self, username):
+        if username not in self.journals:
+            self.journals[username] = JournalFile(self._journal_path(username),
+                                                  fsync_batch=self.fsync_batch,
+                                                  fsync_interval=self.fsync_interval)
+        return self.journals[username]
+
+    def replay_journals(self):
+        """
+        Rejoue les journaux de tous les utilisateurs par-dessus l'instantané chargé.
+        Les enregistrements déjà intégrés à l'instantané (numéro de séquence inférieur
+        ou égal à celui de l'instantané) sont ignorés.
+        """
+        if not os.path.isdir(self.journal_dir):
+            return
+        for file_name in sorted(os.listdir(self.journal_dir)):
+            if not file_name.endswith('.jsonl'):
+                continue
+            username = unquote(file_name[:-len('.jsonl')])
+            journal = self._get_journal(username)
+            for record in JournalFile.replay(journal.file_path):
+                journal.record_count += 1
+                user = self.users.get(username)
+                if user is not None and record.get('seq', 0) <= user.get('journal_seq', 0):
+                    continue
+                self._apply(username, record)
+
+    def compact(self):
+        """
+        Écrit un nouvel instantané complet puis vide les journaux.
+        L'instantané est écrit de manière atomique avant la troncature : en cas d'arrêt
+        entre les deux, les enregistrements restants sont ignorés grâce à leur numéro de séquence.
+        """
+        with self.lock:
+            for journal in self.journals.values():
+                journal.sync()
+            atomic_write_json(self.file_path, self.users)
+            for journal in self.journals.values():
+                journal.truncate()
+
+    def flush(self):
+        """
+        Rend durables toutes les modifications en attente (fsync des journaux).
+        """
+        with self.lock:
+            for journal in self.journals.values():
+                journal.sync()
+
+    def close(self):
+        """
+        Rend durables toutes les modifications en attente et ferme les journaux.
+        """
+        with self.lock:
+            for journal in self.journals.values():
+                journal.close()
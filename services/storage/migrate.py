@@ -0,0 +1,94 @@
+"""
+Outil de migration ponctuelle entre moteurs de stockage.
+
+Exemple :
+    python -m services.storage.migrate json:data/user_data.json sqlite:data/user_data.db
+"""
+import argparse
+import logging
+
+from services.storage.json_backend import JsonStorageBackend
+from services.storage.sharded_backend import ShardedStorageBackend
+from services.storage.sqlite_backend import SqliteStorageBackend
+
+
+def open_backend(spec):
+    """
+    Ouvre un moteur de stockage à partir d'une spécification 'type:chemin'.
+
+    :param spec: Par exemple 'json:data/user_data.json', 'sqlite:data/user_data.db' ou 'sharded:data/users'
+    :return: Le moteur de stockage ouvert
+    """
+    kind, _, path = spec.partition(':')
+    if kind == 'json':
+        return JsonStorageBackend(path, journal=True)
+    if kind == 'sqlite':
+        return SqliteStorageBackend(path)
+    if kind == 'sharded':
+        return ShardedStorageBackend(path)
+    raise ValueError(f"Type de stockage inconnu : {kind}")
+
+
+def _renumber_duplicates(transactions):
+    """
+    Attribue un nouvel identifiant aux transactions dont l'identifiant est déjà utilisé
+    (les anciennes versions pouvaient réutiliser un identifiant après une suppression).
+
+    :param transactions: Liste des transactions d'un utilisateur
+    :return: Nombre de transactions renumérotées
+    """
+    seen = set()
+    next_id = max((t['transaction_id'] for t in transactions), default=0) + 1
+    renumbered = 0
+    for transaction in transactions:
+        if transaction['transaction_id'] in seen:
+            transaction['transaction_id'] = next_id
+            next_id += 1
+            renumbered += 1
+        seen.add(transaction['transaction_id'])
+    return renumbered
+
+
+def migrate(source, destination):
+    """
+    Copie tous les utilisateurs d'un moteur de stockage vers un autre.
+
+    :param source: Moteur de stockage source
+    :param destination: Moteur de stockage destination
+    :return: Un dictionnaire avec le nombre d'utilisateurs, de transactions et de budgets copiés
+    """
+    stats = {'users': 0, 'transactions': 0, 'budgets': 0}
+    for username in source.iter_usernames():
+        data = dict(source.load_user(username))
+        data['transactions'] = [dict(t) for t in data.get('transactions', [])]
+        renumbered = _renumber_duplicates(data['transactions'])
+        if renumbered:
+            logging.warning(f"{renumbered} transaction(s) renumérotée(s) pour {username} (identifiants en double)")
+        data.pop('journal_seq', None)
+        destination.import_user(username, data)
+        stats['users'] += 1
+        stats['transactions'] += len(data['transactions'])
+        stats['budgets'] += len(data.get('budgets', []))
+    destination.flush()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migre les données utilisateur d'un stockage à un autre.")
+    parser.add_argument('source', help="Stockage source, par exemple json:data/user_data.json")
+    parser.add_argument('destination', help="Stockage destination, par exemple sqlite:data/user_data.db")
+    args = parser.parse_args()
+
+    source = open_backend(args.source)
+    destination = open_backend(args.destination)
+    try:
+        stats = migrate(source, destination)
+    finally:
+        source.close()
+        destination.close()
+    print(f"{stats['users']} utilisateurs, {stats['transactions']} transactions "
+          f"et {stats['budgets']} budgets migrés.")
+
+
+if __name__ == '__main__':
+    main()
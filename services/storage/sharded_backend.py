@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+from urllib.parse import quote
+
+from services.storage.base import StorageBackend
+from utils.file_handlers import atomic_write_json
+
+
+class ShardedStorageBackend(StorageBackend):
+    """
+    Stockage avec un fichier par utilisateur et un petit fichier d'index.
+
+    Seul l'index (noms d'utilisateur et identifiants de connexion) est lu au démarrage.
+    Les transactions et budgets d'un utilisateur sont chargés à la demande (à la connexion),
+    et chaque sauvegarde ne réécrit que le fichier de l'utilisateur concerné.
+    """
+
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, directory='data/users'):
+        """
+        Initialise le stockage et charge l'index des utilisateurs.
+
+        :param directory: Répertoire contenant l'index et les fichiers des utilisateurs
+        """
+        self.directory = directory
+        self.index_path = os.path.join(directory, self.INDEX_FILE)
+        self.index = self._read_json(self.index_path, {})
+        self.shards = {}  # Données chargées, par nom d'utilisateur
+        # Protège l'index, commun à tous les utilisateurs ; les fichiers des utilisateurs sont indépendants
+        self.index_lock = threading.Lock()
+
+    @staticmethod
+    def _read_json(file_path, default):
+        if os.path.exists(file_path):
+            with open(file_path, 'r') as f:
+                return json.load(f)
+        return default
+
+    def _shard_path(self, username):
+        return os.path.join(self.directory, quote(username, safe='') + '.json')
+
+    def _load_shard(self, username):
+        """
+        Retourne les transactions et budgets d'un utilisateur, en lisant son fichier si nécessaire.
+        """
+        if username not in self.shards:
+            self.shards[username] = self._read_json(self._shard_path(username),
+                                                    {'transactions': [], 'budgets': []})
+        return self.shards[username]
+
+    def _save_shard(self, username):
+        atomic_write_json(self._shard_path(username), self.shards[username])
+
+    def _save_index(self):
+        atomic_write_json(self.index_path, self.index)
+
+    def iter_usernames(self):
+        return iter(list(self.index))
+
+    def get_credentials(self, username):
+        credentials = self.index.get(username)
+        return dict(credentials) if credentials is not None else None
+
+    def create_user(self, username, email, password):
+        with self.index_lock:
+            if username in self.index:
+                return False
+            self.shards[username] = {'transactions': [], 'budgets': []}
+            self._save_shard(username)
+            self.index[username] = {'email': email, 'password': password}
+            self._save_index()
+        return True
+
+    def delete_user(self, username):
+        with self.index_lock:
+            if username not in self.index:
+                return False
+            del self.index[username]
+            self._save_index()
+        self.shards.pop(username, None)
+        if os.path.exists(self._shard_path(username)):
+            os.remove(self._shard_path(username))
+        return True
+
+    def load_user(self, username):
+        credentials = self.get_credentials(username)
+        if credentials is None:
+            return None
+        shard = self._load_shard(username)
+        return dict(credentials, transactions=shard['transactions'], budgets=shard['budgets'],
+                    meta=shard.get('meta', {}))
+
+    def release_user(self, username):
+        self.shards.pop(username, None)
+
+    def import_user(self, username, data):
+        self.shards[username] = {
+            'transactions': list(data.get('transactions', [])),
+            'budgets': list(data.get('budgets', [])),
+            'meta': dict(data.get('meta', {}))
+        }
+        self._save_shard(username)
+        with self.index_lock:
+            self.index[username] = {key: data[key] for key in ('email', 'password', 'user_id') if key in data}
+            self._save_index()
+
+    def replace_user_data(self, username, transactions, budgets):
+        if username in self.index:
+            meta = self._load_shard(username).get('meta', {})
+            self.shards[username] = {'transactions': transactions, 'budgets': budgets, 'meta': meta}
+            self._save_shard(username)
+
+    def insert_transaction(self, username, transaction):
+        if username in self.index:
+            self._load_shard(username)['transactions'].append(transaction)
+            self._save_shard(username)
+
+    def insert_transactions(self, username, transactions):
+        if username in self.index:
+            self._load_shard(username)['transactions'].extend(transactions)
+            self._save_shard(username)
+
+    def update_transaction(self, username, transaction):
+        if username in self.index:
+            transactions = self._load_shard(username)['transactions']
+            for i, existing in enumerate(transactions):
+                if existing['transaction_id'] == transaction['transaction_id']:
+                    transactions[i] = transaction
+            self._save_shard(username)
+
+    def delete_transaction(self, username, transaction_id):
+        if username in self.index:
+            shard = self._load_shard(username)
+            shard['transactions'] = [t for t in shard['transactions'] if t['transaction_id'] != transaction_id]
+            self._save_shard(username)
+
+    def save_budget(self, username, budget):
+        if username in self.index:
+            budgets = self._load_shard(username)['budgets']
+            for i, existing in enumerate(budgets):
+                if existing['budget_id'] == budget['budget_id']:
+                    budgets[i] = budget
+                    break
+            else:
+                budgets.append(budget)
+            self._save_shard(username)
+
+    def save_user_meta(self, username, meta):
+        if username in self.index:
+            self._load_shard(username)['meta'] = meta
+            self._save_shard(username)
@@ -0,0 +1,193 @@
+import json
+import os
+import sqlite3
+import threading
+
+from services.storage.base import StorageBackend
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    user_id,
+    email TEXT NOT NULL,
+    password TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    username TEXT NOT NULL REFERENCES users(username) ON DELETE CASCADE,
+    transaction_id INTEGER NOT NULL,
+    user_id,
+    amount REAL NOT NULL,
+    category TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    date TEXT NOT NULL,
+    PRIMARY KEY (username, transaction_id)
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_username_date ON transactions(username, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_username_category ON transactions(username, category);
+CREATE TABLE IF NOT EXISTS budgets (
+    username TEXT NOT NULL REFERENCES users(username) ON DELETE CASCADE,
+    budget_id INTEGER NOT NULL,
+    user_id,
+    category TEXT NOT NULL,
+    amount REAL NOT NULL,
+    period_start TEXT NOT NULL,
+    period_end TEXT NOT NULL,
+    spent REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (username, budget_id)
+);
+CREATE INDEX IF NOT EXISTS idx_budgets_username_category ON budgets(username, category);
+CREATE TABLE IF NOT EXISTS user_meta (
+    username TEXT PRIMARY KEY REFERENCES users(username) ON DELETE CASCADE,
+    meta TEXT NOT NULL
+);
+"""
+
+TRANSACTION_COLUMNS = ('transaction_id', 'user_id', 'amount', 'category', 'description', 'date')
+BUDGET_COLUMNS = ('budget_id', 'user_id', 'category', 'amount', 'period_start', 'period_end', 'spent')
+
+
+class SqliteStorageBackend(StorageBackend):
+    """
+    Stockage dans une base SQLite (mode WAL) avec une table par type d'objet.
+    Seules les lignes concernées sont lues ou écrites : la connexion et la
+    sauvegarde ont le même coût quel que soit le nombre d'utilisateurs.
+    """
+
+    def __init__(self, db_path='data/user_data.db'):
+        """
+        Ouvre (ou crée) la base de données.
+
+        :param db_path: Chemin du fichier SQLite
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # La connexion est partagée entre threads (Streamlit, sauvegarde différée) : les accès sont sérialisés
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+
+    def _execute(self, query, params=()):
+        with self.lock, self.connection:
+            return self.connection.execute(query, params)
+
+    def _query(self, query, params=()):
+        with self.lock:
+            return self.connection.execute(query, params).fetchall()
+
+    def iter_usernames(self):
+        for (username,) in self._query("SELECT username FROM users ORDER BY username"):
+            yield username
+
+    def get_credentials(self, username):
+        rows = self._query("SELECT user_id, email, password FROM users WHERE username = ?", (username,))
+        if not rows:
+            return None
+        user_id, email, password = rows[0]
+        credentials = {'email': email, 'password': password}
+        if user_id is not None:
+            credentials['user_id'] = user_id
+        return credentials
+
+    def create_user(self, username, email, password):
+        try:
+            self._execute("INSERT INTO users (username, email, password) VALUES (?, ?, ?)",
+                          (username, email, password))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def delete_user(self, username):
+        return self._execute("DELETE FROM users WHERE username = ?", (username,)).rowcount > 0
+
+    def load_user(self, username):
+        data = self.get_credentials(username)
+        if data is None:
+            return None
+        rows = self._query(f"SELECT {', '.join(TRANSACTION_COLUMNS)} FROM transactions "
+                           "WHERE username = ? ORDER BY rowid", (username,))
+        data['transactions'] = [dict(zip(TRANSACTION_COLUMNS, row)) for row in rows]
+        rows = self._query(f"SELECT {', '.join(BUDGET_COLUMNS)} FROM budgets "
+                           "WHERE username = ? ORDER BY rowid", (username,))
+        data['budgets'] = [dict(zip(BUDGET_COLUMNS, row)) for row in rows]
+        rows = self._query("SELECT meta FROM user_meta WHERE username = ?", (username,))
+        data['meta'] = json.loads(rows[0][0]) if rows else {}
+        return data
+
+    def import_user(self, username, data):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO users (username, user_id, email, password) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET user_id = excluded.user_id, "
+                "email = excluded.email, password = excluded.password",
+                (username, data.get('user_id'), data['email'], data['password']))
+            self._replace_rows(username, data.get('transactions', []), data.get('budgets', []))
+            if data.get('meta'):
+                self._save_meta(username, data['meta'])
+
+    def replace_user_data(self, username, transactions, budgets):
+        with self.lock, self.connection:
+            self._replace_rows(username, transactions, budgets)
+
+    def _replace_rows(self, username, transactions, budgets):
+        self.connection.execute("DELETE FROM transactions WHERE username = ?", (username,))
+        self.connection.execute("DELETE FROM budgets WHERE username = ?", (username,))
+        self.connection.executemany(self._upsert_sql('transactions', TRANSACTION_COLUMNS),
+                                    [self._row(username, t, TRANSACTION_COLUMNS) for t in transactions])
+        self.connection.executemany(self._upsert_sql('budgets', BUDGET_COLUMNS),
+                                    [self._row(username, b, BUDGET_COLUMNS) for b in budgets])
+
+    @staticmethod
+    def _upsert_sql(table, columns):
+        # ON CONFLICT ... DO UPDATE conserve le rowid, donc l'ordre d'insertion des lignes
+        placeholders = ', '.join('?' for _ in range(len(columns) + 1))
+        assignments = ', '.join(f"{column} = excluded.{column}" for column in columns[1:])
+        return (f"INSERT INTO {table} (username, {', '.join(columns)}) VALUES ({placeholders}) "
+                f"ON CONFLICT(username, {columns[0]}) DO UPDATE SET {assignments}")
+
+    @staticmethod
+    def _row(username, item, columns):
+        return (username,) + tuple(item.get(column) for column in columns)
+
+    def insert_transaction(self, username, transaction):
+        self._execute(self._upsert_sql('transactions', TRANSACTION_COLUMNS),
+                      self._row(username, transaction, TRANSACTION_COLUMNS))
+
+    def insert_transactions(self, username, transactions):
+        with self.lock, self.connection:
+            self.connection.executemany(self._upsert_sql('transactions', TRANSACTION_COLUMNS),
+                                        [self._row(username, t, TRANSACTION_COLUMNS) for t in transactions])
+
+    def update_transaction(self, username, transaction):
+        assignments = ', '.join(f"{column} = ?" for column in TRANSACTION_COLUMNS[1:])
+        params = tuple(transaction.get(column) for column in TRANSACTION_COLUMNS[1:])
+        self._execute(f"UPDATE transactions SET {assignments} WHERE username = ? AND transaction_id = ?",
+                      params + (username, transaction['transaction_id']))
+
+    def delete_transaction(self, username, transaction_id):
+        self._execute("DELETE FROM transactions WHERE username = ? AND transaction_id = ?",
+                      (username, transaction_id))
+
+    def save_budget(self, username, budget):
+        self._execute(self._upsert_sql('budgets', BUDGET_COLUMNS), self._row(username, budget, BUDGET_COLUMNS))
+
+    def save_user_meta(self, username, meta):
+        with self.lock, self.connection:
+            self._save_meta(username, meta)
+
+    def _save_meta(self, username, meta):
+        self.connection.execute("INSERT INTO user_meta (username, meta) VALUES (?, ?) "
+                                "ON CONFLICT(username) DO UPDATE SET meta = excluded.meta",
+                                (username, json.dumps(meta)))
+
+    def flush(self):
+        with self.lock:
+            self.connection.execute("PRAGMA wal_checkpoint(FULL)")
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,75 @@
+"""
+DataFrame pandas des transactions pour l'interface Streamlit, maintenu au fil des modifications.
+
+Le DataFrame est construit une fois à partir des colonnes du TransactionStore puis conservé :
+les transactions ajoutées en fin de stockage y sont ajoutées (seules les nouvelles lignes sont
+converties et formatées), et il n'est reconstruit qu'après une modification ou une suppression.
+Les agrégats sont mémorisés par version du stockage.
+"""
+from typing import Dict
+
+import pandas as pd
+
+from models.transaction_store import TransactionStore
+
+
+class TransactionFrame:
+    """
+    Cache du DataFrame des transactions d'un utilisateur.
+    """
+
+    def __init__(self):
+        self._frame = None
+        self._store = None
+        self._edit_version = None  # Version des modifications (hors ajouts) correspondant au DataFrame
+        self._aggregates = {}  # Agrégats mémorisés, par nom, pour self._aggregates_version
+        self._aggregates_version = None
+
+    @staticmethod
+    def _build(store: TransactionStore, start: int = 0) -> pd.DataFrame:
+        """
+        Construit le DataFrame des lignes du stockage à partir de `start`.
+        """
+        frame = pd.DataFrame(store.to_columns(start))
+        frame.index = pd.RangeIndex(start, start + len(frame))
+        frame['Montant (€)'] = [f"{amount:.2f}€" for amount in frame['amount'].tolist()]
+        return frame
+
+    def get(self, store: TransactionStore) -> pd.DataFrame:
+        """
+        Retourne le DataFrame des transactions, mis à jour si le stockage a changé.
+        Le DataFrame retourné ne doit pas être modifié par l'appelant.
+
+        :param store: Le TransactionStore de l'utilisateur
+        :return: Un DataFrame avec les colonnes de TransactionStore.to_columns et 'Montant (€)'
+        """
+        if self._frame is None or store is not self._store or store.edit_version != self._edit_version \
+                or len(store) < len(self._frame):
+            self._frame = self._build(store)
+        elif len(store) > len(self._frame):
+            # Seules des transactions ont été ajoutées en fin de stockage
+            self._frame = pd.concat([self._frame, self._build(store, len(self._frame))])
+        self._store = store
+        self._edit_version = store.edit_version
+        return self._frame
+
+    def category_breakdown(self, store: TransactionStore) -> Dict[str, pd.Series]:
+        """
+        Retourne le total des dépenses (en valeur positive) et des revenus par catégorie,
+        recalculé seulement lorsque le stockage a changé.
+
+        :param store: Le TransactionStore de l'utilisateur
+        :return: Un dictionnaire avec 'expenses' et 'incomes' (séries indexées par catégorie)
+        """
+        version = (id(store), store.version)
+        if self._aggregates_version != version:
+            self._aggregates = {}
+            self._aggregates_version = version
+        if 'breakdown' not in self._aggregates:
+            frame = self.get(store)
+            amounts = frame['amount']
+            self._aggregates['breakdown'] = {
+                'expenses': (-amounts[amounts < 0]).groupby(frame['category']).sum(),
+                'incomes': amounts[amounts > 0].groupby(frame['category']).sum()
+            }
+        return self._aggregates['breakdown']
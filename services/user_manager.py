@@ -1,40 +1,41 @@
-import json
-import os
+import config
+from services.storage.json_backend import JsonStorageBackend
+from services.storage.sharded_backend import ShardedStorageBackend
+from services.storage.sqlite_backend import SqliteStorageBackend
 
 class UserManager:
     """
     Gère les opérations liées aux utilisateurs, y compris la création,
     l'authentification, le chargement et la sauvegarde des données utilisateur.
+    La persistance est déléguée à un moteur de stockage (voir services.storage).
     """
 
-    def __init__(self, file_path='data/user_data.json'):
+    def __init__(self, file_path='data/user_data.json', journal=False, journal_dir=None, backend=None, **options):
         """
         Initialise le gestionnaire d'utilisateurs.
 
         :param file_path: Chemin du fichier JSON pour stocker les données utilisateur
+        :param journal: Active le mode de stockage journalisé du fichier JSON
+        :param journal_dir: Répertoire des journaux (par défaut 'journal' à côté du fichier JSON)
+        :param backend: Moteur de stockage à utiliser (remplace le fichier JSON s'il est fourni)
+        :param options: Options supplémentaires du stockage JSON (fsync_batch, fsync_interval, compact_threshold)
         """
-        self.file_path = file_path
-        self.users = self.load_users()
+        if backend is None:
+            backend = JsonStorageBackend(file_path, journal=journal, journal_dir=journal_dir, **options)
+        self.backend = backend
 
-    def load_users(self):
+    @classmethod
+    def from_config(cls):
         """
-        Charge les données utilisateur à partir du fichier JSON.
+        Crée un gestionnaire d'utilisateurs avec le moteur de stockage défini dans config.py.
 
-        :return: Dictionnaire contenant les données utilisateur
+        :return: Un nouveau UserManager
         """
-        if os.path.exists(self.file_path):
-            with open(self.file_path, 'r') as f:
-                return json.load(f)
-        return {}
-
-    def save_users(self):
-        """
-        Sauvegarde les données utilisateur dans le fichier JSON.
-        Crée le répertoire parent si nécessaire.
-        """
-        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
-        with open(self.file_path, 'w') as f:
-            json.dump(self.users, f)
+        if config.STORAGE_BACKEND == 'sqlite':
+            return cls(backend=SqliteStorageBackend(config.SQLITE_FILE))
+        if config.STORAGE_BACKEND == 'sharded':
+            return cls(backend=ShardedStorageBackend(config.SHARD_DIR))
+        return cls(config.DATA_FILE, journal=config.JOURNAL_ENABLED, journal_dir=config.JOURNAL_DIR)
 
     def create_user(self, username, email, password):
         """
@@ -45,16 +46,8 @@ class UserManager:
         :param password: Mot de passe de l'utilisateur
         :return: True si l'utilisateur a été créé, False si le nom d'utilisateur existe déjà
         """
-        if username in self.users:
-            return False
-        self.users[username] = {
-            'email': email,
-            'password': password,  # Note: Dans une application réelle, il faudrait hasher le mot de passe
-            'transactions': [],
-            'budgets': []
-        }
-        self.save_users()
-        return True
+        # Note: Dans une application réelle, il faudrait hasher le mot de passe
+        return self.backend.create_user(username, email, password)
 
     def authenticate(self, username, password):
         """
@@ -64,7 +57,8 @@ class UserManager:
         :param password: Mot de passe
         :return: True si l'authentification réussit, False sinon
         """
-        if username in self.users and self.users[username]['password'] == password:
+        credentials = self.backend.get_credentials(username)
+        if credentials and credentials['password'] == password:
             return True
         return False
 
@@ -75,7 +69,23 @@ class UserManager:
         :param username: Nom d'utilisateur
         :return: Dictionnaire contenant les données de l'utilisateur, ou None si l'utilisateur n'existe pas
         """
-        return self.users.get(username)
+        return self.backend.load_user(username)
+
+    def release_user_data(self, username):
+        """
+        Libère les données en mémoire d'un utilisateur qui se déconnecte.
+
+        :param username: Nom d'utilisateur
+        """
+        self.backend.release_user(username)
+
+    def iter_usernames(self):
+        """
+        Parcourt les noms de tous les utilisateurs enregistrés.
+
+        :return: Un itérateur sur les noms d'utilisateur
+        """
+        return self.backend.iter_usernames()
 
     def update_user_data(self, username, transactions, budgets):
         """
@@ -85,10 +95,61 @@ class UserManager:
         :param transactions: Liste des transactions de l'utilisateur
         :param budgets: Liste des budgets de l'utilisateur
         """
-        if username in self.users:
-            self.users[username]['transactions'] = transactions
-            self.users[username]['budgets'] = budgets
-            self.save_users()
+        self.backend.replace_user_data(username, transactions, budgets)
+
+    def add_transaction(self, username, transaction):
+        """
+        Enregistre une nouvelle transaction pour un utilisateur.
+
+        :param username: Nom d'utilisateur
+        :param transaction: Dictionnaire représentant la transaction
+        """
+        self.backend.insert_transaction(username, transaction)
+
+    def add_transactions(self, username, transactions):
+        """
+        Enregistre plusieurs nouvelles transactions en une seule écriture.
+
+        :param username: Nom d'utilisateur
+        :param transactions: Liste de dictionnaires représentant les transactions
+        """
+        self.backend.insert_transactions(username, transactions)
+
+    def update_transaction(self, username, transaction):
+        """
+        Enregistre la modification d'une transaction existante.
+
+        :param username: Nom d'utilisateur
+        :param transaction: Dictionnaire représentant la transaction modifiée
+        """
+        self.backend.update_transaction(username, transaction)
+
+    def delete_transaction(self, username, transaction_id):
+        """
+        Enregistre la suppression d'une transaction.
+
+        :param username: Nom d'utilisateur
+        :param transaction_id: L'ID de la transaction supprimée
+        """
+        self.backend.delete_transaction(username, transaction_id)
+
+    def save_budget(self, username, budget):
+        """
+        Enregistre la création ou la modification d'un budget.
+
+        :param username: Nom d'utilisateur
+        :param budget: Dictionnaire représentant le budget
+        """
+        self.backend.save_budget(username, budget)
+
+    def save_user_meta(self, username, meta):
+        """
+        Enregistre les métadonnées d'un utilisateur (par exemple le prochain identifiant de transaction).
+
+        :param username: Nom d'utilisateur
+        :param meta: Dictionnaire de métadonnées sérialisable
+        """
+        self.backend.save_user_meta(username, meta)
 
     def delete_user(self, username):
         """
@@ -97,8 +158,16 @@ class UserManager:
         :param username: Nom d'utilisateur à supprimer
         :return: True si l'utilisateur a été supprimé, False s'il n'existait pas
         """
-        if username in self.users:
-            del self.users[username]
-            self.save_users()
-            return True
-        return False
\ No newline at end of file
+        return self.backend.delete_user(username)
+
+    def flush(self):
+        """
+        Rend durables toutes les modifications en attente.
+        """
+        self.backend.flush()
+
+    def close(self):
+        """
+        Rend durables les modifications en attente et libère les ressources du stockage.
+        """
+        self.backend.close()
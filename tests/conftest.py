@@ -0,0 +1,34 @@
+import pytest
+
+from models.transaction_store import TransactionStore
+from services.app_controller import AppController
+from services.shared_store import SharedUserStore
+from services.user_manager import UserManager
+
+
+@pytest.fixture
+def make_store():
+    # Lignes (identifiant, montant, catégorie, description, date ISO)
+    def make(rows):
+        return TransactionStore.from_dicts([
+            {'transaction_id': transaction_id, 'user_id': 1, 'amount': amount, 'category': category,
+             'description': description, 'date': day} for transaction_id, amount, category, description, day in rows])
+    return make
+
+
+@pytest.fixture
+def shared_store(tmp_path):
+    # Tous les fichiers (données, index, agrégats) dans le répertoire temporaire du test
+    store = SharedUserStore(UserManager(str(tmp_path / "user_data.json")),
+                            import_index_dir=str(tmp_path / "import_index"),
+                            search_index_dir=str(tmp_path / "search_index"),
+                            rollup_dir=str(tmp_path / "rollups"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def controller(shared_store):
+    controller = AppController(shared_store=shared_store)
+    controller.create_account("alice", "alice@example.com", "secret")
+    return controller
@@ -0,0 +1,143 @@
+import pytest
+from services.app_controller import AppController
+from services.user_manager import UserManager
+
+@pytest.fixture
+def data_file(tmp_path):
+    return str(tmp_path / "user_data.json")
+
+def make_controller(data_file, persistence_mode='sync'):
+    controller = AppController(UserManager(data_file, journal=True), persistence_mode=persistence_mode)
+    if not controller.login("alice", "secret"):
+        controller.create_account("alice", "alice@example.com", "secret")
+    return controller
+
+def test_changes_are_persisted(data_file):
+    controller = make_controller(data_file)
+    controller.set_budget("Courses", 300)
+    transaction = controller.add_transaction(-50, "Courses", "Marché")
+    controller.add_transaction(1000, "Salaire", "Salaire mensuel")
+    controller.update_transaction(transaction.transaction_id, -60, "Courses", "Marché")
+    controller.delete_last_transaction()
+    controller.close()
+
+    reloaded = make_controller(data_file)
+    assert reloaded.get_balance() == -60
+    assert len(reloaded.get_budgets()) == 1
+    reloaded.close()
+
+def test_write_behind_coalesces_saves(data_file):
+    controller = make_controller(data_file, persistence_mode='write_behind')
+    for i in range(10):
+        controller.add_transaction(-i, "Courses")
+    controller.logout()
+    stats = controller.get_persistence_stats()
+    assert stats['mutations'] == 10
+    assert stats['flushes'] < 10
+    assert stats['flushes_saved'] == 10 - stats['flushes']
+    controller.close()
+
+    reloaded = make_controller(data_file)
+    assert len(reloaded.get_transactions()) == 10
+    reloaded.close()
+
+def test_write_behind_writes_only_changed_rows(data_file):
+    controller = make_controller(data_file, persistence_mode='write_behind')
+    controller.set_budget("Courses", 300)
+    first = controller.add_transaction(-10, "Courses")
+    controller.update_transaction(first.transaction_id, -15, "Courses", "")
+    controller.add_transaction(-20, "Courses")
+    controller.delete_last_transaction()
+    saver = controller.autosaver
+    controller.logout()
+    assert not saver.running and not saver._thread.is_alive()
+    journal = controller.user_manager.backend.journals["alice"]
+    ops = [record['op'] for record in journal.replay(journal.file_path)]
+    assert 'replace_user' not in ops
+    assert ops.count('add_transactions') == 1 and 'delete_transaction' not in ops  # Effet net : un seul ajout
+    controller.close()
+
+    reloaded = make_controller(data_file)
+    assert [t.amount for t in reloaded.get_transactions()] == [-15]
+    assert reloaded.get_budgets()[0].spent == 15
+    reloaded.close()
+
+def test_transaction_ids_are_not_reused(data_file):
+    controller = make_controller(data_file)
+    controller.add_transaction(-10, "Courses")
+    deleted = controller.add_transaction(-20, "Courses")
+    controller.delete_last_transaction()
+    assert controller.add_transaction(-30, "Courses").transaction_id == deleted.transaction_id + 1
+    controller.delete_last_transaction()
+    controller.close()
+
+    reloaded = make_controller(data_file)
+    assert reloaded.add_transaction(-40, "Courses").transaction_id == deleted.transaction_id + 2
+    reloaded.close()
+
+def test_bulk_import_saves_once_per_chunk(data_file):
+    controller = make_controller(data_file)
+    controller.set_budget("Courses", 300)
+    rows = ({'amount': -1, 'category': "Courses" if i % 2 else "Loisirs"} for i in range(25))
+    assert controller.add_transactions(rows, chunk_size=10) == 25
+    assert controller.get_budgets()[0].spent == 12
+    journal = controller.user_manager.backend.journals["alice"]
+    assert journal.record_count == 1 + 1 + 3 * 2  # création, budget, puis transactions et budget par paquet
+    controller.close()
+
+    reloaded = make_controller(data_file)
+    assert len(reloaded.get_transactions()) == 25
+    assert reloaded.get_balance() == -25
+    reloaded.close()
+
+def test_budgets_are_recomputed_at_login(data_file):
+    controller = make_controller(data_file)
+    budget = controller.set_budget("Courses", 300)
+    controller.add_transaction(-40, "Courses")
+    budget.spent = 999  # Compteur désynchronisé
+    controller.save_changes(budgets=[budget])
+    controller.close()
+
+    reloaded = make_controller(data_file)
+    assert reloaded.get_budgets()[0].spent == 40
+    assert reloaded.recompute_budgets(verify_only=True) == []
+    reloaded.close()
+
+def test_low_balance_risk(data_file):
+    controller = make_controller(data_file)
+    controller.add_transaction(100, "Salaire")
+    controller.add_transaction(-80, "Courses")
+    controller.set_low_threshold(1000)
+    risk = controller.get_low_balance_risk(30, n_paths=200)
+    assert risk['probability_below'] == 1
+    assert risk['paths'] == 200
+    controller.close()
+
+def test_planned_transactions_are_settled_when_due(data_file):
+    from datetime import date, datetime, timedelta
+    controller = make_controller(data_file)
+    controller.add_transaction(100, "Salaire")
+    tomorrow = date.today() + timedelta(days=1)
+    plan = controller.add_transaction(-30, "Courses", date=tomorrow, is_planned=True)
+    controller.schedule_transaction(-5, "Café", start_date=datetime.now() - timedelta(days=2), frequency='daily')
+    # Les occurrences passées du café sont réglées, pas la transaction de demain
+    assert len(controller.get_transactions()) == 4
+    assert controller.get_settled_balance() == 85
+    assert controller.get_projected_balance(datetime.combine(tomorrow, datetime.max.time())) == 50
+    controller.close()
+
+    reloaded = make_controller(data_file)
+    assert [p.category for p in reloaded.get_planned_transactions()] == ["Courses", "Café"]
+    assert reloaded.settle_planned_transactions(datetime.now() + timedelta(days=2)) == 3
+    assert reloaded.get_balance() == 100 - 30 - 5 * 5
+    assert reloaded.cancel_planned_transaction(plan.plan_id) is None
+    reloaded.close()
+
+def test_data_version_changes_on_write(data_file):
+    controller = make_controller(data_file)
+    version = controller.data_version
+    controller.get_balance()
+    assert controller.data_version == version
+    controller.add_transaction(-10, "Courses")
+    assert controller.data_version > version
+    controller.close()
@@ -0,0 +1,61 @@
+import pytest
+import threading
+from services.autosave import PendingChanges, WriteBehindSaver
+
+def test_flush_coalesces_mutations():
+    calls = []
+    saver = WriteBehindSaver(lambda changes: calls.append(1), interval=60, max_dirty=100)
+    for _ in range(5):
+        saver.mark_dirty()
+    assert saver.flush()
+    assert not saver.flush()  # Rien en attente
+    saver.stop()
+    assert len(calls) == 1
+    stats = saver.get_stats()
+    assert stats['mutations'] == 5
+    assert stats['flushes'] == 1
+    assert stats['flushes_saved'] == 4
+
+def test_threshold_wakes_flusher():
+    flushed = threading.Event()
+    saver = WriteBehindSaver(lambda changes: flushed.set(), interval=60, max_dirty=3)
+    for _ in range(3):
+        saver.mark_dirty()
+    assert flushed.wait(5)
+    saver.stop()
+
+def test_stop_flushes_pending_changes():
+    calls = []
+    saver = WriteBehindSaver(lambda changes: calls.append(1), interval=60)
+    saver.mark_dirty()
+    saver.stop()
+    assert calls == [1]
+
+def test_failed_flush_keeps_changes_pending():
+    def failing_save(changes):
+        raise IOError("disque plein")
+    saver = WriteBehindSaver(failing_save, interval=60)
+    saver.mark_dirty()
+    with pytest.raises(IOError):
+        saver.flush()
+    assert saver.get_stats()['pending'] == 1
+    saver.save_callback = lambda changes: None
+    saver.stop()
+    assert saver.get_stats()['pending'] == 0
+
+def test_pending_changes_keep_net_effect():
+    changes = PendingChanges()
+    changes.record(added=[1, 2], updated=[3])
+    changes.record(updated=[1], deleted=[2, 3, 4], budgets=[7])
+    assert (changes.added, changes.updated, changes.deleted) == ({1}, set(), {3, 4})
+    assert changes.budgets == {7}
+    assert not PendingChanges()
+
+def test_stop_unregisters_exit_hook(monkeypatch):
+    registered = []
+    monkeypatch.setattr("atexit.register", registered.append)
+    monkeypatch.setattr("atexit.unregister", registered.remove)
+    saver = WriteBehindSaver(lambda changes: None, interval=60)
+    assert registered == [saver.stop]
+    saver.stop()
+    assert registered == [] and not saver.running
@@ -0,0 +1,109 @@
+import io
+from datetime import datetime
+
+import pytest
+
+from services.import_index import ImportIndex, transaction_hash
+from services.statement_parsers import parse_csv, parse_ofx, parse_qif, parse_amount
+
+CSV = """Date;Libellé;Débit;Crédit
+02/01/2024;CB Café du coin;3,50;
+02/01/2024;CB Café du coin;3,50;
+05/01/2024;Virement salaire;;1 850,00
+"""
+
+OFX = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240102120000<TRNAMT>-3.50<NAME>CAFE DU COIN</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20240105
+<TRNAMT>1850.00
+<NAME>SALAIRE
+<MEMO>Virement mensuel
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+QIF = """!Type:Bank
+D02/01'24
+T-3.50
+PCafé du coin
+LRestaurants
+^
+D05/01/2024
+T1,850.00
+PSalaire
+L[Compte épargne]
+"""
+
+
+def test_parse_amount():
+    assert parse_amount("1 234,56 €") == 1234.56
+    assert parse_amount("-1,234.56") == -1234.56
+    assert parse_amount("+12.5") == 12.5
+
+
+def test_parsers_read_the_same_statement():
+    csv_rows = list(parse_csv(io.StringIO(CSV)))
+    assert [(r['date'], r['amount']) for r in csv_rows] == [
+        (datetime(2024, 1, 2), -3.5), (datetime(2024, 1, 2), -3.5), (datetime(2024, 1, 5), 1850.0)]
+    assert csv_rows[0]['description'] == "CB Café du coin"
+
+    ofx_rows = list(parse_ofx(io.StringIO(OFX)))
+    assert [(r['date'], r['amount'], r['description']) for r in ofx_rows] == [
+        (datetime(2024, 1, 2), -3.5, "CAFE DU COIN"), (datetime(2024, 1, 5), 1850.0, "SALAIRE Virement mensuel")]
+
+    qif_rows = list(parse_qif(io.StringIO(QIF)))
+    assert [(r['date'], r['amount']) for r in qif_rows] == [(datetime(2024, 1, 2), -3.5), (datetime(2024, 1, 5), 1850.0)]
+    assert qif_rows[0]['category'] == "Restaurants"
+    assert 'category' not in qif_rows[1]  # Virement entre comptes
+
+
+def test_csv_without_amount_column_is_rejected():
+    with pytest.raises(ValueError):
+        list(parse_csv(io.StringIO("Date;Libellé\n02/01/2024;Café\n")))
+
+
+def test_index_keeps_same_day_duplicates():
+    index = ImportIndex()
+    row = {'date': datetime(2024, 1, 2), 'amount': -3.5, 'description': "Café"}
+    new_rows, hashes = index.filter_new([row, dict(row)], {})
+    assert len(new_rows) == 2
+    index.add(hashes, 2)
+    # Le même relevé avec une troisième occurrence : seule celle-ci est nouvelle
+    new_rows, hashes = index.filter_new([row, dict(row), dict(row)], {})
+    assert len(new_rows) == 1
+    assert hashes == [transaction_hash(row['date'], row['amount'], "café", 2)]
+
+
+def test_truncated_index_file(tmp_path):
+    path = str(tmp_path / "index.bin")
+    open(path, 'wb').close()  # Arrêt juste après la création du fichier
+    index = ImportIndex(path)
+    assert len(index) == 0 and index.indexed_high_water == 0
+    index.add([1, 2], 2)
+    with open(path, 'ab') as file:
+        file.write(b"\x01\x02\x03")  # Empreinte à moitié écrite
+    index = ImportIndex(path)
+    assert (sorted(index._sorted.tolist()), index.indexed_high_water) == ([1, 2], 2)
+    index.add([3], 3)
+    assert sorted(ImportIndex(path)._sorted.tolist()) == [1, 2, 3]
+
+
+def test_reimport_skips_existing_transactions(controller, tmp_path):
+    statement = tmp_path / "releve.csv"
+    statement.write_text(CSV, encoding='utf-8')
+    controller.add_transaction(1850, "Salaire", "VIREMENT SALAIRE", date=datetime(2024, 1, 5, 9, 30))
+
+    assert controller.import_statement(str(statement), chunk_size=2) == {'read': 3, 'imported': 2, 'duplicates': 1}
+    assert controller.import_statement(str(statement)) == {'read': 3, 'imported': 0, 'duplicates': 3}
+    assert len(controller.get_transactions()) == 3
+    assert {t.category for t in controller.get_transactions()} == {"Salaire", "Autre"}
+    controller.logout()
+
+    # L'index est relu depuis son fichier et complété par la nouvelle ligne du relevé
+    statement.write_text(CSV + "06/01/2024;CB Boulangerie;1,20;\n", encoding='utf-8')
+    assert controller.login("alice", "secret")
+    assert controller.import_statement(str(statement)) == {'read': 4, 'imported': 1, 'duplicates': 3}
+    assert len(controller.get_transactions()) == 4
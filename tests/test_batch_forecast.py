@@ -0,0 +1,45 @@
+import json
+import pytest
+from datetime import datetime, timedelta
+from services.batch_forecast import run_batch, forecast_user, compact_user_data
+from services.user_manager import UserManager
+from services.storage.sharded_backend import ShardedStorageBackend
+
+@pytest.fixture
+def user_manager(tmp_path):
+    manager = UserManager(backend=ShardedStorageBackend(str(tmp_path / "users")))
+    for u in range(5):
+        username = f"user{u}"
+        manager.create_user(username, f"{username}@example.com", "secret")
+        manager.add_transactions(username, [
+            {'transaction_id': i + 1, 'user_id': None, 'amount': 100.0 if i % 2 else -20.0 * (u + 1),
+             'category': "Salaire" if i % 2 else "Courses", 'description': "",
+             'date': (datetime.now() - timedelta(days=i)).isoformat()}
+            for i in range(20)
+        ])
+    manager.create_user("empty", "empty@example.com", "secret")
+    return manager
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_run_batch(user_manager, tmp_path, workers):
+    output = tmp_path / "out" / "forecasts.jsonl"
+    calls = []
+    stats = run_batch(user_manager, str(output), workers=workers,
+                      progress=lambda done, elapsed: calls.append(done), progress_every=2)
+    assert stats['users'] == 6 and stats['errors'] == 0
+    assert stats['users_per_second'] > 0
+    assert calls == [2, 4, 6, 6]
+    results = {r['username']: r for r in map(json.loads, output.read_text().splitlines())}
+    assert set(results) == {"user0", "user1", "user2", "user3", "user4", "empty"}
+    assert results["user0"]['balance'] == pytest.approx(10 * 100 - 10 * 20)
+    assert results["empty"]['predicted_balance'] == 0
+
+def test_forecast_user_matches_service(user_manager):
+    from services.app_controller import AppController
+    controller = AppController(user_manager)
+    controller.login("user1", "secret")
+    service = controller.forecasting_service
+    result = forecast_user("user1", compact_user_data(user_manager.get_user_data("user1")))
+    assert result['predicted_balance'] == pytest.approx(service.predict_future_balance(30))
+    assert result['savings_goal'] == pytest.approx(service.suggest_savings_goal())
+    assert result['burn_rates'] == pytest.approx(service.get_burn_rates())
@@ -48,7 +48,7 @@ def test_handle_transaction_deletion(budget_manager):
     now = datetime.now()
     budget_manager.create_budget("Groceries", 300, now, now + timedelta(days=30))
     transaction = Transaction(1, 1, -50, "Groceries", "Weekly shopping", now)
-    budget_manager.update_budget_spent("Groceries", -50)  # Dépense initiale de 50
+    budget_manager.update_budget_spent("Groceries", 50)  # Dépense initiale de 50
     budget_manager.handle_transaction_deletion(transaction)
     groceries_budget = budget_manager.get_budget_by_category("Groceries")[0]
     assert groceries_budget.spent == 0  # La dépense a été annulée
@@ -56,16 +56,95 @@ def test_handle_transaction_deletion(budget_manager):
 def test_update_budget_spent(budget_manager):
     now = datetime.now()
     budget_manager.create_budget("Groceries", 300, now, now + timedelta(days=30))
-    budget_manager.update_budget_spent("Groceries", -50)  # Dépense de 50
+    updated = budget_manager.update_budget_spent("Groceries", 50)  # Dépense de 50
     groceries_budget = budget_manager.get_budget_by_category("Groceries")[0]
-    assert abs(groceries_budget.spent) == 50
+    assert updated == [groceries_budget]
+    assert groceries_budget.spent == 50
+    budget_manager.update_budget_spent("Groceries", -20)  # Annulation d'une dépense de 20
+    assert groceries_budget.spent == 30
 
 def test_handle_transaction_update(budget_manager):
     now = datetime.now()
     budget_manager.create_budget("Groceries", 300, now, now + timedelta(days=30))
     old_transaction = Transaction(1, 1, -50, "Groceries", "Weekly shopping", now)
     new_transaction = Transaction(1, 1, -75, "Groceries", "Weekly shopping + extras", now)
-    budget_manager.update_budget_spent("Groceries", -50)  # Dépense initiale de 50
+    budget_manager.update_budget_spent("Groceries", 50)  # Dépense initiale de 50
     budget_manager.handle_transaction_update(old_transaction, new_transaction)
     groceries_budget = budget_manager.get_budget_by_category("Groceries")[0]
-    assert abs(groceries_budget.spent) == 75
+    assert groceries_budget.spent == 75
+
+def test_budgets_covering_date(budget_manager):
+    for month in range(1, 13):
+        start = datetime(2024, month, 1)
+        budget_manager.create_budget("Groceries", 300, start, (start + timedelta(days=32)).replace(day=1) - timedelta(days=1))
+    yearly = budget_manager.create_budget("Groceries", 3000, datetime(2024, 1, 1), datetime(2024, 12, 31))
+    covering = budget_manager.get_budgets_covering("Groceries", datetime(2024, 6, 15))
+    assert len(covering) == 2
+    assert yearly in covering
+    assert covering[1].period_start == datetime(2024, 6, 1)
+    assert budget_manager.get_budgets_covering("Groceries", datetime(2025, 1, 2)) == []
+    assert budget_manager.get_budgets_covering("Rent", datetime(2024, 6, 15)) == []
+
+def test_budgets_covering_matches_scan_with_long_budget(budget_manager):
+    import random
+    rng = random.Random(7)
+    origin = datetime(2020, 1, 1)
+    budget_manager.create_budget("Groceries", 10000, origin, origin + timedelta(days=2000))
+    for _ in range(300):
+        start = origin + timedelta(days=rng.randrange(1500))
+        budget_manager.create_budget("Groceries", 100, start, start + timedelta(days=rng.randrange(1, 40)))
+        if rng.random() < 0.1:
+            budget_manager.get_budgets_covering("Groceries", start)  # Recherches entre les ajouts
+    for offset in range(0, 2100, 7):
+        day = origin + timedelta(days=offset)
+        expected = sorted((b for b in budget_manager.user.budgets if b.period_start <= day <= b.period_end),
+                          key=lambda b: (b.period_start, b.budget_id))
+        assert budget_manager.get_budgets_covering("Groceries", day) == expected
+
+def test_active_budgets_cache_expires(budget_manager):
+    january = budget_manager.create_budget("Groceries", 300, datetime(2024, 1, 1), datetime(2024, 1, 31))
+    february = budget_manager.create_budget("Groceries", 300, datetime(2024, 2, 1), datetime(2024, 2, 29))
+    assert budget_manager.get_active_budgets(datetime(2024, 1, 15)) == {"Groceries": [january]}
+    assert budget_manager.get_active_budgets(datetime(2024, 1, 31)) == {"Groceries": [january]}
+    assert budget_manager.get_active_budgets(datetime(2024, 2, 10)) == {"Groceries": [february]}
+    assert budget_manager.get_active_budgets(datetime(2024, 3, 1)) == {}
+    # Budget ajouté directement à la liste de l'utilisateur
+    march = Budget(3, 1, "Groceries", 300, datetime(2024, 3, 1), datetime(2024, 3, 31))
+    budget_manager.user.add_budget(march)
+    assert budget_manager.get_active_budgets(datetime(2024, 3, 1)) == {"Groceries": [march]}
+
+def test_recompute_all_matches_transactions(budget_manager):
+    import random
+    rng = random.Random(0)
+    user = budget_manager.user
+    for i in range(300):
+        user.transactions.append(Transaction(i + 1, 1, rng.choice([-1, 1]) * rng.randint(1, 100),
+                                             rng.choice(["Groceries", "Rent", "Fun"]), "",
+                                             datetime(2024, 1, 1) + timedelta(hours=rng.randint(0, 24 * 365))))
+    for month in range(1, 13):
+        start = datetime(2024, month, 1)
+        budget_manager.create_budget("Groceries", 300, start, (start + timedelta(days=32)).replace(day=1) - timedelta(days=1))
+    budget_manager.create_budget("Rent", 3000, datetime(2024, 1, 1), datetime(2024, 12, 31))
+    budget_manager.create_budget("Travel", 500, datetime(2024, 1, 1), datetime(2024, 12, 31))
+
+    assert len(budget_manager.recompute_all(verify_only=True)) == 13  # Tous sauf "Travel" (aucune transaction)
+    assert user.budgets[0].spent == 0
+    budget_manager.recompute_all()
+    for budget in user.budgets:
+        expected = sum(-t.amount for t in user.transactions
+                       if t.category == budget.category and t.amount < 0
+                       and budget.period_start <= t.date <= budget.period_end)
+        assert budget.spent == pytest.approx(expected)
+    assert budget_manager.recompute_all(verify_only=True) == []
+
+def test_incremental_updates_use_transaction_date(budget_manager):
+    january = budget_manager.create_budget("Groceries", 300, datetime(2024, 1, 1), datetime(2024, 1, 31))
+    february = budget_manager.create_budget("Groceries", 300, datetime(2024, 2, 1), datetime(2024, 2, 29))
+    transaction = Transaction(1, 1, -50, "Groceries", "", datetime(2024, 1, 10))
+    budget_manager.user.add_transaction(transaction)
+    assert budget_manager.handle_new_transaction(transaction) == [january]
+    old_transaction = Transaction.from_dict(transaction.to_dict())
+    transaction.date = datetime(2024, 2, 10)
+    budget_manager.handle_transaction_update(old_transaction, transaction)
+    assert (january.spent, february.spent) == (0, 50)
+    assert budget_manager.recompute_all(verify_only=True) == []
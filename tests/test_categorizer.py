@@ -0,0 +1,64 @@
+import pytest
+
+from models.category_rule import CategoryRule
+from services.app_controller import AppController
+from services.categorizer import Categorizer, KeywordAutomaton, benchmark, categorize_one_by_one
+from services.user_manager import UserManager
+
+
+def test_automaton_finds_all_whole_word_keywords():
+    automaton = KeywordAutomaton([("carrefour", 0), ("carrefour market", 1), ("sncf", 2), ("car", 3)])
+    assert automaton.search("cb carrefour market paris") == {0, 1}
+    assert automaton.search("prlv sncf") == {2}
+    assert automaton.search("carrefourcity") == set()
+
+
+def test_first_matching_rule_wins():
+    rules = [
+        CategoryRule(1, "Voyage", keyword="SNCF", min_amount=-1000, max_amount=-100),
+        CategoryRule(2, "Transport", keyword="sncf"),
+        CategoryRule(3, "Restaurants", pattern=r"restau?rant|\bresto\b"),
+        CategoryRule(4, "Courses", keyword="Café"),
+        CategoryRule(5, "Virements", min_amount=1000)
+    ]
+    categorizer = Categorizer(rules)
+    descriptions = ["PRLV SNCF billet", "PRLV SNCF pass", "CB Resto du coin", "CB CAFE DE LA GARE", "VIR SALAIRE", "?"]
+    amounts = [-150, -40, -25, -3, 2000, None]
+    expected = ["Voyage", "Transport", "Restaurants", "Courses", "Virements", None]
+    assert categorizer.categorize_many(descriptions, amounts) == expected
+    assert [categorize_one_by_one(rules, d, a) for d, a in zip(descriptions, amounts)] == expected
+    assert categorizer.categorize("billet sncf") == "Transport"  # Montant inconnu : la plage ne s'applique pas
+
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(ValueError):
+        CategoryRule(1, "Courses")
+    with pytest.raises(ValueError):
+        CategoryRule(1, "Courses", pattern="(")
+
+
+def test_benchmark_with_a_thousand_rules():
+    stats = benchmark(rule_count=1000, sample_size=2000, reference_size=200)
+    assert stats['rules'] == 1001
+    assert stats['categorized'] > 0
+    assert stats['per_second'] > 0
+
+
+def test_rules_categorize_imports_and_persist(tmp_path):
+    data_file = str(tmp_path / "user_data.json")
+    controller = AppController(UserManager(data_file))
+    controller.create_account("alice", "alice@example.com", "secret")
+    rule = controller.add_category_rule("Courses", keyword="carrefour")
+    controller.add_category_rule("Transport", pattern=r"\bsncf\b")
+    controller.add_transactions([{'amount': -30, 'description': "CB CARREFOUR 12/03"},
+                                 {'amount': -45, 'description': "PRLV SNCF"},
+                                 {'amount': -5, 'category': "Autre", 'description': "Carrefour"}])
+    assert [t.category for t in controller.get_transactions()] == ["Courses", "Transport", "Autre"]
+    controller.remove_category_rule(rule.rule_id)
+    controller.close()
+
+    reloaded = AppController(UserManager(data_file))
+    reloaded.login("alice", "secret")
+    assert [r.pattern for r in reloaded.get_category_rules()] == [r"\bsncf\b"]
+    assert reloaded.categorize(["CB CARREFOUR", "sncf"]) == [None, "Transport"]
+    reloaded.close()
@@ -75,3 +75,77 @@ def test_update_transaction(finance_manager):
 
 def test_update_nonexistent_transaction(finance_manager):
     assert finance_manager.update_transaction(999, 100, "Test", "Test") is None
+
+def test_running_totals_follow_changes(finance_manager):
+    salary = finance_manager.add_transaction(100, "Income", "Salary")
+    groceries = finance_manager.add_transaction(-50, "Expense", "Groceries")
+    finance_manager.update_transaction(groceries.transaction_id, -70, "Food", "Groceries")
+    assert finance_manager.get_balance() == 30
+    assert finance_manager.get_total_by_category() == {"Income": 100, "Food": -70}
+    finance_manager.delete_transaction(salary.transaction_id)
+    assert finance_manager.get_balance() == -70
+    assert finance_manager.get_total_by_category() == {"Food": -70}
+    assert finance_manager.verify_totals()
+
+def test_totals_rebuilt_after_external_change(finance_manager):
+    finance_manager.add_transaction(100, "Income", "Salary")
+    finance_manager.user.transactions[0].amount = 120
+    finance_manager.user.add_transaction(Transaction(2, 1, -20, "Expense", "Bus"))
+    assert finance_manager.get_balance() == 100
+    assert finance_manager.get_total_by_category() == {"Income": 120, "Expense": -20}
+
+def test_verify_totals_detects_drift(finance_manager):
+    finance_manager.add_transaction(100, "Income", "Salary")
+    finance_manager.balance = 999
+    assert not finance_manager.verify_totals()
+    assert finance_manager.get_balance() == 100
+    assert finance_manager.verify_totals()
+
+def test_get_balance_as_of(finance_manager):
+    now = datetime.now()
+    finance_manager.add_transaction(100, "Income", "Salary", now - timedelta(days=10))
+    finance_manager.add_transaction(-30, "Expense", "Planned", now + timedelta(days=5))
+    finance_manager.add_transaction(-20, "Expense", "Groceries", now - timedelta(days=2))
+    assert finance_manager.get_balance_as_of(now - timedelta(days=5)) == 100
+    assert finance_manager.get_balance_as_of(now) == 80
+    assert finance_manager.get_balance_as_of(now + timedelta(days=5)) == 50
+
+def test_add_transactions_bulk(finance_manager):
+    finance_manager.add_transaction(10, "Income")
+    records = finance_manager.add_transactions([
+        {'amount': -5, 'category': "Food", 'date': "2024-10-01T00:00:00"},
+        {'amount': "-7.5", 'category': "Food", 'description': "Bakery"},
+    ])
+    assert [r['transaction_id'] for r in records] == [2, 3]
+    assert finance_manager.get_balance() == -2.5
+    assert finance_manager.get_total_by_category()["Food"] == -12.5
+    assert finance_manager.verify_totals(rebuild=False)
+    assert finance_manager.user.transactions.find_row(3) == 2
+
+def test_add_transactions_rejects_invalid_rows(finance_manager):
+    with pytest.raises(ValueError):
+        finance_manager.add_transactions([{'amount': -5, 'category': "Food"}, {'amount': "abc", 'category': "Food"}])
+    assert len(finance_manager.user.transactions) == 0
+
+def test_query_transactions(finance_manager):
+    start = datetime(2024, 10, 1)
+    for day in range(10):
+        finance_manager.add_transaction(-(day + 1), "Food" if day % 2 else "Transport", f"#{day}",
+                                        start + timedelta(days=day))
+    finance_manager.add_transaction(500, "Income", "Salary", start + timedelta(days=3))
+
+    page = finance_manager.query_transactions(offset=0, limit=3)
+    assert page['total'] == 11
+    assert [t.description for t in page['transactions']] == ["#9", "#8", "#7"]
+
+    result = finance_manager.query_transactions(category="Food", start_date=start + timedelta(days=2),
+                                                end_date=start + timedelta(days=7), max_amount=-5,
+                                                sort_by='amount', descending=False)
+    assert result['total'] == 2
+    assert [t.amount for t in result['transactions']] == [-8, -6]
+
+    by_category = finance_manager.query_transactions(sort_by='category', descending=False, offset=4, limit=2)
+    assert [t.category for t in by_category['transactions']] == ["Food", "Income"]
+    assert finance_manager.query_transactions(category="Unknown")['total'] == 0
+    with pytest.raises(ValueError):
+        finance_manager.query_transactions(sort_by='description')
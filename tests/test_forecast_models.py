@@ -0,0 +1,47 @@
+import pytest
+import numpy as np
+from services.forecast_models import FlatAverageModel, EwmaModel, SeasonalModel
+from services.backtesting import backtest, best_model
+
+ORIGIN = np.datetime64('2024-01-01')  # Un lundi
+
+def seasonal_series(days=365):
+    dates = ORIGIN + np.arange(days)
+    weekdays = np.arange(days) % 7
+    monthdays = (dates - dates.astype('datetime64[M]').astype('datetime64[D]')).astype(int)
+    values = np.where(weekdays == 5, -100.0, -10.0)  # Courses du samedi
+    values += np.where(monthdays == 0, 2000.0, 0.0)  # Salaire le 1er du mois
+    return values
+
+def test_flat_average():
+    model = FlatAverageModel(30).fit(np.arange(60, dtype=float), ORIGIN)
+    assert model.predict(3) == pytest.approx([44.5] * 3)
+    assert FlatAverageModel(30).fit(np.ones(10), ORIGIN).predict(1)[0] == pytest.approx(10 / 30)
+
+def test_ewma_favours_recent_days():
+    values = np.concatenate([np.zeros(100), np.full(20, 10.0)])
+    assert 0 < EwmaModel(0.05).fit(values, ORIGIN).predict(1)[0] < EwmaModel(0.5).fit(values, ORIGIN).predict(1)[0]
+    assert EwmaModel(1.0).fit(values, ORIGIN).predict(1)[0] == 10
+    assert EwmaModel(0.1).fit(np.full(50, 3.0), ORIGIN).predict(2) == pytest.approx([3, 3])
+
+def test_seasonal_model_learns_weekly_and_monthly_patterns():
+    values = seasonal_series()
+    model = SeasonalModel(window=364).fit(values[:300], ORIGIN)
+    predicted = model.predict(65)
+    actual = values[300:]
+    assert np.abs(predicted.sum() - actual.sum()) < np.abs(FlatAverageModel().fit(values[:300], ORIGIN).predict(65).sum() - actual.sum())
+    assert predicted[np.argmax(actual)] == predicted.max()  # Le salaire tombe le bon jour
+
+def test_backtest_reports_metrics():
+    results = backtest(seasonal_series(), ORIGIN, horizon=30, min_train=120, step=14)
+    assert set(results) == {"FlatAverageModel(window=30)", "EwmaModel(alpha=0.05)",
+                            "SeasonalModel(window=56, weekly=True, monthly=True)"}
+    for scores in results.values():
+        assert scores['runs'] == len(range(120, 365 - 30 + 1, 14))
+        assert scores['mae'] >= 0 and scores['fit_time'] >= 0
+    assert best_model(results, 'mae').startswith("SeasonalModel")
+
+def test_backtest_short_history():
+    results = backtest(np.ones(10), ORIGIN)
+    assert all(scores['runs'] == 0 for scores in results.values())
+    assert best_model(results) is None
@@ -49,4 +49,40 @@ def test_suggest_savings_goal_expenses_exceed_income(user):
         Transaction(2, 1, -1500, "Expense", "Living", datetime.now())
     ]
     fs = ForecastingService(user)
-    assert fs.suggest_savings_goal() == 0
\ No newline at end of file
+    assert fs.suggest_savings_goal() == 0
+
+
+def test_cash_flow_cache_is_invalidated_by_changes(forecasting_service, user):
+    cash_flow = forecasting_service._get_cash_flow()
+    assert forecasting_service._get_cash_flow() is cash_flow
+    user.add_transaction(Transaction(100, 1, -600, "Expense", "Rent", datetime.now()))
+    assert forecasting_service._get_cash_flow() is not cash_flow
+    assert forecasting_service.suggest_savings_goal() == 0
+
+def test_balance_at_date(forecasting_service, user):
+    today = datetime.now()
+    assert forecasting_service.get_balance_at(today) == pytest.approx(user.get_balance())
+    assert forecasting_service.get_balance_at(today - timedelta(days=29)) == pytest.approx(20)
+    assert forecasting_service.get_balance_at(today - timedelta(days=100)) == 0
+    assert forecasting_service.get_balance_at(today + timedelta(days=100)) == pytest.approx(user.get_balance())
+    balances = forecasting_service.get_daily_balances()
+    assert len(balances) == 30
+    assert list(balances.values())[-1] == pytest.approx(600)
+
+def test_burn_rate_and_goal(forecasting_service):
+    assert forecasting_service.get_category_burn_rate("Expense") == pytest.approx(80)
+    assert forecasting_service.get_category_burn_rate("Unknown") == 0
+    assert forecasting_service.get_burn_rates(10) == {"Expense": pytest.approx(80)}
+    goal = forecasting_service.estimate_goal_date(700)
+    assert goal.date() == (datetime.now() + timedelta(days=5)).date()
+    assert forecasting_service.estimate_goal_date(100).date() == datetime.now().date()
+
+def test_select_model(user):
+    for i in range(30, 200):
+        date = datetime.now() - timedelta(days=i)
+        user.add_transaction(Transaction(1000 + i, 1, -50 if date.weekday() == 5 else -5, "Expense", "", date))
+    fs = ForecastingService(user)
+    results = fs.select_model()
+    assert len(results) == 3
+    assert repr(fs.model) in results
+    assert isinstance(fs.predict_future_balance(30), float)
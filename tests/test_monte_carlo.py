@@ -0,0 +1,28 @@
+import pytest
+import numpy as np
+from services.monte_carlo import simulate_balance
+
+HISTORY = np.array([-30.0, -10.0, 0.0, 5.0, 20.0])
+
+def test_deterministic_and_independent_of_workers():
+    first = simulate_balance(HISTORY, 100, 30, n_paths=1000, threshold=50, seed=7, chunk_size=300)
+    second = simulate_balance(HISTORY, 100, 30, n_paths=1000, threshold=50, seed=7, chunk_size=300, workers=2)
+    assert first['paths'] == second['paths'] == 1000
+    assert first['probability_below'] == second['probability_below']
+    for p in first['bands']:
+        assert np.array_equal(first['bands'][p], second['bands'][p])
+
+def test_bands_and_threshold_probability():
+    result = simulate_balance(HISTORY, 100, 60, n_paths=4000, threshold=0, seed=1)
+    bands = result['bands']
+    assert len(bands[50]) == 60
+    assert np.all(bands[5] <= bands[50]) and np.all(bands[50] <= bands[95])
+    assert bands[50][-1] == pytest.approx(100 + 60 * HISTORY.mean(), abs=15)
+    assert 0 < result['probability_below'] < 1
+    assert simulate_balance(np.array([-1.0]), 100, 30, n_paths=10, threshold=0)['probability_below'] == 0
+    assert simulate_balance(np.array([-10.0]), 100, 30, n_paths=10, threshold=0)['probability_below'] == 1
+
+def test_time_budget_keeps_completed_chunks():
+    result = simulate_balance(HISTORY, 100, 30, n_paths=10000, chunk_size=100, time_budget=0)
+    assert 100 <= result['paths'] < 10000
+    assert result['probability_below'] is None
@@ -0,0 +1,66 @@
+import os
+from datetime import datetime
+
+from services.monthly_rollup import MonthlyRollup, period_bounds, previous_period
+
+ROWS = [(1, -50, "Courses", "", "2024-01-05T12:00:00"), (2, 2000, "Salaire", "", "2024-01-28T12:00:00"),
+        (3, -20, "Courses", "", "2024-02-03T12:00:00"), (4, -35, "Transport", "", "2024-03-15T12:00:00"),
+        (5, -40, "Courses", "", "2023-03-20T12:00:00"), (6, 1900, "Salaire", "", "2023-12-28T12:00:00")]
+
+
+def test_periods():
+    assert period_bounds('quarter', 2024, 1) == (2024 * 12, 2024 * 12 + 2)
+    assert previous_period('month', 2024, 1) == (2023, 12)
+    assert previous_period('quarter', 2024, 1, against='last_year') == (2023, 1)
+
+
+def test_reports_from_rollup(make_store):
+    rollup = MonthlyRollup.build(make_store(ROWS))
+    january = rollup.report('month', 2024, 1)
+    assert (january['income'], january['expense'], january['count']) == (2000, -50, 2)
+    assert january['categories']['Courses'] == {'income': 0.0, 'expense': -50.0, 'count': 1, 'net': -50.0}
+
+    quarter = rollup.report('quarter', 2024, 1)
+    assert quarter['count'] == 4
+    assert quarter['categories']['Courses']['expense'] == -70
+    assert (quarter['start'], quarter['end']) == ("2024-01", "2024-03")
+
+    comparison = rollup.compare('quarter', 2024, 1, against='last_year')
+    assert comparison['previous']['net'] == -40
+    assert comparison['changes']['categories']['Courses'] == -30
+    assert rollup.compare('month', 2024, 1)['changes']['net'] == 1950 - 1900
+
+
+def test_incremental_updates_match_rebuild(make_store):
+    store = make_store(ROWS)
+    rollup = MonthlyRollup.build(store)
+    rollup.add(datetime(2024, 2, 10), "Courses", -15)
+    rollup.remove(datetime(2024, 3, 15), "Transport", -35)
+    rollup.remove(datetime(2023, 3, 20), "Courses", -40)
+    assert rollup.report('month', 2024, 2)['categories']['Courses']['expense'] == -35
+    assert 2024 * 12 + 2 not in rollup.months
+    assert rollup.report('year', 2023)['count'] == 1
+
+
+def test_rollup_follows_mutations_and_persists(controller, shared_store):
+    controller.add_transaction(-50, "Courses", date=datetime(2024, 1, 5))
+    assert controller.get_period_report('month', 2024, 1)['expense'] == -50
+
+    controller.add_transactions([{'amount': 2000, 'category': "Salaire", 'date': datetime(2024, 1, 28)},
+                                 {'amount': -20, 'category': "Courses", 'date': datetime(2024, 2, 3)}])
+    last = controller.add_transaction(-10, "Courses", date=datetime(2024, 2, 4))
+    controller.update_transaction(last.transaction_id, -12, "Loisirs", "")
+    report = controller.get_period_report('quarter', 2024, 1)
+    assert report['categories']['Loisirs']['expense'] == -12
+    assert report['categories']['Courses']['expense'] == -70
+    controller.delete_last_transaction()
+    comparison = controller.compare_periods('month', 2024, 2)
+    assert comparison['current']['net'] == -20
+    assert comparison['changes']['net'] == -20 - 1950
+    controller.logout()
+
+    path = MonthlyRollup.path_for("alice", shared_store.rollup_dir)
+    assert os.path.exists(path)
+    controller.login("alice", "secret")
+    assert MonthlyRollup.load(path, controller.current_user.transactions) is not None  # Pas de recalcul
+    assert controller.get_period_report('year', 2024)['count'] == 3
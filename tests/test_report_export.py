@@ -0,0 +1,43 @@
+import csv
+import pytest
+from datetime import datetime, timedelta
+from models.user import User
+from services.finance_manager import FinanceManager
+from services.report_export import export_report, format_from_path
+
+@pytest.fixture
+def finance_manager():
+    finance_manager = FinanceManager(User(1, "testuser", "test@example.com"))
+    start = datetime(2024, 9, 25)
+    # Ajoutées dans le désordre : le rapport est trié par date
+    for day in reversed(range(20)):
+        finance_manager.add_transaction(-(day + 1.5), "Food" if day % 2 else "Transport", f"#{day}",
+                                        start + timedelta(days=day))
+    return finance_manager
+
+def test_csv_export_for_period(finance_manager, tmp_path):
+    path = str(tmp_path / "reports" / "october.csv")
+    count = export_report(finance_manager, path, datetime(2024, 10, 1), datetime(2024, 10, 5, 23, 59), chunk_size=2)
+    with open(path, newline='', encoding='utf-8') as file:
+        rows = list(csv.reader(file))
+    assert count == 5
+    assert rows[0] == ["Date", "Montant", "Catégorie", "Description"]
+    assert rows[1] == ["2024-10-01", "-7.50", "Transport", "#6"]
+    assert [row[0] for row in rows[1:]] == [f"2024-10-0{day}" for day in range(1, 6)]
+
+def test_format_from_path():
+    assert format_from_path("report.CSV") == 'csv'
+    assert format_from_path("report.arrow") == 'feather'
+    with pytest.raises(ValueError):
+        format_from_path("report.xlsx")
+
+@pytest.mark.parametrize("fmt", ['parquet', 'feather'])
+def test_columnar_export(finance_manager, tmp_path, fmt):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.feather
+    import pyarrow.parquet
+    path = str(tmp_path / f"report.{fmt}")
+    assert export_report(finance_manager, path, chunk_size=7) == 20
+    table = pa.parquet.read_table(path) if fmt == 'parquet' else pa.feather.read_table(path)
+    assert table.num_rows == 20
+    assert table.column('description').to_pylist()[:2] == ["#0", "#1"]
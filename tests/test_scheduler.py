@@ -0,0 +1,59 @@
+import pytest
+from datetime import datetime
+from models.planned_transaction import PlannedTransaction
+from models.user import User
+from services.scheduler import TransactionScheduler
+
+@pytest.fixture
+def scheduler():
+    return TransactionScheduler(User(1, "alice", "alice@example.com"))
+
+def test_monthly_recurrence_keeps_anchor_day():
+    plan = PlannedTransaction(1, 1, -800, "Loyer", next_date=datetime(2024, 1, 31), frequency='monthly')
+    dates = list(plan.occurrences(datetime(2024, 4, 30)))
+    assert dates == [datetime(2024, 1, 31), datetime(2024, 2, 29), datetime(2024, 3, 31), datetime(2024, 4, 30)]
+
+def test_recurrence_stops_at_end_date():
+    plan = PlannedTransaction(1, 1, -10, "Abonnement", next_date=datetime(2024, 1, 1), frequency='weekly',
+                              interval=2, end_date=datetime(2024, 1, 31))
+    assert list(plan.occurrences(datetime(2025, 1, 1))) == [datetime(2024, 1, 1), datetime(2024, 1, 15),
+                                                           datetime(2024, 1, 29)]
+
+def test_unknown_frequency_is_rejected():
+    with pytest.raises(ValueError):
+        PlannedTransaction(1, 1, -10, "Abonnement", frequency='hourly')
+
+def test_round_trip():
+    plan = PlannedTransaction(3, 1, -10, "Abonnement", "Musique", datetime(2024, 1, 31), 'monthly',
+                              end_date=datetime(2024, 12, 31))
+    assert PlannedTransaction.from_dict(plan.to_dict()).to_dict() == plan.to_dict()
+
+def test_settle_materializes_only_due_occurrences(scheduler):
+    scheduler.schedule(2000, "Salaire", start_date=datetime(2024, 1, 1), frequency='monthly')
+    scheduler.schedule(-50, "Courses", start_date=datetime(2024, 1, 10))
+    scheduler.schedule(-5, "Café", start_date=datetime(2024, 6, 1), frequency='daily')
+
+    rows = scheduler.settle(datetime(2024, 3, 15))
+    assert [(row['date'], row['amount']) for row in rows] == [
+        (datetime(2024, 1, 1), 2000), (datetime(2024, 1, 10), -50),
+        (datetime(2024, 2, 1), 2000), (datetime(2024, 3, 1), 2000)]
+    # La planification ponctuelle est terminée, les autres attendent leur prochaine échéance
+    assert len(scheduler.user.planned_transactions) == 2
+    assert scheduler.next_due_date() == datetime(2024, 4, 1)
+    assert scheduler.settle(datetime(2024, 3, 31)) == []
+
+def test_cancelled_plans_are_skipped(scheduler):
+    plan = scheduler.schedule(-10, "Abonnement", start_date=datetime(2024, 1, 1), frequency='monthly')
+    scheduler.schedule(-20, "Assurance", start_date=datetime(2024, 2, 1), frequency='monthly')
+    assert scheduler.cancel(plan.plan_id) is plan
+    assert scheduler.next_due_date() == datetime(2024, 2, 1)
+    assert [row['category'] for row in scheduler.settle(datetime(2024, 2, 15))] == ["Assurance"]
+
+def test_projection_does_not_settle(scheduler):
+    scheduler.schedule(-10, "Abonnement", start_date=datetime(2024, 1, 5), frequency='monthly')
+    scheduler.schedule(100, "Remboursement", start_date=datetime(2024, 2, 1))
+    occurrences = list(scheduler.iter_occurrences(datetime(2024, 3, 31)))
+    assert [date for date, _ in occurrences] == [datetime(2024, 1, 5), datetime(2024, 2, 1),
+                                                 datetime(2024, 2, 5), datetime(2024, 3, 5)]
+    assert scheduler.projected_total(datetime(2024, 3, 31)) == 70
+    assert scheduler.next_due_date() == datetime(2024, 1, 5)
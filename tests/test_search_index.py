@@ -0,0 +1,59 @@
+import os
+from datetime import date, datetime
+
+from services.search_index import SearchIndex
+
+ROWS = [(1, -30, "Achat", "AMAZON EU Sarl", "2022-03-01T10:00:00"),
+        (2, -12, "Achat", "Amazon Prime", "2023-05-01T10:00:00"),
+        (3, -45, "Transport", "SNCF Paris-Lyon", "2024-01-10T10:00:00")]
+
+
+def test_lookup_and_prefix_search(make_store):
+    index = SearchIndex.build(make_store(ROWS))
+    assert index.lookup("amazon") == [1, 2]
+    assert index.lookup("AMAZON prime") == [2]
+    assert index.lookup("ama", prefix=False) == []
+    assert index.lookup("ama") == [1, 2]
+    assert index.lookup("achat") == [1, 2]  # La catégorie est indexée
+    assert index.lookup("paris lyon") == [3]
+    assert index.suggest("a") == ["achat", "amazon"]
+
+    index.remove(2, "Amazon Prime", "Achat")
+    index.add(4, "Amazon Marketplace", "Achat")
+    assert index.lookup("amazon") == [1, 4]
+    assert index.complete("pri") == []
+
+
+def test_saved_index_is_reloaded_only_while_current(tmp_path, make_store):
+    store = make_store(ROWS)
+    path = str(tmp_path / "index.json")
+    SearchIndex.build(store).save(path, store)
+    assert SearchIndex.load(path, store).lookup("sncf") == [3]
+    store[0].description = "Fnac"
+    assert SearchIndex.load(path, store) is None
+
+
+def test_index_follows_finance_manager_mutations(controller, shared_store):
+    controller.add_transaction(-30, "Achat", "Amazon", date=datetime(2022, 3, 1))
+    assert controller.search("amazon")['total'] == 1
+
+    # Ajouts, modifications et suppressions après la construction de l'index
+    controller.add_transactions([{'amount': -12, 'category': "Achat", 'description': "AMAZON Prime",
+                                  'date': datetime(2023, 5, 1)}])
+    second = controller.add_transaction(-20, "Loisirs", "Cinéma", date=datetime(2024, 1, 5))
+    controller.update_transaction(second.transaction_id, -20, "Loisirs", "Amazon Video")
+    controller.add_transaction(-5, "Achat", "Amazon erreur de saisie", date=datetime(2024, 2, 1))
+    controller.delete_last_transaction()
+    result = controller.search("amazon")
+    assert [t.description for t in result['transactions']] == ["Amazon Video", "AMAZON Prime", "Amazon"]
+    assert controller.search("amazon", date_range=(date(2023, 1, 1), date(2023, 12, 31)))['total'] == 1
+    assert controller.search("amazon", category="Loisirs")['total'] == 1
+    assert controller.search("cinema")['total'] == 0
+    assert controller.suggest_search_terms("am") == ["amazon"]
+    controller.logout()
+    path = SearchIndex.path_for("alice", shared_store.search_index_dir)
+    assert os.path.exists(path)
+
+    controller.login("alice", "secret")
+    assert SearchIndex.load(path, controller.current_user.transactions) is not None  # Pas de reconstruction
+    assert controller.search("ama")['total'] == 3
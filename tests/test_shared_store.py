@@ -0,0 +1,80 @@
+import threading
+import time
+import pytest
+from services.app_controller import AppController
+from services.finance_manager import FinanceManager
+from services.shared_store import SharedUserStore
+from services.user_manager import UserManager
+
+@pytest.fixture
+def store(tmp_path):
+    store = SharedUserStore(UserManager(str(tmp_path / "user_data.json"), journal=True))
+    store.user_manager.create_user("alice", "alice@example.com", "secret")
+    store.user_manager.create_user("bob", "bob@example.com", "secret")
+    yield store
+    store.close()
+
+def open_session(store, username):
+    controller = AppController(shared_store=store, persistence_mode='sync')
+    assert controller.login(username, "secret")
+    return controller
+
+def test_sessions_share_user_data(store):
+    first, second = open_session(store, "alice"), open_session(store, "alice")
+    assert first.current_user is second.current_user
+    assert store.get_stats() == {'users': 1, 'sessions': 2}
+
+    version = second.data_version
+    first.add_transaction(-20, "Courses")
+    assert second.get_balance() == -20
+    assert second.data_version != version
+
+    first.logout()
+    assert store.get_stats() == {'users': 1, 'sessions': 1}
+    second.close()
+    assert store.get_stats() == {'users': 0, 'sessions': 0}
+
+def test_concurrent_writes_are_not_lost(store):
+    sessions = [open_session(store, "alice"), open_session(store, "alice"), open_session(store, "bob")]
+
+    def write(controller):
+        for _ in range(50):
+            controller.add_transaction(-1, "Courses")
+
+    threads = [threading.Thread(target=write, args=(controller,)) for controller in sessions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    alice, bob = sessions[0].get_transactions(), sessions[2].get_transactions()
+    assert len(alice) == 100 and len(set(alice.ids.tolist())) == 100
+    assert len(bob) == 50
+    for controller in sessions:
+        controller.logout()
+    assert len(store.user_manager.get_user_data("alice")['transactions']) == 100
+
+def test_reader_does_not_see_a_half_applied_write(store, monkeypatch):
+    writer, reader = open_session(store, "alice"), open_session(store, "alice")
+    writer.add_transaction(-10, "Courses")
+    in_write = threading.Event()
+    apply_delta = FinanceManager._apply_delta
+
+    def slow_apply_delta(self, category, amount):
+        # Fenêtre entre l'ajout au stockage et la mise à jour des totaux
+        in_write.set()
+        time.sleep(0.05)
+        apply_delta(self, category, amount)
+
+    monkeypatch.setattr(FinanceManager, '_apply_delta', slow_apply_delta)
+    thread = threading.Thread(target=writer.add_transaction, args=(-10, "Courses"))
+    thread.start()
+    in_write.wait()
+    balance = reader.get_balance()
+    thread.join()
+
+    assert balance == -20
+    assert reader.get_balance() == -20
+    assert reader.finance_manager.verify_totals(rebuild=False)
+    writer.logout()
+    reader.logout()
@@ -0,0 +1,40 @@
+import pytest
+from datetime import datetime
+from models.transaction import Transaction
+from models.transaction_store import TransactionStore
+
+pd = pytest.importorskip("pandas")
+from services.transaction_frame import TransactionFrame
+
+@pytest.fixture
+def store():
+    store = TransactionStore()
+    store.append(Transaction(1, 1, 100, "Income", "Salary", datetime(2024, 10, 1)))
+    store.append(Transaction(2, 1, -50, "Food", "Groceries", datetime(2024, 10, 2)))
+    return store
+
+def test_appends_extend_cached_frame(store):
+    cache = TransactionFrame()
+    first = cache.get(store)
+    assert cache.get(store) is first
+    store.append(Transaction(3, 1, -20, "Food", "Bakery", datetime(2024, 10, 3)))
+    frame = cache.get(store)
+    assert frame['transaction_id'].tolist() == [1, 2, 3]
+    assert frame['Montant (€)'].tolist() == ["100.00€", "-50.00€", "-20.00€"]
+    assert frame.index.tolist() == [0, 1, 2]
+
+def test_edits_rebuild_frame(store):
+    cache = TransactionFrame()
+    cache.get(store)
+    store[1].amount = -60
+    store.pop(0)
+    assert cache.get(store)['amount'].tolist() == [-60]
+
+def test_category_breakdown_is_memoized(store):
+    cache = TransactionFrame()
+    breakdown = cache.category_breakdown(store)
+    assert breakdown['expenses'].to_dict() == {"Food": 50}
+    assert breakdown['incomes'].to_dict() == {"Income": 100}
+    assert cache.category_breakdown(store) is breakdown
+    store.append(Transaction(3, 1, -20, "Food", "Bakery", datetime(2024, 10, 3)))
+    assert cache.category_breakdown(store)['expenses'].to_dict() == {"Food": 70}
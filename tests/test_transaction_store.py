@@ -0,0 +1,190 @@
+import pytest
+from datetime import datetime, timedelta
+from models.transaction import Transaction
+from models.transaction_store import TransactionStore
+
+@pytest.fixture
+def store():
+    store = TransactionStore()
+    store.append(Transaction(1, 1, 100, "Income", "Salary", datetime(2024, 10, 1)))
+    store.append(Transaction(2, 1, -50, "Food", "Groceries", datetime(2024, 10, 2)))
+    store.append(Transaction(3, 1, -20, "Food", "Bakery", datetime(2024, 10, 3)))
+    return store
+
+def test_list_interface(store):
+    assert len(store) == 3
+    assert store[0].amount == 100
+    assert store[-1].description == "Bakery"
+    assert [t.transaction_id for t in store] == [1, 2, 3]
+    assert [t.transaction_id for t in store[1:]] == [2, 3]
+    with pytest.raises(IndexError):
+        store[3]
+
+def test_append_keeps_object_identity():
+    store = TransactionStore()
+    transaction = Transaction(1, 1, 100, "Income", "Salary")
+    store.append(transaction)
+    assert store[0] is transaction
+    assert transaction in store
+
+def test_views_write_through(store):
+    new_date = datetime(2024, 11, 1, 12, 30)
+    store[1].date = new_date
+    store[1].category = "Restaurants"
+    store[1].amount = -75
+    assert store.get_value(1, 'date') == new_date
+    assert store.totals_by_category() == {"Income": 100, "Restaurants": -75, "Food": -20}
+
+def test_pop_detaches_transaction(store):
+    middle = store[1]
+    last = store[2]
+    popped = store.pop(1)
+    assert popped is middle
+    assert popped not in store
+    assert popped.amount == -50
+    popped.amount = -60  # Ne modifie plus le stockage
+    assert len(store) == 2
+    assert last.transaction_id == 3 and store[1] is last
+    assert store.total() == 80
+
+def test_insert_and_remove(store):
+    transaction = Transaction(4, 1, 10, "Gift", "", datetime(2024, 9, 1))
+    store.insert(0, transaction)
+    assert [t.transaction_id for t in store] == [4, 1, 2, 3]
+    store.remove(transaction)
+    assert [t.transaction_id for t in store] == [1, 2, 3]
+
+def test_aggregates(store):
+    assert store.total() == 30
+    assert store.count_category("Food") == 2
+    assert store.count_category("Unknown") == 0
+    assert list(store.rows_between(datetime(2024, 10, 2), datetime(2024, 10, 3))) == [1, 2]
+    assert store.find_row(3) == 2
+    assert store.find_row(42) is None
+
+def test_dicts_round_trip(store):
+    records = store.to_dicts()
+    rebuilt = TransactionStore.from_dicts(records)
+    assert rebuilt.to_dicts() == records
+    assert records[0] == Transaction(1, 1, 100.0, "Income", "Salary", datetime(2024, 10, 1)).to_dict()
+
+def test_version_changes_on_mutation(store):
+    version = store.version
+    store[0].amount = 200
+    assert store.version > version
+
+def test_date_index_follows_changes(store):
+    assert list(store.rows_between(datetime(2024, 10, 2), datetime(2024, 10, 3))) == [1, 2]
+    store.append(Transaction(4, 1, 5, "Gift", "", datetime(2024, 9, 15)))
+    store.insert(0, Transaction(5, 1, 7, "Gift", "", datetime(2024, 10, 2, 12)))
+    store[1].date = datetime(2024, 12, 1)  # Transaction 1
+    ids = [int(store.ids[row]) for row in store.rows_by_date()]
+    assert ids == [4, 2, 5, 3, 1]
+    store.pop(2)  # Transaction 2
+    ids = [int(store.ids[row]) for row in store.rows_since(datetime(2024, 10, 1))]
+    assert ids == [5, 3, 1]
+
+def test_date_index_matches_scan():
+    import random
+    random.seed(4)
+    store = TransactionStore()
+    start = datetime(2024, 1, 1)
+    for i in range(300):
+        store.append(Transaction(i, 1, random.randint(-100, 100), "C", "", start + timedelta(days=random.randint(0, 365))))
+    store.rows_by_date()  # Construit l'index, maintenu ensuite au fil des modifications
+    for _ in range(100):
+        action = random.random()
+        if action < 0.3:
+            store.pop(random.randrange(len(store)))
+        elif action < 0.6:
+            store[random.randrange(len(store))].date = start + timedelta(days=random.randint(0, 365))
+        else:
+            store.insert(random.randrange(len(store)), Transaction(0, 1, 1, "C", "", start + timedelta(days=random.randint(0, 365))))
+    low, high = start + timedelta(days=100), start + timedelta(days=200)
+    expected = sorted(row for row, t in enumerate(store) if low <= t.date <= high)
+    assert sorted(store.rows_between(low, high)) == expected
+    assert store.balance_as_of(high) == pytest.approx(sum(t.amount for t in store if t.date <= high))
+    assert store.balance_as_of(high, total=store.total()) == pytest.approx(store.balance_as_of(high))
+
+def test_swap_pop_keeps_indexes_consistent():
+    import random
+    random.seed(8)
+    store = TransactionStore()
+    start = datetime(2024, 1, 1)
+    for i in range(200):
+        store.append(Transaction(i, 1, random.randint(-100, 100), "C", "", start + timedelta(days=random.randint(0, 365))))
+    store.rows_by_date()
+    store.find_row(0)
+    last = store[-1]
+    popped = store.swap_pop(3)
+    assert popped.transaction_id == 3 and popped not in store
+    assert store[3] is last and last.transaction_id == 199
+    for _ in range(150):
+        store.swap_pop(random.randrange(len(store)))
+    assert all(store.find_row(t.transaction_id) == row for row, t in enumerate(store))
+    low, high = start + timedelta(days=100), start + timedelta(days=200)
+    assert sorted(store.rows_between(low, high)) == sorted(row for row, t in enumerate(store) if low <= t.date <= high)
+    assert [store[row].date for row in store.rows_by_date()] == sorted(t.date for t in store)
+    assert store.balance_as_of(high) == pytest.approx(sum(t.amount for t in store if t.date <= high))
+
+def test_id_index_follows_changes(store):
+    store.insert(0, Transaction(10, 1, -5, "Loisirs"))
+    assert store.find_row(10) == 0
+    assert store[store.find_row(2)].transaction_id == 2
+    store.pop(0)
+    assert store.find_row(10) is None
+    assert all(store.find_row(t.transaction_id) == row for row, t in enumerate(store))
+    store[0].transaction_id = 42
+    assert store.find_row(42) == 0
+    assert store.id_high_water == 42
+
+def test_category_counts(store):
+    counts = {}
+    for t in store:
+        counts[t.category] = counts.get(t.category, 0) + 1
+    assert all(store.count_category(c) == n for c, n in counts.items())
+    category = store[0].category
+    store[0].category = "Nouvelle"
+    assert store.count_category("Nouvelle") == 1
+    assert store.count_category(category) == counts[category] - 1
+    store.clear()
+    assert store.count_category("Nouvelle") == 0
+
+def scan_sums(store, days, today):
+    start = datetime.combine(today, datetime.min.time()) - timedelta(days=days - 1)
+    amounts = [t.amount for t in store if t.date >= start]
+    return sum(a for a in amounts if a > 0), sum(a for a in amounts if a < 0)
+
+def test_trailing_sums_follow_changes():
+    today = datetime(2024, 10, 31).date()
+    store = TransactionStore()
+    for i in range(60):
+        store.append(Transaction(i + 1, 1, 100 if i % 10 == 0 else -7, "Food", "", datetime(2024, 9, 1) + timedelta(days=i)))
+    assert store.trailing_sums(30, today) == pytest.approx(scan_sums(store, 30, today))
+    store[-1].amount = -50  # Modification dans la fenêtre
+    store[5].date = datetime(2024, 10, 20)  # Déplacée dans la fenêtre
+    store.pop(40)
+    store.append(Transaction(100, 1, 30, "Gift", "", datetime(2024, 11, 3)))  # Datée dans le futur
+    store.insert(0, Transaction(101, 1, -3, "Food", "", datetime(2024, 10, 31, 23)))
+    assert store.trailing_sums(30, today) == pytest.approx(scan_sums(store, 30, today))
+    later = datetime(2024, 11, 10).date()
+    assert store.trailing_sums(30, later) == pytest.approx(scan_sums(store, 30, later))
+    assert store.trailing_sums(7, later) == pytest.approx(scan_sums(store, 7, later))
+    much_later = datetime(2025, 3, 1).date()
+    assert store.trailing_sums(30, much_later) == (0, 0)
+
+def test_edit_version_ignores_appends(store):
+    edit_version = store.edit_version
+    store.append(Transaction(4, 1, -5, "Food", "Coffee", datetime(2024, 10, 4)))
+    store.extend_dicts([{'transaction_id': 5, 'amount': -5, 'category': "Food", 'date': "2024-10-05T00:00:00"}])
+    assert store.edit_version == edit_version
+    store[0].amount = 120
+    assert store.edit_version == edit_version + 1
+    store.pop()
+    assert store.edit_version == edit_version + 2
+
+def test_to_columns_slice(store):
+    columns = store.to_columns(1)
+    assert columns['transaction_id'].tolist() == [2, 3]
+    assert columns['category'] == ["Food", "Food"]
+    assert columns['description'] == ["Groceries", "Bakery"]
@@ -0,0 +1,243 @@
+import pytest
+import json
+import os
+from services.user_manager import UserManager
+from services.storage.json_backend import JsonStorageBackend
+from services.storage.sqlite_backend import SqliteStorageBackend
+from services.storage.sharded_backend import ShardedStorageBackend
+from services.storage.migrate import migrate
+
+@pytest.fixture
+def data_file(tmp_path):
+    return str(tmp_path / "user_data.json")
+
+@pytest.fixture(params=["json", "journal", "sqlite", "sharded"])
+def manager(request, tmp_path):
+    if request.param == "sqlite":
+        manager = UserManager(backend=SqliteStorageBackend(str(tmp_path / "user_data.db")))
+    elif request.param == "sharded":
+        manager = UserManager(backend=ShardedStorageBackend(str(tmp_path / "users")))
+    else:
+        manager = UserManager(str(tmp_path / "user_data.json"), journal=request.param == "journal")
+    yield manager
+    manager.close()
+
+def make_transaction(transaction_id, amount, category="Courses"):
+    return {
+        'transaction_id': transaction_id,
+        'user_id': 1,
+        'amount': amount,
+        'category': category,
+        'description': "",
+        'date': "2024-10-03T00:00:00"
+    }
+
+def make_budget(budget_id, amount, category="Courses"):
+    return {
+        'budget_id': budget_id,
+        'user_id': 1,
+        'category': category,
+        'amount': amount,
+        'period_start': "2024-10-01T00:00:00",
+        'period_end': "2024-10-31T23:59:59",
+        'spent': 0
+    }
+
+def test_create_and_authenticate(manager):
+    assert manager.create_user("alice", "alice@example.com", "secret")
+    assert not manager.create_user("alice", "other@example.com", "secret")
+    assert manager.authenticate("alice", "secret")
+    assert not manager.authenticate("alice", "wrong")
+    assert not manager.authenticate("bob", "secret")
+
+def test_transaction_operations(manager):
+    manager.create_user("alice", "alice@example.com", "secret")
+    manager.add_transaction("alice", make_transaction(1, -20))
+    manager.add_transaction("alice", make_transaction(2, 100, "Salaire"))
+    manager.add_transaction("alice", make_transaction(3, -5))
+    manager.update_transaction("alice", make_transaction(1, -25))
+    manager.delete_transaction("alice", 2)
+    manager.save_budget("alice", make_budget(1, 300))
+    manager.save_budget("alice", make_budget(1, 350))
+    user = manager.get_user_data("alice")
+    assert [t['amount'] for t in user['transactions']] == [-25, -5]
+    assert [b['amount'] for b in user['budgets']] == [350]
+
+def test_update_user_data(manager):
+    manager.create_user("alice", "alice@example.com", "secret")
+    manager.add_transaction("alice", make_transaction(1, -20))
+    manager.update_user_data("alice", [make_transaction(5, 10)], [make_budget(1, 100)])
+    user = manager.get_user_data("alice")
+    assert [t['transaction_id'] for t in user['transactions']] == [5]
+    assert len(user['budgets']) == 1
+
+def test_add_transactions_bulk(manager):
+    manager.create_user("alice", "alice@example.com", "secret")
+    manager.add_transaction("alice", make_transaction(1, -20))
+    manager.add_transactions("alice", [make_transaction(2, -5), make_transaction(3, 10)])
+    user = manager.get_user_data("alice")
+    assert [t['transaction_id'] for t in user['transactions']] == [1, 2, 3]
+
+def test_user_meta(manager):
+    manager.create_user("alice", "alice@example.com", "secret")
+    manager.save_user_meta("alice", {'next_transaction_id': 7})
+    manager.update_user_data("alice", [make_transaction(1, -20)], [])
+    assert manager.get_user_data("alice")['meta'] == {'next_transaction_id': 7}
+
+def test_delete_user(manager):
+    manager.create_user("alice", "alice@example.com", "secret")
+    manager.add_transaction("alice", make_transaction(1, -20))
+    assert manager.delete_user("alice")
+    assert not manager.delete_user("alice")
+    assert manager.get_user_data("alice") is None
+    assert list(manager.iter_usernames()) == []
+
+def test_migrate_json_to_sqlite(data_file, tmp_path):
+    source = JsonStorageBackend(data_file)
+    source.create_user("alice", "alice@example.com", "secret")
+    source.create_user("bob", "bob@example.com", "secret")
+    # Identifiant en double hérité des anciennes versions
+    source.replace_user_data("alice", [make_transaction(1, -20), make_transaction(1, -30)], [make_budget(1, 300)])
+    destination = SqliteStorageBackend(str(tmp_path / "user_data.db"))
+
+    stats = migrate(source, destination)
+    assert stats == {'users': 2, 'transactions': 2, 'budgets': 1}
+    alice = destination.load_user("alice")
+    assert [t['transaction_id'] for t in alice['transactions']] == [1, 2]
+    assert [t['amount'] for t in alice['transactions']] == [-20, -30]
+    assert alice['budgets'][0]['amount'] == 300
+    assert source.load_user("alice")['transactions'][1]['transaction_id'] == 1
+    destination.close()
+
+def test_journal_does_not_rewrite_snapshot(data_file):
+    manager = UserManager(data_file, journal=True)
+    manager.create_user("alice", "alice@example.com", "secret")
+    manager.add_transaction("alice", make_transaction(1, -20))
+    manager.close()
+    assert not os.path.exists(data_file)
+    assert os.path.exists(manager.backend._journal_path("alice"))
+
+def test_journal_replay(data_file):
+    manager = UserManager(data_file, journal=True)
+    manager.create_user("alice", "alice@example.com", "secret")
+    manager.add_transaction("alice", make_transaction(1, -20))
+    manager.add_transaction("alice", make_transaction(2, 100, "Salaire"))
+    manager.update_transaction("alice", make_transaction(1, -25))
+    manager.delete_transaction("alice", 2)
+    manager.save_budget("alice", make_budget(1, 300))
+    manager.close()
+
+    reloaded = UserManager(data_file, journal=True)
+    user = reloaded.get_user_data("alice")
+    assert [t['amount'] for t in user['transactions']] == [-25]
+    assert user['budgets'][0]['amount'] == 300
+
+def test_journal_append_after_torn_write(data_file):
+    manager = UserManager(data_file, journal=True)
+    manager.create_user("alice", "alice@example.com", "secret")
+    manager.add_transaction("alice", make_transaction(1, -20))
+    journal_path = manager.backend._journal_path("alice")
+    manager.close()
+    with open(journal_path, 'a') as f:
+        f.write('{"op": "add_transaction", "transac')  # Arrêt pendant une écriture
+
+    manager = UserManager(data_file, journal=True)
+    manager.add_transaction("alice", make_transaction(2, -30))
+    manager.add_transaction("alice", make_transaction(3, -40))
+    manager.close()
+
+    reloaded = UserManager(data_file, journal=True)
+    assert [t['amount'] for t in reloaded.get_user_data("alice")['transactions']] == [-20, -30, -40]
+    reloaded.close()
+
+def test_journal_writes_keep_id_index(data_file):
+    manager = UserManager(data_file, journal=True)
+    manager.create_user("alice", "alice@example.com", "secret")
+    manager.add_transactions("alice", [make_transaction(i, -i) for i in range(1, 6)])
+    manager.delete_transaction("alice", 2)  # La dernière transaction prend sa place
+    manager.update_transaction("alice", make_transaction(5, -50))
+    manager.add_transactions("alice", [make_transaction(5, -5), make_transaction(6, -6)])  # 5 déjà présente
+    manager.delete_transaction("alice", 6)
+    manager.delete_transaction("alice", 42)  # Inconnue : sans effet
+    expected = {1: -1, 3: -3, 4: -4, 5: -50}
+    transactions = manager.get_user_data("alice")['transactions']
+    assert {t['transaction_id']: t['amount'] for t in transactions} == expected
+    assert len(transactions) == len(expected)
+    manager.close()
+
+    reloaded = UserManager(data_file, journal=True)
+    transactions = reloaded.get_user_data("alice")['transactions']
+    assert {t['transaction_id']: t['amount'] for t in transactions} == expected
+    assert len(transactions) == len(expected)
+    reloaded.close()
+
+def test_journal_compaction(data_file):
+    manager = UserManager(data_file, journal=True, compact_threshold=3)
+    manager.create_user("alice", "alice@example.com", "secret")
+    for i in range(1, 5):
+        manager.add_transaction("alice", make_transaction(i, -i))
+    manager.close()
+
+    with open(data_file) as f:
+        snapshot = json.load(f)
+    assert len(snapshot["alice"]['transactions']) == 2
+
+    reloaded = UserManager(data_file, journal=True)
+    assert len(reloaded.get_user_data("alice")['transactions']) == 4
+
+def test_journal_replay_skips_records_in_snapshot(data_file):
+    manager = UserManager(data_file, journal=True)
+    manager.create_user("alice", "alice@example.com", "secret")
+    manager.add_transaction("alice", make_transaction(1, -20))
+    manager.flush()
+    # Instantané écrit sans troncature du journal (arrêt entre les deux étapes)
+    with open(data_file, 'w') as f:
+        json.dump(manager.backend.users, f)
+
+    reloaded = UserManager(data_file, journal=True)
+    assert len(reloaded.get_user_data("alice")['transactions']) == 1
+
+def test_journal_ignores_truncated_last_line(data_file):
+    manager = UserManager(data_file, journal=True)
+    manager.create_user("alice", "alice@example.com", "secret")
+    manager.add_transaction("alice", make_transaction(1, -20))
+    manager.close()
+    with open(manager.backend._journal_path("alice"), 'a') as f:
+        f.write('{"op": "add_transac')
+
+    reloaded = UserManager(data_file, journal=True)
+    assert len(reloaded.get_user_data("alice")['transactions']) == 1
+
+def test_delete_user_journal(data_file):
+    manager = UserManager(data_file, journal=True)
+    manager.create_user("alice", "alice@example.com", "secret")
+    assert manager.delete_user("alice")
+    manager.close()
+    reloaded = UserManager(data_file, journal=True)
+    assert reloaded.get_user_data("alice") is None
+
+def test_sharded_loads_only_index(tmp_path):
+    directory = str(tmp_path / "users")
+    backend = ShardedStorageBackend(directory)
+    backend.create_user("alice", "alice@example.com", "secret")
+    backend.create_user("bob", "bob@example.com", "secret")
+    backend.insert_transaction("alice", make_transaction(1, -20))
+
+    reloaded = ShardedStorageBackend(directory)
+    assert reloaded.get_credentials("bob")['email'] == "bob@example.com"
+    assert reloaded.shards == {}
+    assert len(reloaded.load_user("alice")['transactions']) == 1
+    assert list(reloaded.shards) == ["alice"]
+    reloaded.release_user("alice")
+    assert reloaded.shards == {}
+
+def test_sharded_save_writes_only_user_shard(tmp_path):
+    directory = tmp_path / "users"
+    backend = ShardedStorageBackend(str(directory))
+    backend.create_user("alice", "alice@example.com", "secret")
+    backend.create_user("bob", "bob@example.com", "secret")
+    bob_mtime = os.stat(backend._shard_path("bob")).st_mtime_ns
+    index_mtime = os.stat(backend.index_path).st_mtime_ns
+    backend.insert_transaction("alice", make_transaction(1, -20))
+    assert os.stat(backend._shard_path("bob")).st_mtime_ns == bob_mtime
+    assert os.stat(backend.index_path).st_mtime_ns == index_mtime
@@ -0,0 +1,14 @@
+import re
+import unicodedata
+
+
+def normalize_description(description):
+    """
+    Normalise une description pour la comparaison : minuscules, sans accents ni ponctuation,
+    espaces regroupés.
+
+    :param description: La description d'origine
+    :return: La description normalisée
+    """
+    text = unicodedata.normalize('NFKD', description or "").encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text.lower()).split())
@@ -0,0 +1,155 @@
+import json
+import logging
+import os
+import time
+
+
+def atomic_write_json(file_path, data):
+    """
+    Écrit des données JSON dans un fichier de manière atomique.
+    Le contenu est d'abord écrit dans un fichier temporaire, synchronisé sur le disque,
+    puis renommé, de sorte qu'un arrêt brutal ne laisse jamais un fichier à moitié écrit.
+
+    :param file_path: Chemin du fichier de destination
+    :param data: Données sérialisables en JSON
+    """
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, file_path)
+
+
+class JournalFile:
+    """
+    Journal en ajout seul (un enregistrement JSON par ligne).
+    Chaque ajout est transmis immédiatement au système d'exploitation, mais l'appel
+    à fsync est regroupé : il n'a lieu qu'après `fsync_batch` enregistrements ou
+    lorsque `fsync_interval` secondes se sont écoulées depuis le dernier fsync.
+    """
+
+    def __init__(self, file_path, fsync_batch=32, fsync_interval=1.0):
+        """
+        Initialise le journal.
+
+        :param file_path: Chemin du fichier journal
+        :param fsync_batch: Nombre d'enregistrements entre deux fsync
+        :param fsync_interval: Délai maximal (en secondes) entre deux fsync
+        """
+        self.file_path = file_path
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.pending = 0  # Enregistrements écrits mais pas encore synchronisés
+        self.record_count = 0  # Enregistrements présents dans le fichier
+        self._last_sync = time.monotonic()
+        self._file = None
+
+    def _open(self):
+        if self._file is None:
+            directory = os.path.dirname(self.file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Une ligne tronquée laissée par un arrêt brutal serait prolongée par l'ajout suivant
+            self.discard_torn_tail(self.file_path)
+            self._file = open(self.file_path, 'a', encoding='utf-8')
+        return self._file
+
+    @staticmethod
+    def discard_torn_tail(file_path, block_size=4096):
+        """
+        Tronque le journal après sa dernière ligne complète (terminée par un saut de ligne).
+
+        :param file_path: Chemin du fichier journal
+        :param block_size: Taille des blocs lus en partant de la fin du fichier
+        :return: True si une ligne incomplète a été supprimée
+        """
+        if not os.path.exists(file_path):
+            return False
+        with open(file_path, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            end = size
+            while end > 0:
+                start = max(end - block_size, 0)
+                f.seek(start)
+                block = f.read(end - start)
+                position = block.rfind(b'\n')
+                if position >= 0:
+                    end = start + position + 1
+                    break
+                end = start
+            if end == size:
+                return False
+            f.truncate(end)
+            f.flush()
+            os.fsync(f.fileno())
+        logging.warning(f"Journal {file_path} : ligne incomplète supprimée ({size - end} octets)")
+        return True
+
+    def append(self, record):
+        """
+        Ajoute un enregistrement à la fin du journal.
+
+        :param record: Dictionnaire sérialisable en JSON
+        """
+        f = self._open()
+        f.write(json.dumps(record) + '\n')
+        f.flush()
+        self.pending += 1
+        self.record_count += 1
+        if self.pending >= self.fsync_batch or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        """
+        Force l'écriture durable des enregistrements en attente.
+        """
+        if self._file is not None and self.pending:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self.pending = 0
+        self._last_sync = time.monotonic()
+
+    def truncate(self):
+        """
+        Vide le journal (après l'écriture d'un instantané qui le contient).
+        """
+        self.close()
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
+        self.record_count = 0
+
+    def close(self):
+        """
+        Synchronise et ferme le fichier journal.
+        """
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def replay(file_path):
+        """
+        Relit les enregistrements d'un journal dans l'ordre d'écriture.
+        Une ligne tronquée (arrêt pendant une écriture) est ignorée sans interrompre la relecture.
+
+        :param file_path: Chemin du fichier journal
+        :return: Un itérateur sur les enregistrements
+        """
+        if not os.path.exists(file_path):
+            return
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f"Journal {file_path} : ligne illisible ignorée")
+                    continue
+                yield record